@@ -18,6 +18,12 @@ class Settings:
     # Guest/demo access (no persistence)
     ALLOW_GUEST: bool = os.getenv("ALLOW_GUEST", "true").lower() in ("1", "true", "yes", "on")
 
+    # Opt-in stage/service timing with a hidden admin panel (?admin=1)
+    PROFILING: bool = os.getenv("PROFILING", "false").lower() in ("1", "true", "yes", "on")
+
+    # Seconds a fetched market price feed is served from the shared cache before revalidation
+    PRICE_FEED_TTL: float = float(os.getenv("PRICE_FEED_TTL", "300"))
+
 
 settings = Settings()
 
@@ -22,20 +22,79 @@ class Richness(Enum):
 class Resource:
     name: str
     current_price: float = 0.0
-    
-@dataclass
+
 class PlanetaryResource:
-    planet_id: int
-    region: str
-    constellation: str
-    system: str
-    planet_name: str
-    planet_type: PlanetType
-    resource: str
-    richness: Richness
-    output: float
-    mining_units: int = 0
-    
+    """Lightweight view of one resource row of a Universe.
+
+    Only the universe, the row index and the owner's mining units map are
+    stored; all other attributes are read from the universe's typed arrays.
+    Assigning mining_units writes through to the units map.
+    """
+    __slots__ = ('_universe', '_row', '_units')
+
+    def __init__(self, universe, row: int, units: Optional[Dict[str, int]] = None):
+        self._universe = universe
+        self._row = row
+        self._units = units if units is not None else {}
+
+    @property
+    def planet_id(self) -> int:
+        u = self._universe
+        return int(u.planet_ids[u.row_planet[self._row]])
+
+    @property
+    def region(self) -> str:
+        return self._universe.regions[self._universe.row_region[self._row]]
+
+    @property
+    def constellation(self) -> str:
+        return self._universe.constellations[self._universe.row_constellation[self._row]]
+
+    @property
+    def system(self) -> str:
+        return self._universe.systems[self._universe.row_system[self._row]]
+
+    @property
+    def planet_name(self) -> str:
+        u = self._universe
+        return u.planet_names[u.planet_name[u.row_planet[self._row]]]
+
+    @property
+    def planet_type(self) -> PlanetType:
+        return self._universe.planet_types[self._universe.row_planet_type[self._row]]
+
+    @property
+    def resource(self) -> str:
+        return self._universe.resources[self._universe.row_resource[self._row]]
+
+    @property
+    def richness(self) -> Richness:
+        return self._universe.richness[self._universe.row_richness[self._row]]
+
+    @property
+    def output(self) -> float:
+        return float(self._universe.row_output[self._row])
+
+    @property
+    def key(self) -> str:
+        """Mining units key: "<planet_id>_<resource>"."""
+        return f"{self.planet_id}_{self.resource}"
+
+    @property
+    def mining_units(self) -> int:
+        return self._units.get(self.key, 0)
+
+    @mining_units.setter
+    def mining_units(self, value: int) -> None:
+        if value:
+            self._units[self.key] = int(value)
+        else:
+            self._units.pop(self.key, None)
+
+    def __repr__(self) -> str:
+        return (f"PlanetaryResource(planet_id={self.planet_id}, system={self.system!r}, "
+                f"resource={self.resource!r}, output={self.output}, mining_units={self.mining_units})")
+
     def calculate_value_per_unit(self, price_dict: Dict[str, float]) -> float:
         """Calculate the hourly value of a single unit of this resource."""
         if self.resource not in price_dict:
@@ -46,23 +105,57 @@ class PlanetaryResource:
         """Calculate the total hourly value based on assigned mining units."""
         return self.calculate_value_per_unit(price_dict) * self.mining_units
 
-@dataclass
 class Planet:
-    planet_id: int
-    region: str
-    constellation: str
-    system: str
-    name: str
-    planet_type: PlanetType
-    resources: List[PlanetaryResource] = None
-    
-    def __post_init__(self):
-        if self.resources is None:
-            self.resources = []
-            
+    """Lightweight view of one planet of a Universe.
+
+    The resource views are created on first access to ``resources``.
+    """
+    __slots__ = ('_universe', '_index', '_units', '_resources')
+
+    def __init__(self, universe, index: int, units: Optional[Dict[str, int]] = None):
+        self._universe = universe
+        self._index = index
+        self._units = units if units is not None else {}
+        self._resources = None
+
+    @property
+    def planet_id(self) -> int:
+        return int(self._universe.planet_ids[self._index])
+
+    @property
+    def region(self) -> str:
+        return self._universe.regions[self._universe.planet_region[self._index]]
+
+    @property
+    def constellation(self) -> str:
+        return self._universe.constellations[self._universe.planet_constellation[self._index]]
+
+    @property
+    def system(self) -> str:
+        return self._universe.systems[self._universe.planet_system[self._index]]
+
+    @property
+    def name(self) -> str:
+        return self._universe.planet_names[self._universe.planet_name[self._index]]
+
+    @property
+    def planet_type(self) -> PlanetType:
+        return self._universe.planet_types[self._universe.planet_type[self._index]]
+
+    @property
+    def resources(self) -> List[PlanetaryResource]:
+        if self._resources is None:
+            start = int(self._universe.planet_offsets[self._index])
+            end = int(self._universe.planet_offsets[self._index + 1])
+            self._resources = [PlanetaryResource(self._universe, row, self._units) for row in range(start, end)]
+        return self._resources
+
+    def __repr__(self) -> str:
+        return f"Planet(planet_id={self.planet_id}, name={self.name!r}, system={self.system!r})"
+
     def add_resource(self, resource: PlanetaryResource):
         self.resources.append(resource)
-        
+
     def total_value(self, price_dict: Dict[str, float]) -> float:
         """Calculate total hourly value of all resources on this planet"""
-        return sum(r.calculate_total_value(price_dict) for r in self.resources) 
\ No newline at end of file
+        return sum(r.calculate_total_value(price_dict) for r in self.resources)
@@ -0,0 +1,242 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Arrays of a FilterIndex stored in the universe snapshot (besides the trigram list)
+ARRAY_NAMES = ("region_starts", "region_ends", "constellation_starts", "constellation_ends",
+               "system_starts", "system_ends", "resource_bitmaps", "trigram_indptr", "trigram_entries")
+
+
+def _level_ranges(codes: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Start/end row of every code, given that each code occupies one contiguous run."""
+    starts = np.zeros(size, dtype=np.int64)
+    ends = np.zeros(size, dtype=np.int64)
+    if len(codes):
+        run_starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        run_ends = np.r_[run_starts[1:], len(codes)]
+        starts[codes[run_starts]] = run_starts
+        ends[codes[run_starts]] = run_ends
+    return starts, ends
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _search_names(universe) -> List[Tuple[str, int, str]]:
+    """(level, code, lowercase name) of every region, constellation and system."""
+    return [
+        (level, code, name.lower())
+        for level, table in (("region", universe.regions), ("constellation", universe.constellations),
+                             ("system", universe.systems))
+        for code, name in enumerate(table)
+    ]
+
+
+class FilterIndex:
+    """Precomputed indexes answering the sidebar filters of a Universe.
+
+    Built once per universe and shared read-only:
+    - region -> constellation -> system hierarchy with pre-sorted name lists,
+    - a contiguous row range for every region, constellation and system,
+    - a packed row bitmap per resource,
+    - a trigram index over lowercase region/constellation/system names
+      (CSR: the sorted entry ids of trigram i are
+      trigram_entries[trigram_indptr[i]:trigram_indptr[i + 1]]).
+    Every filter is answered as a packed bitmap (np.packbits layout) over
+    universe rows, so combining filters is a bitwise AND.
+
+    The ranges, bitmaps and trigram index can be saved with to_arrays() and
+    restored with from_arrays() (the universe snapshot stores them).
+    """
+
+    LEVELS = ("region", "constellation", "system")
+
+    def __init__(self, universe):
+        arrays = {}
+        for level, codes, table in (("region", universe.row_region, universe.regions),
+                                    ("constellation", universe.row_constellation, universe.constellations),
+                                    ("system", universe.row_system, universe.systems)):
+            arrays[f"{level}_starts"], arrays[f"{level}_ends"] = _level_ranges(codes, len(table))
+        bitmaps = np.zeros((len(universe.resources), (universe.num_rows + 7) // 8), dtype=np.uint8)
+        for code in range(len(universe.resources)):
+            bitmaps[code] = np.packbits(universe.row_resource == code)
+        arrays["resource_bitmaps"] = bitmaps
+
+        # Search: trigram -> ids of the (level, code, lowercase name) entries containing it
+        postings: Dict[str, List[int]] = {}
+        for entry, (_, _, lower) in enumerate(_search_names(universe)):
+            for gram in _trigrams(lower):
+                postings.setdefault(gram, []).append(entry)
+        trigrams = sorted(postings)
+        indptr = np.zeros(len(trigrams) + 1, dtype=np.int64)
+        np.cumsum(np.array([len(postings[gram]) for gram in trigrams], dtype=np.int64), out=indptr[1:])
+        arrays["trigram_indptr"] = indptr
+        arrays["trigram_entries"] = np.array([e for gram in trigrams for e in postings[gram]], dtype=np.int32)
+        self._setup(universe, arrays, trigrams)
+
+    @classmethod
+    def from_arrays(cls, universe, arrays: Dict[str, np.ndarray], trigrams: Sequence[str]) -> "FilterIndex":
+        """Restore an index saved with to_arrays() for the same universe."""
+        index = cls.__new__(cls)
+        index._setup(universe, arrays, trigrams)
+        return index
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """The index arrays (see ARRAY_NAMES) and the sorted trigram list."""
+        arrays = {}
+        for level, (starts, ends) in self._ranges.items():
+            arrays[f"{level}_starts"], arrays[f"{level}_ends"] = starts, ends
+        arrays["resource_bitmaps"] = self._resource_bitmaps
+        arrays["trigram_indptr"] = self._trigram_indptr
+        arrays["trigram_entries"] = self._trigram_entries
+        return arrays, list(self._trigram_ids)
+
+    def _setup(self, universe, arrays: Dict[str, np.ndarray], trigrams: Sequence[str]) -> None:
+        self.universe = universe
+        self.num_rows = universe.num_rows
+        self._tables = {
+            "region": universe.regions,
+            "constellation": universe.constellations,
+            "system": universe.systems,
+        }
+        self._codes = {level: {name: code for code, name in enumerate(table)} for level, table in self._tables.items()}
+        self._ranges = {level: (arrays[f"{level}_starts"], arrays[f"{level}_ends"]) for level in self.LEVELS}
+
+        # Hierarchy: parent name -> sorted child names (each child's first row gives its parent)
+        parent_region = universe.row_region[self._ranges["constellation"][0]].tolist()
+        parent_constellation = universe.row_constellation[self._ranges["system"][0]].tolist()
+        self._constellations_by_region: Dict[str, List[str]] = {name: [] for name in universe.regions}
+        for name, parent in zip(universe.constellations, parent_region):
+            self._constellations_by_region[universe.regions[parent]].append(name)
+        self._systems_by_constellation: Dict[str, List[str]] = {name: [] for name in universe.constellations}
+        for name, parent in zip(universe.systems, parent_constellation):
+            self._systems_by_constellation[universe.constellations[parent]].append(name)
+        for children in (*self._constellations_by_region.values(), *self._systems_by_constellation.values()):
+            children.sort()
+        self._sorted = {level: sorted(table) for level, table in self._tables.items()}
+
+        self._resource_bitmaps = arrays["resource_bitmaps"]
+        self._search_names = _search_names(universe)
+        self._trigram_ids = {gram: i for i, gram in enumerate(trigrams)}
+        self._trigram_indptr = arrays["trigram_indptr"]
+        self._trigram_entries = arrays["trigram_entries"]
+
+    def _postings(self, gram: str) -> np.ndarray:
+        i = self._trigram_ids.get(gram)
+        if i is None:
+            return self._trigram_entries[:0]
+        return self._trigram_entries[self._trigram_indptr[i]:self._trigram_indptr[i + 1]]
+
+    # --- Hierarchy lookups ---
+    def regions(self) -> List[str]:
+        return list(self._sorted["region"])
+
+    def constellations(self, regions: Optional[Iterable[str]] = None) -> List[str]:
+        if not regions:
+            return list(self._sorted["constellation"])
+        return sorted(c for r in set(regions) for c in self._constellations_by_region.get(r, ()))
+
+    def systems(self, constellations: Optional[Iterable[str]] = None) -> List[str]:
+        if not constellations:
+            return list(self._sorted["system"])
+        return sorted(s for c in set(constellations) for s in self._systems_by_constellation.get(c, ()))
+
+    # --- Bitmaps ---
+    def _ranges_bitmap(self, ranges: Iterable[Tuple[int, int]]) -> np.ndarray:
+        mask = np.zeros(self.num_rows, dtype=bool)
+        for start, end in ranges:
+            mask[start:end] = True
+        return np.packbits(mask)
+
+    def level_bitmap(self, level: str, names: Sequence[str]) -> np.ndarray:
+        """Rows belonging to any of the named regions/constellations/systems."""
+        codes = self._codes[level]
+        starts, ends = self._ranges[level]
+        return self._ranges_bitmap(
+            (starts[codes[n]], ends[codes[n]]) for n in names if n in codes
+        )
+
+    def resource_bitmap(self, resources: Sequence[str]) -> np.ndarray:
+        """Rows of any of the given resources."""
+        bitmap = np.zeros((self.num_rows + 7) // 8, dtype=np.uint8)
+        for name in resources:
+            code = self.universe.resource_codes.get(name)
+            if code is not None:
+                bitmap |= self._resource_bitmaps[code]
+        return bitmap
+
+    def search_bitmap(self, query: str) -> np.ndarray:
+        """Rows whose system, constellation or region name contains query (case-insensitive)."""
+        query = query.lower()
+        grams = _trigrams(query)
+        if grams:
+            postings = sorted((self._postings(g) for g in grams), key=len)
+            candidates = postings[0]
+            for entries in postings[1:]:
+                candidates = np.intersect1d(candidates, entries, assume_unique=True)
+            candidates = candidates.tolist()
+        else:
+            candidates = range(len(self._search_names))
+        ranges = []
+        for entry in candidates:
+            level, code, lower = self._search_names[entry]
+            if query in lower:
+                starts, ends = self._ranges[level]
+                ranges.append((starts[code], ends[code]))
+        return self._ranges_bitmap(ranges)
+
+    def rows(self, bitmap: np.ndarray) -> np.ndarray:
+        """Sorted row numbers set in a packed bitmap."""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.num_rows))
+
+
+class FilterState:
+    """Per-session memo over a FilterIndex.
+
+    Remembers the bitmap of every filter input and the last combined result,
+    so a rerun where nothing changed costs nothing and a rerun where one
+    filter changed only rebuilds that filter's bitmap before intersecting.
+    """
+
+    def __init__(self, index: FilterIndex):
+        self.index = index
+        self._parts: Dict[str, Tuple[object, np.ndarray]] = {}
+        self._last_key = None
+        self._last_rows: Optional[np.ndarray] = None
+
+    def _part(self, name: str, value, build) -> np.ndarray:
+        cached = self._parts.get(name)
+        if cached is None or cached[0] != value:
+            cached = (value, build(value))
+            self._parts[name] = cached
+        return cached[1]
+
+    def rows(self, regions=(), constellations=(), systems=(), search: str = "", resources=()) -> Optional[np.ndarray]:
+        """Universe rows matching all active filters, or None when no filter is active."""
+        key = (tuple(regions), tuple(constellations), tuple(systems), search.lower(), tuple(resources))
+        if key == self._last_key:
+            return self._last_rows
+
+        index = self.index
+        regions, constellations, systems, search, resources = key
+        parts = []
+        if regions:
+            parts.append(self._part("region", regions, lambda v: index.level_bitmap("region", v)))
+        if constellations:
+            parts.append(self._part("constellation", constellations, lambda v: index.level_bitmap("constellation", v)))
+        if systems:
+            parts.append(self._part("system", systems, lambda v: index.level_bitmap("system", v)))
+        if search:
+            parts.append(self._part("search", search, index.search_bitmap))
+        if resources:
+            parts.append(self._part("resource", resources, index.resource_bitmap))
+
+        if parts:
+            combined = parts[0]
+            for part in parts[1:]:
+                combined = combined & part
+            rows = index.rows(combined)
+        else:
+            rows = None
+        self._last_key, self._last_rows = key, rows
+        return rows
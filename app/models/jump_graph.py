@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Optional, Tuple
+
+
+class JumpGraph:
+    """Stargate adjacency between the systems of a Universe, in CSR form.
+
+    Nodes are universe system codes; the neighbours of system ``s`` are
+    ``indices[indptr[s]:indptr[s + 1]]``. Edges are undirected (every gate
+    is usable both ways). Read-only once built, so it can be shared
+    process-wide like the Universe itself.
+    """
+
+    def __init__(self, num_systems: int, indptr: np.ndarray, indices: np.ndarray):
+        self.num_systems = num_systems
+        self.indptr = indptr
+        self.indices = indices
+        # Python lists of neighbours: BFS over a few hundred nodes is faster
+        # with list access than with per-node NumPy slicing
+        self._neighbours = [
+            indices[indptr[s]:indptr[s + 1]].tolist() for s in range(num_systems)
+        ]
+
+    @classmethod
+    def from_edges(cls, universe, from_systems, to_systems) -> "JumpGraph":
+        """Build the graph from parallel sequences of system names.
+
+        Gates touching a system that is not in the universe are dropped.
+        """
+        codes = universe.system_codes
+        n = len(universe.systems)
+        src = np.array([codes.get(s, -1) for s in from_systems], dtype=np.int64)
+        dst = np.array([codes.get(s, -1) for s in to_systems], dtype=np.int64)
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        src, dst = src[keep], dst[keep]
+        # Both directions, deduplicated and sorted by source
+        pairs = np.unique(np.r_[src * n + dst, dst * n + src])
+        src, dst = pairs // n, pairs % n
+        indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(n, indptr, dst.astype(np.int32))
+
+    @classmethod
+    def load(cls, universe, path: str) -> "JumpGraph":
+        """Load a stargate table with "From System" / "To System" columns (Parquet or CSV)."""
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path, columns=["From System", "To System"])
+        else:
+            df = pd.read_csv(path, usecols=["From System", "To System"])
+        return cls.from_edges(universe, df["From System"].astype(str), df["To System"].astype(str))
+
+    @property
+    def num_gates(self) -> int:
+        return len(self.indices) // 2
+
+    def within(self, start: int, max_jumps: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Systems reachable from `start` in at most `max_jumps` jumps and their hop counts.
+
+        Bounded BFS: only the systems inside the radius are visited.
+        Systems are returned in BFS order (start first, hop 0).
+        """
+        hops = {start: 0}
+        queue = deque([start])
+        neighbours = self._neighbours
+        while queue:
+            system = queue.popleft()
+            depth = hops[system]
+            if depth >= max_jumps:
+                continue
+            for nxt in neighbours[system]:
+                if nxt not in hops:
+                    hops[nxt] = depth + 1
+                    queue.append(nxt)
+        return (np.fromiter(hops.keys(), dtype=np.int32, count=len(hops)),
+                np.fromiter(hops.values(), dtype=np.int32, count=len(hops)))
+
+
+def find_stargates_file(data_path: str) -> Optional[str]:
+    """Return the stargate dataset stored next to the planets dataset, if any."""
+    folder = os.path.dirname(os.path.abspath(data_path))
+    for name in ("stargates.parquet", "stargates.csv"):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            return path
+    return None
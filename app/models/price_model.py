@@ -1,6 +1,53 @@
+import threading
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.valuation import price_vector
 
 @dataclass
 class ResourcePrice:
     name: str
-    price: float 
\ No newline at end of file
+    price: float
+
+
+class PriceSnapshot:
+    """An immutable, named price list.
+
+    ``prices`` is a read-only {resource: price} mapping; ``vector(resources)``
+    is the same list as a read-only float array indexed by resource code,
+    built once per resource tuple. A changed price list is a new snapshot,
+    so holders can compare snapshots by identity.
+    """
+
+    def __init__(self, name: str, prices: Mapping[str, float], source: str = ""):
+        self.name = name
+        self.source = source
+        self.prices: Mapping[str, float] = MappingProxyType(dict(prices))
+        self._vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __repr__(self) -> str:
+        return f"PriceSnapshot({self.name!r}, {len(self.prices)} prices)"
+
+    def vector(self, resources: Sequence[str]) -> np.ndarray:
+        """Read-only price vector indexed by resource code (0.0 when unknown)."""
+        key = tuple(resources)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                vector = price_vector(key, self.prices)
+                vector.setflags(write=False)
+                self._vectors[key] = vector
+        return vector
+
+    def updated(self, changes: Mapping[str, float], name: str = "") -> "PriceSnapshot":
+        """A new snapshot with `changes` applied on top of this one."""
+        prices = dict(self.prices)
+        prices.update(changes)
+        return PriceSnapshot(name or self.name, prices)
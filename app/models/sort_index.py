@@ -0,0 +1,78 @@
+import threading
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+def stable_order(keys: np.ndarray, ascending: bool = True) -> np.ndarray:
+    """Row order sorting `keys`; equal keys keep row order in both directions."""
+    return np.argsort(keys if ascending else -keys.astype(np.float64), kind='stable')
+
+
+def _rank(codes: np.ndarray, table) -> np.ndarray:
+    """Sort key of code-encoded names: the position of each name in sorted order."""
+    ranks = np.empty(len(table), dtype=np.int32)
+    ranks[np.argsort(np.array([str(v) for v in table], dtype=object), kind='stable')] = np.arange(len(table))
+    return ranks[codes]
+
+
+class SortIndex:
+    """Precomputed row orders of a Universe for the analysis table columns.
+
+    Orders of the universe-only columns (names, type, richness, output) are
+    built on first use and shared read-only by all sessions. Sorting a
+    filtered subset is then a gather over the precomputed order instead of
+    a sort; per-user columns (units, values) come from UniverseValuation.
+    """
+
+    COLUMNS = ("Region", "Constellation", "System", "Planet", "Type", "Resource", "Richness", "Output/h/unit")
+
+    def __init__(self, universe):
+        self.universe = universe
+        self._lock = threading.Lock()
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+
+    def _keys(self, column: str) -> np.ndarray:
+        u = self.universe
+        if column == "Region":
+            return _rank(u.row_region, u.regions)
+        if column == "Constellation":
+            return _rank(u.row_constellation, u.constellations)
+        if column == "System":
+            return _rank(u.row_system, u.systems)
+        if column == "Planet":
+            return _rank(u.planet_name[u.row_planet], u.planet_names)
+        if column == "Type":
+            return _rank(u.row_planet_type, [t.value for t in u.planet_types])
+        if column == "Resource":
+            return _rank(u.row_resource, u.resources)
+        if column == "Richness":
+            return _rank(u.row_richness, [r.value for r in u.richness])
+        if column == "Output/h/unit":
+            return u.row_output
+        raise KeyError(f"No precomputed order for column: {column}")
+
+    def order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """Order of all universe rows by a universe-only column."""
+        key = (column, ascending)
+        with self._lock:
+            order = self._orders.get(key)
+            if order is None:
+                order = stable_order(self._keys(column), ascending)
+                order.setflags(write=False)
+                self._orders[key] = order
+        return order
+
+
+def page_rows(order: np.ndarray, rows: Optional[np.ndarray], num_rows: int,
+              offset: int, limit: int) -> Tuple[np.ndarray, int]:
+    """Slice one page out of a full-universe row order, restricted to `rows`.
+
+    rows: the filtered universe rows (None = all rows). Returns the page's
+    rows in display order and the number of rows across all pages.
+    """
+    if rows is None:
+        return order[offset:offset + limit], num_rows
+    selected = np.zeros(num_rows, dtype=bool)
+    selected[rows] = True
+    ordered = order[selected[order]]
+    return ordered[offset:offset + limit], len(ordered)
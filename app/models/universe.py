@@ -0,0 +1,258 @@
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Dict, List, Sequence, Tuple
+from app.models.data_model import Planet, PlanetaryResource, PlanetType, Richness
+
+
+# Columns of the planets dataset the universe is built from
+SOURCE_COLUMNS = ["Planet ID", "Region", "Constellation", "System", "Planet Name",
+                  "Planet Type", "Resource", "Richness", "Output"]
+
+
+def _code_dtype(size: int):
+    """Smallest signed integer dtype able to index a lookup table of `size`."""
+    return np.int16 if size <= np.iinfo(np.int16).max else np.int32
+
+
+def _plain(column) -> pa.Array:
+    """One contiguous, non-dictionary Arrow array for a table column."""
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    return array
+
+
+def _sorted_codes(column) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Dictionary-encode a string column with a sorted, interned dictionary.
+
+    Columns that already are dictionaries (e.g. pandas categoricals) keep
+    their dictionary and are only re-ranked.
+    """
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if not pa.types.is_dictionary(array.type) or array.null_count:
+        array = pc.dictionary_encode(pc.fill_null(_plain(array).cast(pa.string()), ""))
+    dictionary = array.dictionary.cast(pa.string())
+    order = pc.array_sort_indices(dictionary).to_numpy()
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    names = tuple(sys.intern(v) for v in dictionary.take(order).to_pylist())
+    return rank[array.indices.to_numpy()], names
+
+
+class Universe:
+    """Compact, array-backed store of the eve_planets dataset.
+
+    Every resource row lives in parallel typed arrays (int32 planet index,
+    float32 output, uint8 richness/planet type codes and int16 codes into
+    interned string tables for region, constellation, system and resource).
+    Rows are ordered by region, constellation, system and planet, so each
+    level is a contiguous row range; ``planet_offsets[i]:planet_offsets[i + 1]``
+    is the row slice of planet ``i``. Planet/PlanetaryResource objects are
+    only lightweight views created on demand.
+
+    A Universe is read-only once built and may be shared between users and
+    threads; per-user state (mining units) is passed in by the caller.
+    """
+
+    def __init__(self):
+        # Planet level (one entry per planet, in row order)
+        self.planet_ids = np.empty(0, dtype=np.int32)
+        self.planet_offsets = np.zeros(1, dtype=np.int32)
+        self.planet_order = np.empty(0, dtype=np.int32)  # argsort of planet_ids
+        self.planet_region = np.empty(0, dtype=np.int16)
+        self.planet_constellation = np.empty(0, dtype=np.int16)
+        self.planet_system = np.empty(0, dtype=np.int16)
+        self.planet_name = np.empty(0, dtype=np.int32)
+        self.planet_type = np.empty(0, dtype=np.uint8)
+        # Row level (one entry per planetary resource, grouped by planet)
+        self.row_planet = np.empty(0, dtype=np.int32)
+        self.row_region = np.empty(0, dtype=np.int16)
+        self.row_constellation = np.empty(0, dtype=np.int16)
+        self.row_system = np.empty(0, dtype=np.int16)
+        self.row_planet_type = np.empty(0, dtype=np.uint8)
+        self.row_resource = np.empty(0, dtype=np.int16)
+        self.row_richness = np.empty(0, dtype=np.uint8)
+        self.row_output = np.empty(0, dtype=np.float32)
+        # Interned lookup tables for the codes above
+        self.regions: Tuple[str, ...] = ()
+        self.constellations: Tuple[str, ...] = ()
+        self.systems: Tuple[str, ...] = ()
+        self.planet_names: Tuple[str, ...] = ()
+        self.planet_types: Tuple[PlanetType, ...] = ()
+        self.resources: Tuple[str, ...] = ()
+        self.richness: Tuple[Richness, ...] = ()
+        self.resource_codes: Dict[str, int] = {}
+        self.system_codes: Dict[str, int] = {}
+        # Arrow string arrays of the lookup tables, built on first use
+        self._arrow_tables: Dict[str, pa.Array] = {}
+        # Number of rows of each resource (axis 0) in each region (axis 1)
+        self.resource_region_counts = np.zeros((0, 0), dtype=np.int32)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "Universe":
+        """Build the store from the raw eve_planets DataFrame."""
+        return cls.from_arrow(pa.Table.from_pandas(df[SOURCE_COLUMNS], preserve_index=False))
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> "Universe":
+        """Build the store straight from the eve_planets Arrow table.
+
+        String columns are dictionary-encoded with Arrow compute kernels;
+        no pandas frame or per-row Python object is created.
+        """
+        universe = cls()
+
+        region, universe.regions = _sorted_codes(table.column('Region'))
+        constellation, universe.constellations = _sorted_codes(table.column('Constellation'))
+        system, universe.systems = _sorted_codes(table.column('System'))
+        resource, universe.resources = _sorted_codes(table.column('Resource'))
+        name, universe.planet_names = _sorted_codes(table.column('Planet Name'))
+        planet_type, type_names = _sorted_codes(table.column('Planet Type'))
+        richness, richness_names = _sorted_codes(table.column('Richness'))
+        # Planet index in order of first appearance
+        planet_ids = pc.dictionary_encode(_plain(table.column('Planet ID')).cast(pa.int32()))
+        planet, planet_id_values = planet_ids.indices.to_numpy(), planet_ids.dictionary.to_numpy()
+
+        # Order rows by region > constellation > system > planet (first appearance),
+        # so every level of the hierarchy is a contiguous row range. lexsort is
+        # stable, so resources keep their original order within a planet.
+        order = np.lexsort((planet, system, constellation, region))
+        planet = planet[order]
+        starts = np.flatnonzero(np.r_[True, planet[1:] != planet[:-1]])
+        counts = np.diff(np.r_[starts, len(order)])
+        offsets = np.zeros(len(starts) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+
+        universe.planet_ids = np.asarray(planet_id_values, dtype=np.int32)[planet[starts]]
+        universe.planet_offsets = offsets
+        universe.planet_order = np.argsort(universe.planet_ids, kind='stable').astype(np.int32)
+        universe.row_planet = np.repeat(np.arange(len(starts), dtype=np.int32), counts)
+
+        universe.row_region = region[order].astype(_code_dtype(len(universe.regions)))
+        universe.row_constellation = constellation[order].astype(_code_dtype(len(universe.constellations)))
+        universe.row_system = system[order].astype(_code_dtype(len(universe.systems)))
+        universe.system_codes = {name: code for code, name in enumerate(universe.systems)}
+        universe.row_resource = resource[order].astype(_code_dtype(len(universe.resources)))
+        universe.resource_codes = {name: code for code, name in enumerate(universe.resources)}
+        row_name = name[order].astype(np.int32)
+        universe.row_planet_type = planet_type[order].astype(np.uint8)
+        universe.planet_types = tuple(PlanetType(v) for v in type_names)
+        universe.row_richness = richness[order].astype(np.uint8)
+        universe.richness = tuple(Richness(v) for v in richness_names)
+        output = _plain(table.column('Output')).cast(pa.float64(), safe=False)
+        universe.row_output = output.to_numpy(zero_copy_only=False).astype(np.float32)[order]
+
+        planet_rows = offsets[:-1]
+        universe.planet_region = universe.row_region[planet_rows]
+        universe.planet_constellation = universe.row_constellation[planet_rows]
+        universe.planet_system = universe.row_system[planet_rows]
+        universe.planet_name = row_name[planet_rows]
+        universe.planet_type = universe.row_planet_type[planet_rows]
+
+        num_regions = len(universe.regions)
+        cells = universe.row_resource.astype(np.int64) * num_regions + universe.row_region
+        universe.resource_region_counts = np.bincount(
+            cells, minlength=len(universe.resources) * num_regions
+        ).astype(np.int32).reshape(len(universe.resources), num_regions)
+        return universe
+
+    @property
+    def num_planets(self) -> int:
+        return len(self.planet_ids)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.row_output)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and string tables (excluding df)."""
+        total = sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+        for table in (self.regions, self.constellations, self.systems, self.planet_names, self.resources):
+            total += sys.getsizeof(table) + sum(sys.getsizeof(s) for s in table)
+        return total
+
+    def row_key(self, row: int) -> str:
+        """Return the "<planet_id>_<resource>" mining units key of a row."""
+        return f"{self.planet_ids[self.row_planet[row]]}_{self.resources[self.row_resource[row]]}"
+
+    def find_row(self, key: str) -> int:
+        """Return the row of a "<planet_id>_<resource>" key, or -1 if unknown."""
+        planet_id, _, resource = key.partition('_')
+        code = self.resource_codes.get(resource)
+        if code is None or not planet_id.isdigit():
+            return -1
+        pos = int(np.searchsorted(self.planet_ids, int(planet_id), sorter=self.planet_order))
+        if pos >= self.num_planets:
+            return -1
+        index = self.planet_order[pos]
+        if self.planet_ids[index] != int(planet_id):
+            return -1
+        start, end = self.planet_offsets[index], self.planet_offsets[index + 1]
+        hits = np.flatnonzero(self.row_resource[start:end] == code)
+        return int(start + hits[0]) if len(hits) else -1
+
+    def analysis_frame(self) -> pd.DataFrame:
+        """Categorical analysis table with one row per resource row.
+
+        Built straight from the typed arrays (no Python objects); the index is
+        the universe row number, so per-user vectors can be aligned to it.
+        """
+        def categorical(codes, table):
+            return pd.Categorical.from_codes(codes, categories=list(table))
+
+        return pd.DataFrame({
+            "System": categorical(self.row_system, self.systems),
+            "Constellation": categorical(self.row_constellation, self.constellations),
+            "Region": categorical(self.row_region, self.regions),
+            "Planet": categorical(self.planet_name[self.row_planet], self.planet_names),
+            "Type": categorical(self.row_planet_type, [t.value for t in self.planet_types]),
+            "Resource": categorical(self.row_resource, self.resources),
+            "Richness": categorical(self.row_richness, [r.value for r in self.richness]),
+            "Output/h/unit": self.row_output,
+        })
+
+    def _arrow_table(self, name: str) -> pa.Array:
+        array = self._arrow_tables.get(name)
+        if array is None:
+            values = getattr(self, name)
+            array = pa.array([getattr(v, 'value', v) for v in values], type=pa.string())
+            self._arrow_tables[name] = array
+        return array
+
+    def page_table(self, rows: Sequence[int]) -> pa.Table:
+        """Arrow table of the analysis columns for the given rows (in that order).
+
+        Names are gathered from the interned tables with Arrow's take kernel,
+        so only the selected rows are materialized.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        planets = self.row_planet[rows]
+        return pa.table({
+            "Region": self._arrow_table("regions").take(self.row_region[rows]),
+            "Constellation": self._arrow_table("constellations").take(self.row_constellation[rows]),
+            "System": self._arrow_table("systems").take(self.row_system[rows]),
+            "Planet": self._arrow_table("planet_names").take(self.planet_name[planets]),
+            "Type": self._arrow_table("planet_types").take(self.row_planet_type[rows]),
+            "Resource": self._arrow_table("resources").take(self.row_resource[rows]),
+            "Richness": self._arrow_table("richness").take(self.row_richness[rows]),
+            "Output/h/unit": pa.array(self.row_output[rows]),
+        })
+
+    def row_keys(self) -> List[str]:
+        """Return the "<planet_id>_<resource>" key of every row, in row order."""
+        planet_ids = self.planet_ids[self.row_planet].tolist()
+        return [f"{pid}_{self.resources[code]}" for pid, code in zip(planet_ids, self.row_resource.tolist())]
+
+    def build_planets(self, mining_units: Dict[str, int]) -> Dict[int, Planet]:
+        """Return Planet views keyed by planet id, bound to a mining units map."""
+        return {
+            planet_id: Planet(self, index, mining_units)
+            for index, planet_id in enumerate(self.planet_ids.tolist())
+        }
+
+    def resource_view(self, row: int, mining_units: Dict[str, int]) -> PlanetaryResource:
+        """Return a view of a single resource row bound to a mining units map."""
+        return PlanetaryResource(self, row, mining_units)
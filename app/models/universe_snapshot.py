@@ -0,0 +1,157 @@
+"""Precompiled, memory-mapped Universe snapshots.
+
+A snapshot stores everything Universe.from_arrow derives from
+eve_planets.parquet - the typed row/planet arrays, the hierarchy offsets and
+counts, and the interned string tables - plus the FilterIndex built on it
+(level row ranges, resource bitmaps, trigram index) in one flat binary file:
+
+    MAGIC | uint64 header length | JSON header | 64-byte aligned array buffers
+
+The header records the SHA-256 of the source parquet; a snapshot whose
+digest (or format version) does not match is ignored and rebuilt. Loading
+maps the file read-only and wraps the buffers with np.frombuffer, so the
+arrays are shared through the page cache and nothing is parsed or copied.
+
+Build it ahead of time (the Dockerfile does this at image build):
+    python -m app.models.universe_snapshot [data/eve_planets.parquet]
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.models.data_model import PlanetType, Richness
+from app.models.filter_index import FilterIndex
+from app.models.universe import Universe
+
+MAGIC = b"EVEUNIV\0"
+SNAPSHOT_VERSION = 2
+_ALIGN = 64
+_STRING_TABLES = ("regions", "constellations", "systems", "planet_names", "resources")
+_ENUM_TABLES = {"planet_types": PlanetType, "richness": Richness}
+
+
+def snapshot_path(parquet_path: str) -> str:
+    """Snapshot file stored next to the planets dataset."""
+    return os.path.splitext(parquet_path)[0] + ".universe"
+
+
+def source_digest(path: str) -> str:
+    """SHA-256 of a source file, the snapshot's invalidation key."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(universe: Universe, path: str, digest: str, filter_index: Optional[FilterIndex] = None) -> None:
+    """Write the universe and its filter index (built if not given) to path
+    atomically (temp file + rename)."""
+    if filter_index is None:
+        filter_index = FilterIndex(universe)
+    arrays = {name: np.ascontiguousarray(value) for name, value in vars(universe).items()
+              if isinstance(value, np.ndarray)}
+    tables = {name: list(getattr(universe, name)) for name in _STRING_TABLES}
+    tables.update({name: [v.value for v in getattr(universe, name)] for name in _ENUM_TABLES})
+    index_arrays, trigrams = filter_index.to_arrays()
+    index_arrays = {name: np.ascontiguousarray(value) for name, value in index_arrays.items()}
+
+    offset = 0
+    layouts = []
+    for group in (arrays, index_arrays):
+        layout = {}
+        for name, array in group.items():
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset += -(-array.nbytes // _ALIGN) * _ALIGN
+        layouts.append(layout)
+    header = json.dumps({"version": SNAPSHOT_VERSION, "source_sha256": digest,
+                         "arrays": layouts[0], "tables": tables,
+                         "filter_index": {"arrays": layouts[1], "trigrams": trigrams}}).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+
+    folder = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".universe-", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for group, layout in zip((arrays, index_arrays), layouts):
+                for name, array in group.items():
+                    f.seek(data_start + layout[name]["offset"])
+                    f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _map_arrays(buffer: mmap.mmap, data_start: int, layout: Dict[str, dict]) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for name, spec in layout.items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + spec["offset"])
+        arrays[name] = array.reshape(spec["shape"])
+    return arrays
+
+
+def read_snapshot(path: str, digest: str) -> Optional[Tuple[Universe, FilterIndex]]:
+    """Map a snapshot of the source with the given digest; None if missing,
+    stale or corrupt."""
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if buffer[:len(MAGIC)] != MAGIC:
+            return None
+        (header_length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+        if header.get("version") != SNAPSHOT_VERSION or header.get("source_sha256") != digest:
+            return None
+        data_start = -(-(header_start + header_length) // _ALIGN) * _ALIGN
+
+        universe = Universe()
+        for name, array in _map_arrays(buffer, data_start, header["arrays"]).items():
+            setattr(universe, name, array)
+        tables = header["tables"]
+        for name in _STRING_TABLES:
+            setattr(universe, name, tuple(sys.intern(v) for v in tables[name]))
+        for name, enum in _ENUM_TABLES.items():
+            setattr(universe, name, tuple(enum(v) for v in tables[name]))
+        universe.resource_codes = {name: code for code, name in enumerate(universe.resources)}
+        universe.system_codes = {name: code for code, name in enumerate(universe.systems)}
+
+        index = header["filter_index"]
+        index_arrays = _map_arrays(buffer, data_start, index["arrays"])
+        filter_index = FilterIndex.from_arrays(universe, index_arrays, index["trigrams"])
+        return universe, filter_index
+    except (KeyError, TypeError, ValueError, IndexError, struct.error):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the universe snapshot of a planets dataset.")
+    parser.add_argument("data_path", nargs="?", default=os.path.join("data", "eve_planets.parquet"))
+    args = parser.parse_args()
+
+    from app.services.data_service import build_universe_snapshot
+    path = build_universe_snapshot(args.data_path)
+    print(f"wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,145 @@
-from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
 from app.models.data_model import Planet, PlanetaryResource
+from app.models.price_model import PriceSnapshot
+from app.utils.allocation import allocate_units
+from app.utils.instrumentation import instrumented
+from app.utils.valuation import (UniverseValuation, group_totals, level_codes, top_n as select_top_n,
+                                 value_rows_by_prices)
 
+@instrumented("analytics_service")
 class AnalyticsService:
     def __init__(self, data_service, price_service):
         self.data_service = data_service
         self.price_service = price_service
+        self._valuation_cache = None
+
+    def get_valuation(self) -> UniverseValuation:
+        """Value every universe row for the user's current units and prices.
+
+        Reused (with its memoized group totals) until units or prices change.
+        """
+        universe = self.data_service.universe
+        # Snapshot vectors are immutable and memoized: identity means same prices
+        prices = self.price_service.vector(universe.resources)
+        version = self.data_service.units_version
+        cached = self._valuation_cache
+        if cached is None or cached[0] != version or cached[1].prices is not prices:
+            cached = (version, UniverseValuation(universe, prices, self.data_service.mining_units_vector()))
+            self._valuation_cache = cached
+        return cached[1]
         
     def get_most_profitable_planets(self, top_n: int = 10) -> List[Tuple[Planet, float]]:
         """Get the most profitable planets based on current prices"""
-        planets = self.data_service.get_all_planets()
-        prices = self.price_service.get_all_prices()
-        
-        # Calculate value for each planet
-        planet_values = [(planet, planet.total_value(prices)) for planet in planets]
-        
-        # Sort by value descending
-        planet_values.sort(key=lambda x: x[1], reverse=True)
+        universe = self.data_service.universe
+        totals = self.get_valuation().totals("planet")
         
-        return planet_values[:top_n]
+        # Partial selection of the top planets (ties keep universe order)
+        order = select_top_n(totals, top_n)
+        units = self.data_service.mining_units
+        return [(Planet(universe, int(i), units), float(totals[i])) for i in order]
     
     def get_most_profitable_systems(self, top_n: int = 10) -> List[Tuple[str, float]]:
         """Get the most profitable systems based on current prices"""
-        planets = self.data_service.get_all_planets()
-        prices = self.price_service.get_all_prices()
+        universe = self.data_service.universe
+        totals = self.get_valuation().totals("system")
         
-        # Group planets by system
-        systems = {}
-        for planet in planets:
-            if planet.system not in systems:
-                systems[planet.system] = 0
-            systems[planet.system] += planet.total_value(prices)
-        
-        # Convert to list and sort
-        system_values = [(system, value) for system, value in systems.items()]
-        system_values.sort(key=lambda x: x[1], reverse=True)
-        
-        return system_values[:top_n]
+        order = select_top_n(totals, top_n)
+        return [(universe.systems[i], float(totals[i])) for i in order]
+    
+    def compare_price_snapshots(self, snapshots: Sequence[PriceSnapshot], level: str = "region") -> pd.DataFrame:
+        """Value/h of the user's mining units under several price snapshots.
+
+        All snapshots are valued side by side in one pass over the assigned
+        rows, without touching the active prices. Returns one row per
+        `level` group (system, constellation or region) that has units and
+        one column per snapshot name.
+        """
+        universe = self.data_service.universe
+        names = {"system": universe.systems, "constellation": universe.constellations,
+                 "region": universe.regions}[level]
+        units = self.data_service.mining_units_vector()
+        rows = np.flatnonzero(units)
+        values = value_rows_by_prices(universe.row_output[rows], universe.row_resource[rows],
+                                      [s.vector(universe.resources) for s in snapshots], units[rows])
+        codes, size = level_codes(universe, level)
+        codes = codes[rows]
+        groups = np.unique(codes)
+        frame = {level.capitalize(): [names[g] for g in groups.tolist()]}
+        for snapshot, row_values in zip(snapshots, values):
+            frame[snapshot.name] = group_totals(row_values, codes, size)[groups]
+        return pd.DataFrame(frame)
     
     def get_resource_distribution(self, resource_name: str) -> Dict[str, int]:
         """Get distribution of a specific resource across regions"""
-        planets = self.data_service.get_all_planets()
-        distribution = {}
+        universe = self.data_service.universe
+        code = universe.resource_codes.get(resource_name)
+        if code is None:
+            return {}
         
-        for planet in planets:
-            for resource in planet.resources:
-                if resource.resource == resource_name:
-                    if planet.region not in distribution:
-                        distribution[planet.region] = 0
-                    distribution[planet.region] += 1
-        
-        return distribution
+        # Row of the resource x region count matrix built with the universe
+        counts = universe.resource_region_counts[code]
+        return {universe.regions[r]: int(counts[r]) for r in np.flatnonzero(counts)}
     
+    @property
+    def routes_by_jumps(self) -> bool:
+        """Whether get_optimal_mining_route honours max_jumps (a stargate dataset
+        is loaded); UIs should disable their jump limit control otherwise."""
+        return self.data_service.jump_graph is not None
+
     def get_optimal_mining_route(self, starting_system: str, max_jumps: int = 5) -> List[Tuple[Planet, float]]:
-        """Get optimal mining route from a starting system"""
-        # This would require jump distance data which isn't in the dataset
-        # For now, return nearby profitable planets
-        planets = self.data_service.get_all_planets()
-        prices = self.price_service.get_all_prices()
-        
-        # Filter planets in the same constellation as starting system
-        starting_constellation = None
-        for planet in planets:
-            if planet.system == starting_system:
-                starting_constellation = planet.constellation
-                break
-        
-        if not starting_constellation:
+        """Get the most profitable planets within max_jumps of a starting system.
+
+        Without stargate data (see routes_by_jumps) the range is the starting
+        system for max_jumps=0 and its constellation for any other limit.
+        """
+        universe = self.data_service.universe
+        start = universe.system_codes.get(starting_system)
+        if start is None:
             return []
         
-        # Get planets in the same constellation
-        nearby_planets = [p for p in planets if p.constellation == starting_constellation]
+        graph = self.data_service.jump_graph
+        if max_jumps <= 0:
+            nearby = np.flatnonzero(universe.planet_system == start)
+        elif graph is not None:
+            # Bounded BFS over the stargate graph
+            systems, _ = graph.within(start, max_jumps)
+            in_range = np.zeros(len(universe.systems), dtype=bool)
+            in_range[systems] = True
+            nearby = np.flatnonzero(in_range[universe.planet_system])
+        else:
+            # Without stargate data fall back to the starting system's constellation
+            constellation = universe.planet_constellation[np.flatnonzero(universe.planet_system == start)[0]]
+            nearby = np.flatnonzero(universe.planet_constellation == constellation)
+        
+        # Sort by value descending (ties keep universe order)
+        totals = self.get_valuation().totals("planet")
+        order = nearby[np.argsort(-totals[nearby], kind='stable')]
+        units = self.data_service.mining_units
+        return [(Planet(universe, int(i), units), float(totals[i])) for i in order]
+    
+    def optimize_mining_units(self, budget: int, planet_cap: int,
+                              regions: Optional[Sequence[str]] = None,
+                              systems: Optional[Sequence[str]] = None) -> Tuple[Dict[str, int], float]:
+        """Best placement of `budget` mining units at current prices.
         
-        # Calculate value and sort
-        planet_values = [(planet, planet.total_value(prices)) for planet in nearby_planets]
-        planet_values.sort(key=lambda x: x[1], reverse=True)
+        At most `planet_cap` units go to one planet; `regions`/`systems`
+        restrict the candidate planets. Returns the allocation as
+        {"<planet_id>_<resource>": units} and its total value/h.
+        """
+        universe = self.data_service.universe
+        index = self.data_service.filter_index
+        rows = None
+        if regions or systems:
+            bitmap = None
+            for level, names in (("region", regions), ("system", systems)):
+                if names:
+                    part = index.level_bitmap(level, names)
+                    bitmap = part if bitmap is None else bitmap & part
+            rows = index.rows(bitmap)
         
-        return planet_values 
\ No newline at end of file
+        value_per_unit = self.get_valuation().value_per_unit
+        chosen, units = allocate_units(value_per_unit, universe.row_planet, budget, planet_cap, rows)
+        allocation = {universe.row_key(r): int(u) for r, u in zip(chosen.tolist(), units.tolist())}
+        return allocation, float((value_per_unit[chosen] * units).sum())
@@ -1,43 +1,165 @@
+import numpy as np
 import pandas as pd
-import json
+import pyarrow as pa
 import os
-from typing import Dict, List, Optional
-from app.models.data_model import Planet, PlanetaryResource, PlanetType, Richness
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from app.models.data_model import Planet, PlanetaryResource
+from app.models.filter_index import FilterIndex
+from app.models.jump_graph import JumpGraph, find_stargates_file
+from app.models.sort_index import SortIndex
+from app.models.universe import SOURCE_COLUMNS, Universe
+from app.models.universe_snapshot import read_snapshot, snapshot_path, source_digest, write_snapshot
+from app.services.units_log import UnitsLog
+from app.utils.instrumentation import instrumented
 
+# Process-wide, read-only structures keyed by (kind, absolute data path)
+_shared_cache: Dict[Tuple[str, str], object] = {}
+_shared_lock = threading.RLock()
+
+
+def _read_planets_frame(data_path: str) -> pd.DataFrame:
+    """Read the planets dataset from Parquet (or Excel) with compact dtypes"""
+    parquet_path = data_path.replace('.xlsx', '.parquet')
+
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, engine='pyarrow')
+    elif os.path.exists(data_path):
+        df = pd.read_excel(data_path, engine='openpyxl')
+    else:
+        raise FileNotFoundError(f"Data file not found at {data_path} or {parquet_path}")
+
+    # Downcast & optimize dtypes to reduce RAM
+    try:
+        if 'Planet ID' in df.columns:
+            df['Planet ID'] = df['Planet ID'].astype('int32', errors='ignore')
+        if 'Output' in df.columns:
+            df['Output'] = pd.to_numeric(df['Output'], errors='coerce').astype('float32')
+        for col in ['Region', 'Constellation', 'System', 'Planet Name', 'Planet Type', 'Resource', 'Richness']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+    except Exception:
+        pass
+    return df
+
+
+def _read_planets_table(data_path: str) -> pa.Table:
+    """Read the columns the universe needs as an Arrow table.
+
+    Parquet is memory-mapped and only the needed columns are decoded; the
+    Excel fallback goes through pandas.
+    """
+    parquet_path = data_path.replace('.xlsx', '.parquet')
+    if os.path.exists(parquet_path):
+        import pyarrow.parquet as pq  # not needed when the universe snapshot is mapped
+        return pq.read_table(parquet_path, columns=SOURCE_COLUMNS, memory_map=True)
+    return pa.Table.from_pandas(_read_planets_frame(data_path)[SOURCE_COLUMNS], preserve_index=False)
+
+
+def _load_shared(kind: str, data_path: str, build):
+    key = (kind, os.path.abspath(data_path))
+    with _shared_lock:
+        value = _shared_cache.get(key)
+        if value is None:
+            value = build()
+            _shared_cache[key] = value
+    return value
+
+
+def build_universe_snapshot(data_path: str) -> str:
+    """Build the universe from the parquet dataset and write its snapshot; returns the path."""
+    parquet_path = data_path.replace('.xlsx', '.parquet')
+    digest = source_digest(parquet_path)
+    path = snapshot_path(parquet_path)
+    write_snapshot(Universe.from_arrow(_read_planets_table(parquet_path)), path, digest)
+    return path
+
+
+def _open_universe(data_path: str) -> Tuple[Universe, FilterIndex]:
+    """Map the precompiled snapshot of the parquet dataset, or build the
+    universe and its filter index.
+
+    A missing, stale (parquet hash changed) or corrupt snapshot is rebuilt on
+    the way; failing to write it (e.g. a read-only image) only costs the next
+    cold start.
+    """
+    parquet_path = data_path.replace('.xlsx', '.parquet')
+    if not os.path.exists(parquet_path):
+        universe = Universe.from_arrow(_read_planets_table(data_path))
+        return universe, FilterIndex(universe)
+    digest = source_digest(parquet_path)
+    path = snapshot_path(parquet_path)
+    snapshot = read_snapshot(path, digest)
+    if snapshot is None:
+        universe = Universe.from_arrow(_read_planets_table(parquet_path))
+        snapshot = (universe, FilterIndex(universe))
+        try:
+            write_snapshot(universe, path, digest, snapshot[1])
+        except OSError:
+            pass
+    return snapshot
+
+
+def load_universe(data_path: str) -> Universe:
+    """Return the process-wide, read-only Universe for data_path.
+
+    The dataset is mapped (or read and grouped) only once per process; every
+    DataService pointing at the same file shares the result.
+    """
+    return _load_shared("universe", data_path, lambda: _open_universe(data_path))[0]
+
+
+def load_filter_index(data_path: str) -> FilterIndex:
+    """Return the process-wide FilterIndex (hierarchy, resource and search indexes),
+    loaded with the universe."""
+    return _load_shared("universe", data_path, lambda: _open_universe(data_path))[1]
+
+
+def load_sort_index(data_path: str) -> SortIndex:
+    """Return the process-wide SortIndex (column orders are built on first use)."""
+    return _load_shared("sort_index", data_path, lambda: SortIndex(load_universe(data_path)))
+
+
+def load_jump_graph(data_path: str) -> Optional[JumpGraph]:
+    """Return the process-wide stargate graph, or None when no stargate dataset
+    (stargates.parquet / stargates.csv) is stored next to the planets dataset."""
+    path = find_stargates_file(data_path)
+    if path is None:
+        return None
+    return _load_shared("jump_graph", data_path, lambda: JumpGraph.load(load_universe(data_path), path))
+
+
+@instrumented("data_service")
 class DataService:
     def __init__(self, data_path: str, mining_units_path: str = "data/mining_units.json"):
         self.data_path = data_path
         self.mining_units_path = mining_units_path
-        self.df = None
-        self.planets = {}
+        self.universe = None
+        self.filter_index = None
+        self.jump_graph = None
+        self.sort_index = None
         self.resources_set = set()
-        
-    def load_data(self) -> None:
-        """Load data from Parquet or Excel file and merge with mining units"""
-        parquet_path = self.data_path.replace('.xlsx', '.parquet')
-        
-        if os.path.exists(parquet_path):
-            self.df = pd.read_parquet(parquet_path, engine='pyarrow')
-        elif os.path.exists(self.data_path):
-            self.df = pd.read_excel(self.data_path, engine='openpyxl')
-        else:
-            raise FileNotFoundError(f"Data file not found at {self.data_path} or {parquet_path}")
+        # Sparse per-user overlay: "<planet_id>_<resource>" -> units (> 0 only)
+        self.mining_units: Dict[str, int] = {}
+        # Bumped on every change so cached per-session vectors can be refreshed
+        self.units_version = 0
+        # Keys changed since the last save (only these are written)
+        self._dirty_units: Set[str] = set()
+        # (units_version, read-only vector aligned to universe rows)
+        self._units_vector: Optional[Tuple[int, np.ndarray]] = None
+        self._units_log = UnitsLog(mining_units_path)
 
-        # Downcast & optimize dtypes to reduce RAM
-        try:
-            if 'Planet ID' in self.df.columns:
-                self.df['Planet ID'] = self.df['Planet ID'].astype('int32', errors='ignore')
-            if 'Output' in self.df.columns:
-                self.df['Output'] = pd.to_numeric(self.df['Output'], errors='coerce').astype('float32')
-            for col in ['Region', 'Constellation', 'System', 'Planet Name', 'Planet Type', 'Resource', 'Richness']:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].astype('category')
-        except Exception:
-            pass
+    def load_data(self) -> None:
+        """Attach the shared universe and load this user's mining units"""
+        self.universe = load_universe(self.data_path)
+        self.filter_index = load_filter_index(self.data_path)
+        self.jump_graph = load_jump_graph(self.data_path)
+        self.sort_index = load_sort_index(self.data_path)
+        self.resources_set = set(self.universe.resources)
+        self.mining_units = {
+            key: int(units) for key, units in self._load_mining_units().items() if units
+        }
 
-        mining_units = self._load_mining_units()
-        self._process_data(mining_units)
-        
     def _load_mining_units(self) -> Dict[str, int]:
         """Load mining units. Uses SQL backend if enabled, otherwise JSON file.
         For guest sessions (path contains 'user_data/guest'), return empty to avoid
@@ -54,130 +176,118 @@ class DataService:
                 return {}
         except Exception:
             pass
-        if os.path.exists(self.mining_units_path):
-            try:
-                with open(self.mining_units_path, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        return self._units_log.load()
 
     def save_mining_units(self) -> None:
-        """Save mining units. Uses SQL backend if enabled, otherwise JSON file.
+        """Save mining units. Uses SQL backend if enabled, otherwise appends the
+        keys changed since the last save to the JSON snapshot's delta log.
         Skip saving for guest sessions (path contains 'user_data/guest').
         """
-        mining_units = {}
-        for planet in self.planets.values():
-            for resource in planet.resources:
-                if resource.mining_units > 0:
-                    key = f"{resource.planet_id}_{resource.resource}"
-                    mining_units[key] = resource.mining_units
+        changes = {key: self.mining_units.get(key, 0) for key in list(self._dirty_units)}
 
         from app.config import settings
         if settings.DATA_BACKEND == "sql":
             from app.services.mining_units_service_sql import SQLMiningUnitsService
-            SQLMiningUnitsService().save_units_map(mining_units)
-            return
-        try:
-            norm_path = os.path.normpath(self.mining_units_path)
-            if os.sep + "user_data" + os.sep + "guest" + os.sep in norm_path:
-                return  # don't save for guest
-        except Exception:
-            pass
-        os.makedirs(os.path.dirname(self.mining_units_path), exist_ok=True)
-        with open(self.mining_units_path, 'w') as f:
-            json.dump(mining_units, f, indent=4)
-
-    def _process_data(self, mining_units: Dict[str, int]) -> None:
-        """Process the dataframe into Planet and PlanetaryResource objects"""
-        for _, row in self.df.iterrows():
-            planet_id = int(row['Planet ID'])
-            resource = row['Resource']
-            
-            # Add to resource set
-            self.resources_set.add(resource)
-            
-            key = f"{planet_id}_{resource}"
-            num_units = mining_units.get(key, 0)
-
-            # Create planetary resource
-            planetary_resource = PlanetaryResource(
-                planet_id=planet_id,
-                region=row['Region'],
-                constellation=row['Constellation'],
-                system=row['System'],
-                planet_name=row['Planet Name'],
-                planet_type=PlanetType(row['Planet Type']),
-                resource=resource,
-                richness=Richness(row['Richness']),
-                output=float(row['Output']),
-                mining_units=num_units
-            )
-            
-            # Add to planet or create new planet
-            if planet_id not in self.planets:
-                self.planets[planet_id] = Planet(
-                    planet_id=planet_id,
-                    region=row['Region'],
-                    constellation=row['Constellation'],
-                    system=row['System'],
-                    name=row['Planet Name'],
-                    planet_type=PlanetType(row['Planet Type'])
-                )
-            
-            self.planets[planet_id].add_resource(planetary_resource)
-    
+            SQLMiningUnitsService().save_units_map(dict(self.mining_units))
+        else:
+            try:
+                norm_path = os.path.normpath(self.mining_units_path)
+                is_guest = os.sep + "user_data" + os.sep + "guest" + os.sep in norm_path
+            except Exception:
+                is_guest = False
+            if not is_guest:  # don't save for guest
+                self._units_log.append(changes)
+        # Only once saved: keys of a failed save stay dirty and are written next time.
+        # A key edited again since the snapshot stays dirty too (re-checked after
+        # the discard, since edits store the value before marking the key)
+        for key, units in changes.items():
+            self._dirty_units.discard(key)
+            if self.mining_units.get(key, 0) != units:
+                self._dirty_units.add(key)
+
     def get_all_planets(self) -> List[Planet]:
-        """Return list of all planets"""
-        return list(self.planets.values())
+        """Return list of all planets as lightweight views of the shared universe,
+        bound to this user's mining units map."""
+        if self.universe is None:
+            return []
+        return list(self.universe.build_planets(self.mining_units).values())
     
     def get_all_resources(self) -> List[str]:
         """Returns a list of all unique resource names."""
-        if self.df is not None:
-            return self.df['Resource'].unique().tolist()
+        if self.universe is not None:
+            return list(self.universe.resources)
         return []
 
     def get_active_mining_systems(self):
         """Returns a list of systems with active mining units."""
-        if self.df is None or 'Mining Units' not in self.df.columns:
+        if self.universe is None:
             return []
         
-        active_systems_df = self.df[self.df['Mining Units'] > 0]
-        return active_systems_df['System'].unique().tolist()
+        active_rows = np.flatnonzero(self.mining_units_vector())
+        return [self.universe.systems[c] for c in np.unique(self.universe.row_system[active_rows]).tolist()]
 
     def update_dataframe_mining_units(self):
         """
-        Refreshes the 'Mining Units' column in the internal DataFrame
-        based on the current values in the planet objects. This is crucial
-        for other parts of the app to see changes without a full cache clear.
+        Refreshes the cached mining units vector (aligned to the shared
+        analysis frame rows) from the current units map, so other parts of
+        the app see changes without a full cache clear. The shared frame
+        itself is never modified.
         """
-        if self.df is None or not hasattr(self, '_all_planets') or not self._all_planets:
+        if self.universe is None:
             return
         
-        mining_units_map = {
-            f"{resource.planet_id}_{resource.resource}": resource.mining_units
-            for planet in self.get_all_planets() for resource in planet.resources
-        }
-        
-        self.df['Mining Units'] = self.df['id'].map(mining_units_map).fillna(0)
+        # Version first: an edit made while copying then leaves the vector
+        # stale under the old version, so the next read rebuilds it
+        version = self.units_version
+        units = np.zeros(self.universe.num_rows, dtype=np.int32)
+        # Snapshot: sessions sharing the service may edit units meanwhile
+        for key, value in list(self.mining_units.items()):
+            row = self.universe.find_row(key)
+            if row >= 0:
+                units[row] = value
+        units.setflags(write=False)
+        self._units_vector = (version, units)
+
+    def get_mining_units(self, resource_id: str) -> int:
+        """Returns the mining units assigned to a resource id ("<planet_id>_<resource>")."""
+        return self.mining_units.get(resource_id, 0)
+
+    def update_mining_units(self, resource_id: str, new_units: int) -> bool:
+        """Updates the mining units for a specific resource.
+        Returns True if the stored value changed."""
+        new_units = max(int(new_units or 0), 0)
+        if self.mining_units.get(resource_id, 0) == new_units:
+            return False
+        if new_units > 0:
+            self.mining_units[resource_id] = new_units
+        else:
+            self.mining_units.pop(resource_id, None)
+        self._dirty_units.add(resource_id)
+        self.units_version += 1
+        return True
+
+    def update_mining_units_batch(self, changes: Dict[str, int]) -> int:
+        """Applies {"<planet_id>_<resource>": units} changes in one go.
+        Returns the number of entries whose stored value changed."""
+        return sum(1 for resource_id, units in changes.items() if self.update_mining_units(resource_id, units))
 
-    def update_mining_units(self, resource_id, new_units):
-        """Updates the mining units for a specific resource."""
-        if self.df is not None:
-            pass # Placeholder for the new method
+    def mining_units_vector(self) -> np.ndarray:
+        """Returns this user's mining units as a read-only int32 vector aligned to
+        universe rows; rebuilt only after the units changed."""
+        cached = self._units_vector
+        if cached is None or cached[0] != self.units_version:
+            self.update_dataframe_mining_units()
+            cached = self._units_vector
+        return cached[1]
     
     def get_regions(self) -> List[str]:
         """Get list of all regions"""
-        return sorted(self.df['Region'].unique().tolist())
+        return self.filter_index.regions()
     
     def get_constellations(self, regions: Optional[List[str]] = None) -> List[str]:
         """Get list of constellations, optionally filtered by a list of regions"""
-        if regions:
-            return sorted(self.df[self.df['Region'].isin(regions)]['Constellation'].unique().tolist())
-        return sorted(self.df['Constellation'].unique().tolist())
+        return self.filter_index.constellations(regions)
     
     def get_systems(self, constellations: Optional[List[str]] = None) -> List[str]:
         """Get list of systems, optionally filtered by a list of constellations"""
-        if constellations:
-            return sorted(self.df[self.df['Constellation'].isin(constellations)]['System'].unique().tolist())
-        return sorted(self.df['System'].unique().tolist()) 
\ No newline at end of file
+        return self.filter_index.systems(constellations) 
\ No newline at end of file
@@ -1,31 +1,170 @@
 import os
 import json
+import atexit
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from app.config import settings
+from app.utils.instrumentation import timed
+
+# Quiet period (seconds) before coalesced preference changes are written
+FLUSH_DELAY = 1.0
 
 
 def _get_preferences_path(username: str) -> str:
     return os.path.join(settings.DATA_ROOT, "user_data", username, "preferences.json")
 
 
+@timed("prefs.write")
+def _write_atomic(path: str, preferences: dict) -> None:
+    """Write JSON to a temp file in the target folder, then rename it over the target."""
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".preferences-", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(preferences, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _PrefsWriter:
+    """Write-behind store for preference files.
+
+    schedule() only records the latest snapshot per user; a daemon thread
+    writes it once no new change arrived for FLUSH_DELAY seconds, so a burst
+    of widget callbacks costs a single write. Snapshots equal to what is
+    already on disk are dropped. Pending snapshots are flushed on exit.
+    """
+
+    def __init__(self, delay: float = FLUSH_DELAY):
+        self.delay = delay
+        self._cond = threading.Condition()
+        # Held from taking snapshots out of _pending until they are written,
+        # so an older snapshot can never overwrite a newer one
+        self._io_lock = threading.Lock()
+        # username -> (serialized snapshot, due time)
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        # username -> serialized snapshot last written or loaded
+        self._persisted: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="prefs-writer", daemon=True)
+            self._thread.start()
+
+    def schedule(self, username: str, preferences: dict) -> bool:
+        """Queue a snapshot for writing. Returns False when nothing changed."""
+        snapshot = json.dumps(preferences, ensure_ascii=False)
+        with self._cond:
+            pending = self._pending.get(username)
+            latest = pending[0] if pending else self._persisted.get(username)
+            if snapshot == latest:
+                return False
+            self._pending[username] = (snapshot, time.monotonic() + self.delay)
+            self._ensure_thread()
+            self._cond.notify()
+            return True
+
+    def pending(self, username: str) -> Optional[dict]:
+        """The not yet written snapshot of a user, if any."""
+        with self._cond:
+            pending = self._pending.get(username)
+        return json.loads(pending[0]) if pending else None
+
+    def mark_persisted(self, username: str, preferences: dict) -> None:
+        with self._cond:
+            self._persisted[username] = json.dumps(preferences, ensure_ascii=False)
+
+    def write_now(self, username: str, preferences: dict) -> None:
+        """Write a snapshot immediately, replacing any pending one."""
+        with self._io_lock:
+            with self._cond:
+                self._pending.pop(username, None)
+            self._write(username, json.dumps(preferences, ensure_ascii=False))
+
+    def flush(self, username: Optional[str] = None) -> None:
+        """Write pending snapshots now (all users, or only `username`)."""
+        with self._io_lock:
+            with self._cond:
+                names = list(self._pending) if username is None else [username]
+                due = [(n, self._pending.pop(n)[0]) for n in names if n in self._pending]
+            for name, snapshot in due:
+                self._write(name, snapshot)
+
+    def _write(self, username: str, snapshot: str) -> None:
+        try:
+            _write_atomic(_get_preferences_path(username), json.loads(snapshot))
+            with self._cond:
+                self._persisted[username] = snapshot
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                next_due = min(due for _, due in self._pending.values())
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+            with self._io_lock:
+                with self._cond:
+                    now = time.monotonic()
+                    due = [(n, s) for n, (s, t) in self._pending.items() if t <= now]
+                    for name, _ in due:
+                        del self._pending[name]
+                for name, snapshot in due:
+                    self._write(name, snapshot)
+
+
+_writer = _PrefsWriter()
+atexit.register(_writer.flush)
+
+
+@timed("prefs.load")
 def load_prefs(username: str) -> dict:
+    pending = _writer.pending(username)
+    if pending is not None:
+        return pending
     try:
         prefs_path = _get_preferences_path(username)
         os.makedirs(os.path.dirname(prefs_path), exist_ok=True)
         if os.path.exists(prefs_path):
             with open(prefs_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                preferences = json.load(f)
+            _writer.mark_persisted(username, preferences)
+            return preferences
     except Exception:
         pass
     return {}
 
 
+@timed("prefs.save")
 def save_prefs(username: str, preferences: dict) -> None:
-    try:
-        prefs_path = _get_preferences_path(username)
-        os.makedirs(os.path.dirname(prefs_path), exist_ok=True)
-        with open(prefs_path, 'w', encoding='utf-8') as f:
-            json.dump(preferences, f, indent=4, ensure_ascii=False)
-    except Exception:
-        pass
+    """Write preferences immediately (atomically), dropping any pending snapshot."""
+    _writer.write_now(username, preferences)
+
+
+@timed("prefs.schedule_save")
+def schedule_save(username: str, preferences: dict) -> bool:
+    """Queue preferences for a debounced background write.
+
+    Returns False (and writes nothing) when they equal the latest saved or
+    queued snapshot.
+    """
+    return _writer.schedule(username, preferences)
 
 
+def flush_prefs(username: Optional[str] = None) -> None:
+    """Write queued preferences now instead of waiting for the quiet period."""
+    _writer.flush(username)
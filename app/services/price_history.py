@@ -0,0 +1,278 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.utils.filelock import locked
+
+# Price columns kept per resource and day
+PRICE_COLUMNS = ("buy", "sell", "average")
+# Width of the rolling statistics window (calendar days, ending on the row's date)
+ROLLING_DAYS = 7
+_DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})")
+_PARTITIONING_SCHEMA = pa.schema([("date", pa.date32())])
+
+
+def _write_atomic(table: pa.Table, path: str) -> None:
+    import pyarrow.parquet as pq
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".history-", suffix=".tmp", dir=folder)
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def rolling_stats(history: pd.DataFrame) -> pd.DataFrame:
+    """Rolling statistics of the average price per resource and date.
+
+    Price lists covering the same day are averaged into one row first.
+    Windows span ROLLING_DAYS calendar days ending on each date; volatility
+    is the window's standard deviation relative to its mean.
+    """
+    columns = ["resource", "date", "average", "rolling_mean", "rolling_min", "rolling_max", "volatility"]
+    if history.empty:
+        return pd.DataFrame(columns=columns)
+    frame = history.groupby(["resource", "date"], sort=True)["average"].mean().reset_index()
+    rolling = frame.set_index("date").groupby("resource", sort=False)["average"].rolling(f"{ROLLING_DAYS}D")
+    mean = rolling.mean().to_numpy()
+    std = rolling.std(ddof=0).to_numpy()
+    stats = frame.reset_index(drop=True)
+    stats["rolling_mean"] = mean
+    stats["rolling_min"] = rolling.min().to_numpy()
+    stats["rolling_max"] = rolling.max().to_numpy()
+    volatility = np.zeros_like(std)
+    np.divide(std, mean, out=volatility, where=mean != 0)
+    stats["volatility"] = np.nan_to_num(volatility)
+    return stats[columns]
+
+
+def _import_day(filename: str) -> Optional[date]:
+    """The date in a price_imports CSV name, or None for other files."""
+    match = _DATE_PATTERN.search(filename)
+    if not filename.endswith(".csv") or not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class PriceHistoryStore:
+    """A user's daily price history as a date-partitioned Parquet dataset.
+
+    Layout under `root`:
+    - prices/date=YYYY-MM-DD/<source>.parquet: one file per imported price
+      list (resource, buy, sell, average), so queries by date range and
+      resource only read the matching partitions and row groups
+    - stats.parquet: rolling statistics per resource and date, updated
+      incrementally on every append (only dates inside the new day's window
+      are recomputed), so charts read one small file however many days exist
+    - imports.json: the price_imports files already ingested, with their
+      mtime and size
+
+    Writers hold an exclusive lock on history.lock (threads and processes).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.prices_dir = os.path.join(root, "prices")
+        self.stats_path = os.path.join(root, "stats.parquet")
+        self.manifest_path = os.path.join(root, "imports.json")
+        self.lock_path = os.path.join(root, "history.lock")
+        self._stats: Optional[Tuple[int, pd.DataFrame]] = None
+
+    def append(self, day: date, prices: pd.DataFrame, source: str = "manual") -> None:
+        """Store one day's price list (columns resource + buy/sell/average) and update the stats.
+
+        Appending the same source for the same day again replaces it.
+        """
+        with locked(self.lock_path):
+            self._write_day(day, prices, source)
+            self._update_stats(day)
+
+    def _write_day(self, day: date, prices: pd.DataFrame, source: str) -> None:
+        frame = pd.DataFrame({"resource": prices["resource"].astype(str).str.strip()})
+        for column in PRICE_COLUMNS:
+            if column in prices.columns:
+                frame[column] = pd.to_numeric(prices[column], errors="coerce").astype("float64")
+            else:
+                frame[column] = np.nan
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        _write_atomic(table, os.path.join(self.prices_dir, f"date={day.isoformat()}", f"{source}.parquet"))
+
+    def query(self, start: Optional[date] = None, end: Optional[date] = None,
+              resources: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Stored prices (resource, buy, sell, average, date) filtered by date range and resources, sorted by date."""
+        if not os.path.isdir(self.prices_dir):
+            return pd.DataFrame()
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(self.prices_dir, format="parquet",
+                             partitioning=ds.partitioning(_PARTITIONING_SCHEMA, flavor="hive"))
+        condition = None
+        if start is not None:
+            condition = ds.field("date") >= pa.scalar(start, pa.date32())
+        if end is not None:
+            part = ds.field("date") <= pa.scalar(end, pa.date32())
+            condition = part if condition is None else condition & part
+        if resources is not None:
+            part = ds.field("resource").isin(pa.array(list(resources), pa.string()))
+            condition = part if condition is None else condition & part
+        frame = dataset.to_table(filter=condition).to_pandas()
+        if frame.empty:
+            return frame
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.sort_values(by="date", kind="stable").reset_index(drop=True)
+
+    def stats(self, resources: Optional[Iterable[str]] = None, start: Optional[date] = None,
+              end: Optional[date] = None) -> pd.DataFrame:
+        """Precomputed rolling statistics (see rolling_stats), filtered like query()."""
+        stats = self._load_stats()
+        if stats.empty:
+            return stats
+        mask = pd.Series(True, index=stats.index)
+        if resources is not None:
+            mask &= stats["resource"].isin(list(resources))
+        if start is not None:
+            mask &= stats["date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= stats["date"] <= pd.Timestamp(end)
+        return stats[mask].reset_index(drop=True)
+
+    def sync_imports(self, imports_dir: str) -> int:
+        """Append dated CSVs (YYYY-MM-DD in the name; resource, buy, sell, average
+        columns) from a price_imports folder that are new or changed since the
+        last sync. Returns the number of files appended.
+
+        Each file's (mtime, size) is checked against imports.json, so files
+        edited in place are picked up too; unchanged ones are not read. Files
+        deleted or renamed since are dropped from the history.
+        """
+        try:
+            filenames = sorted(os.listdir(imports_dir))
+        except OSError:
+            return 0
+        manifest = self._read_manifest()
+        changed = False
+        appended = []
+        removed = []  # (day, source) partitions of files gone or no longer valid
+        seen = set()
+        for filename in filenames:
+            day = _import_day(filename)
+            if day is None:
+                continue
+            path = os.path.join(imports_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen.add(filename)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            if manifest.get(filename) == signature:
+                continue
+            try:
+                frame = pd.read_csv(path)
+            except Exception:
+                continue  # files that can't be parsed are skipped, as before
+            source = os.path.splitext(filename)[0]
+            if all(column in frame.columns for column in ("resource", *PRICE_COLUMNS)):
+                appended.append((day, frame, source))
+            elif filename in manifest:
+                removed.append((day, source))
+            manifest[filename] = signature
+            changed = True
+        for filename in [name for name in manifest if name not in seen]:
+            day = _import_day(filename)
+            if day is not None:
+                removed.append((day, os.path.splitext(filename)[0]))
+            del manifest[filename]
+            changed = True
+        if not changed:
+            return 0
+        with locked(self.lock_path):
+            for day, frame, source in appended:
+                self._write_day(day, frame, source)
+            for day, source in removed:
+                self._remove_day(day, source)
+            days = [day for day, _, _ in appended] + [day for day, _ in removed]
+            if days:
+                # One stats update from the earliest changed day covers all of them
+                self._update_stats(min(days))
+            self._write_manifest(manifest)
+        return len(appended)
+
+    def _remove_day(self, day: date, source: str) -> None:
+        folder = os.path.join(self.prices_dir, f"date={day.isoformat()}")
+        try:
+            os.remove(os.path.join(folder, f"{source}.parquet"))
+        except FileNotFoundError:
+            return
+        try:
+            os.rmdir(folder)  # only once the day's last price list is gone
+        except OSError:
+            pass
+
+    def _read_manifest(self) -> Dict[str, list]:
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, list]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_stats(self) -> pd.DataFrame:
+        try:
+            mtime = os.stat(self.stats_path).st_mtime_ns
+        except OSError:
+            return rolling_stats(pd.DataFrame())
+        cached = self._stats
+        if cached is None or cached[0] != mtime:
+            import pyarrow.parquet as pq
+            stats = pq.read_table(self.stats_path).to_pandas()
+            stats["date"] = pd.to_datetime(stats["date"])
+            cached = self._stats = (mtime, stats)
+        return cached[1]
+
+    def _update_stats(self, day: date) -> None:
+        # Rows dated from `day` on depend on the window that starts ROLLING_DAYS - 1 days earlier
+        recomputed = rolling_stats(self.query(start=day - timedelta(days=ROLLING_DAYS - 1)))
+        recomputed = recomputed[recomputed["date"] >= pd.Timestamp(day)]
+        kept = self._load_stats()
+        kept = kept[kept["date"] < pd.Timestamp(day)]
+        stats = pd.concat([kept, recomputed], ignore_index=True) if not kept.empty else recomputed
+        stats = stats.sort_values(["resource", "date"], kind="stable").reset_index(drop=True)
+        _write_atomic(pa.Table.from_pandas(stats, preserve_index=False), self.stats_path)
+
+
+_stores: Dict[str, PriceHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def history_store(root: str) -> PriceHistoryStore:
+    """Return the process-wide PriceHistoryStore of a history folder."""
+    root = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = PriceHistoryStore(root)
+    return store
@@ -0,0 +1,447 @@
+import codecs
+import csv
+import io
+import itertools
+import json
+import re
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.models.price_model import PriceSnapshot
+
+# Header aliases (lower-case). Price columns are in order of preference: each
+# row takes the first one holding a number.
+NAME_COLUMNS = ("resource", "name", "item", "resource_name", "resource_name_collection.0",
+                "item_name", "type_name", "typename")
+PRICE_COLUMNS = ("average", "avg", "average_price", "cena średnia", "cena_srednia",
+                 "buy", "cena kupna", "cena_kupna", "price", "sell")
+MARKET_COLUMNS = ("region", "region_name", "market", "hub", "station", "location")
+
+# Bytes read up front to sniff the format and header
+SNIFF_BYTES = 64 * 1024
+# Bytes parsed per chunk (CSV block / JSON read size)
+CHUNK_BYTES = 1 << 20
+# JSON records converted per batch
+JSON_BATCH = 50_000
+# Characters a single JSON record may span; text that still doesn't decode is malformed
+MAX_RECORD_CHARS = 1 << 20
+_NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+# An object whose first value is a list: columnar JSON ({"name": [...], "average": [...]})
+_COLUMNAR = re.compile(r'\{\s*"(?:[^"\\]|\\.)*"\s*:\s*\[')
+
+
+class DumpFormat:
+    """What sniff() found: the format and the columns to read.
+
+    kind is "csv", "json" (an array of records or newline-delimited records),
+    "columns" (one object of equal-length column lists, read whole) or
+    "mapping" (one {resource: price} object, read whole); columns are header
+    names as written in the file.
+    """
+
+    __slots__ = ("kind", "delimiter", "name_column", "price_columns", "market_column")
+
+    def __init__(self, kind: str, delimiter: str = ",", name_column: Optional[str] = None,
+                 price_columns: Sequence[str] = (), market_column: Optional[str] = None):
+        self.kind = kind
+        self.delimiter = delimiter
+        self.name_column = name_column
+        self.price_columns = list(price_columns)
+        self.market_column = market_column
+
+    def __repr__(self) -> str:
+        return (f"DumpFormat({self.kind!r}, name={self.name_column!r}, prices={self.price_columns!r}, "
+                f"market={self.market_column!r})")
+
+
+def _resolve(columns: Sequence[str], price_column: Optional[str], market_column: Optional[str],
+             kind: str, delimiter: str = ",") -> DumpFormat:
+    normalized = {str(c).strip().lower(): c for c in columns}
+    name = next((normalized[c] for c in NAME_COLUMNS if c in normalized), None)
+    if name is None:
+        raise ValueError(f"no resource column (one of {', '.join(NAME_COLUMNS)}) in {list(columns)}")
+    if price_column is not None:
+        if price_column.strip().lower() not in normalized:
+            raise ValueError(f"price column {price_column!r} not in {list(columns)}")
+        prices = [normalized[price_column.strip().lower()]]
+    else:
+        prices = [normalized[c] for c in PRICE_COLUMNS if c in normalized]
+        if not prices:
+            raise ValueError(f"no price column (one of {', '.join(PRICE_COLUMNS)}) in {list(columns)}")
+    if market_column is not None:
+        market = normalized.get(market_column.strip().lower())
+        if market is None:
+            raise ValueError(f"market column {market_column!r} not in {list(columns)}")
+    else:
+        market = next((normalized[c] for c in MARKET_COLUMNS if c in normalized), None)
+    return DumpFormat(kind, delimiter, name, prices, market)
+
+
+def sniff(head: bytes, price_column: Optional[str] = None, market_column: Optional[str] = None) -> DumpFormat:
+    """Detect format, delimiter and columns from the first bytes of a dump.
+
+    Raises ValueError when the resource or price column can't be found.
+    """
+    text = head.decode("utf-8", errors="ignore").lstrip("\ufeff")
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return _resolve(_head_keys(stripped, 1), price_column, market_column, "json")
+    if _COLUMNAR.match(stripped):
+        return DumpFormat("columns")  # columns are resolved once the object is loaded
+    if stripped.startswith("{"):
+        try:
+            keys = _head_keys(stripped, 0)
+        except ValueError:
+            keys = []  # one object larger than the sniffed bytes: a {resource: price} mapping
+        if any(str(k).strip().lower() in NAME_COLUMNS for k in keys):
+            return _resolve(keys, price_column, market_column, "json")
+        return DumpFormat("mapping")
+    header = text.split("\n", 1)[0].rstrip("\r")
+    try:
+        delimiter = csv.Sniffer().sniff(header, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+    columns = next(csv.reader([header], delimiter=delimiter), [])
+    return _resolve(columns, price_column, market_column, "csv", delimiter)
+
+
+def _head_keys(text: str, pos: int) -> List[str]:
+    """Keys of the JSON records that fit in the sniffed text, in first-seen order
+    (records may omit columns, e.g. a buy price instead of an average)."""
+    decoder = json.JSONDecoder()
+    keys: Dict[str, None] = {}
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            record, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            break
+        if not isinstance(record, dict):
+            break
+        keys.update(dict.fromkeys(record))
+    if not keys:
+        raise ValueError("no complete JSON record in the first bytes of the dump")
+    return list(keys)
+
+
+class MarketPrices:
+    """Mean (or last, see import_prices) price per market and resource collected from a dump.
+
+    ``resources`` is the resource list the prices are aligned to (the
+    universe's when the import was filtered); ``markets`` are the values of
+    the market column ("" without one). ``rows_skipped`` counts CSV rows
+    that couldn't be parsed (e.g. a wrong number of fields).
+    """
+
+    def __init__(self, resources: Sequence[str], markets: Sequence[str], sums: np.ndarray,
+                 counts: np.ndarray, rows_read: int, dump_format: DumpFormat, rows_skipped: int = 0):
+        self.resources = tuple(resources)
+        self.markets = tuple(markets)
+        self.sums = sums
+        self.counts = counts
+        self.rows_read = rows_read
+        self.rows_skipped = rows_skipped
+        self.format = dump_format
+
+    @property
+    def rows_kept(self) -> int:
+        return int(self.counts.sum())
+
+    def vector(self, market: Optional[str] = None) -> np.ndarray:
+        """Prices aligned to `resources` (0.0 without rows): one market, or the
+        mean of the per-market means when market is None."""
+        if market is not None:
+            index = self.markets.index(market)
+            sums, counts = self.sums[index], self.counts[index]
+            return np.divide(sums, counts, out=np.zeros(len(self.resources)), where=counts > 0)
+        means = np.divide(self.sums, self.counts, out=np.zeros_like(self.sums), where=self.counts > 0)
+        present = (self.counts > 0).sum(axis=0)
+        return np.divide(means.sum(axis=0), present, out=np.zeros(len(self.resources)), where=present > 0)
+
+    def prices(self, market: Optional[str] = None) -> Dict[str, float]:
+        """{resource: price} for the resources that had rows (see vector)."""
+        vector = self.vector(market)
+        counts = self.counts[self.markets.index(market)] if market is not None else self.counts.sum(axis=0)
+        present = np.flatnonzero(counts)
+        return dict(zip([self.resources[i] for i in present.tolist()], vector[present].tolist()))
+
+    def snapshot(self, name: str, market: Optional[str] = None, source: str = "") -> PriceSnapshot:
+        return PriceSnapshot(name, self.prices(market), source=source)
+
+
+class _Accumulator:
+    """Per (market, resource) sums and counts, grown as new names appear.
+
+    With `keep_last` a later row replaces an earlier one instead of adding
+    to it (count 1), like a price list edited by appending a line.
+    """
+
+    def __init__(self, resources: Optional[Sequence[str]], keep_last: bool = False):
+        self.keep_last = keep_last
+        self.fixed = resources is not None
+        self.names: List[str] = list(resources) if resources is not None else []
+        self.value_set = pa.array(self.names, pa.string()) if self.fixed else None
+        self.markets: List[str] = []
+        self.sums = np.zeros((0, len(self.names)))
+        self.counts = np.zeros((0, len(self.names)), dtype=np.int64)
+        self.rows_read = 0
+        self.rows_skipped = 0
+
+    @staticmethod
+    def _encode(values: pa.Array, names: List[str]) -> np.ndarray:
+        encoded = pc.dictionary_encode(values)
+        dictionary = encoded.dictionary
+        lookup = np.full(len(dictionary) + 1, -1, dtype=np.int64)
+        if names:
+            found = pc.index_in(dictionary, value_set=pa.array(names, pa.string()))
+            lookup[:-1] = pc.fill_null(found, -1).to_numpy()
+        # Values not seen before get the next codes, in order of appearance
+        new = np.flatnonzero(lookup[:-1] < 0)
+        if len(new):
+            lookup[new] = np.arange(len(names), len(names) + len(new))
+            names.extend(dictionary.take(pa.array(new)).to_numpy(zero_copy_only=False).tolist())
+        return lookup[pc.fill_null(encoded.indices, -1).to_numpy()]
+
+    def add(self, names: pa.Array, prices: pa.Array, markets: Optional[pa.Array]) -> None:
+        self.rows_read += len(names)
+        names = pc.utf8_trim_whitespace(names)
+        if self.fixed:
+            codes = pc.fill_null(pc.index_in(names, value_set=self.value_set), -1).to_numpy().astype(np.int64)
+        else:
+            codes = self._encode(names, self.names)
+        values = pc.fill_null(prices, np.nan).to_numpy(zero_copy_only=False)
+        keep = (codes >= 0) & ~np.isnan(values)
+        if markets is None:
+            market_ids = np.zeros(len(codes), dtype=np.int64)
+            if not self.markets:
+                self.markets.append("")
+        else:
+            market_ids = self._encode(pc.fill_null(pc.utf8_trim_whitespace(markets), ""),
+                                      self.markets)
+        codes, values, market_ids = codes[keep], values[keep], market_ids[keep]
+        shape = (len(self.markets), len(self.names))
+        if self.sums.shape != shape:
+            grown = np.zeros(shape)
+            grown[:self.sums.shape[0], :self.sums.shape[1]] = self.sums
+            grown_counts = np.zeros(shape, dtype=np.int64)
+            grown_counts[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+            self.sums, self.counts = grown, grown_counts
+        flat = market_ids * shape[1] + codes
+        size = shape[0] * shape[1]
+        if self.keep_last:
+            cells, first = np.unique(flat[::-1], return_index=True)
+            self.sums.reshape(-1)[cells] = values[len(flat) - 1 - first]
+            self.counts.reshape(-1)[cells] = 1
+        else:
+            self.sums += np.bincount(flat, weights=values, minlength=size).reshape(shape)
+            self.counts += np.bincount(flat, minlength=size).reshape(shape)
+
+    def result(self, dump_format: DumpFormat) -> MarketPrices:
+        return MarketPrices(self.names, self.markets, self.sums, self.counts, self.rows_read, dump_format,
+                            self.rows_skipped)
+
+
+def _strings(values: Iterable) -> pa.Array:
+    return pa.array([None if v is None else str(v) for v in values], pa.string())
+
+
+def _to_float(values: pa.Array) -> pa.Array:
+    """Numbers in a string column as float64; anything else becomes null."""
+    trimmed = pc.utf8_trim_whitespace(values)
+    try:
+        return pc.cast(trimmed, pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # Some cell is not a number: null those out first (slower, so only on demand)
+        return pc.cast(pc.if_else(pc.match_substring_regex(trimmed, _NUMBER), trimmed, None), pa.float64())
+
+
+class _Prefixed(io.RawIOBase):
+    """A stream whose first bytes were already read for sniffing."""
+
+    def __init__(self, head: bytes, rest: BinaryIO):
+        self._head = memoryview(head)
+        self._rest = rest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._rest.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _read_head(stream: BinaryIO) -> bytes:
+    """At least SNIFF_BYTES (or everything) and always a complete first line."""
+    head = stream.read(SNIFF_BYTES)
+    while head and b"\n" not in head:
+        more = stream.read(SNIFF_BYTES)
+        if not more:
+            break
+        head += more
+    return head
+
+
+def _add_columns(acc: _Accumulator, fmt: DumpFormat, column: Callable[[str], pa.Array]) -> None:
+    """Add one batch given a function returning each needed column as strings."""
+    prices = [_to_float(column(c)) for c in fmt.price_columns]
+    price = prices[0] if len(prices) == 1 else pc.coalesce(*prices)
+    acc.add(column(fmt.name_column), price, column(fmt.market_column) if fmt.market_column else None)
+
+
+def _csv_blocks(stream: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    """The stream in blocks of about chunk_bytes that end on a line break
+    outside quotes, so quoted values spanning lines stay in one block."""
+    pending: List[bytes] = []
+    in_quotes = False  # state after everything read so far
+    while True:
+        chunk = stream.read(chunk_bytes)
+        if not chunk:
+            if pending:
+                yield b"".join(pending)
+            return
+        if not in_quotes and b'"' not in chunk:
+            end = chunk.rfind(b"\n") + 1
+        else:
+            # Line breaks preceded by an even number of quotes (an escaped "" counts twice)
+            data = np.frombuffer(chunk, dtype=np.uint8)
+            quotes = np.flatnonzero(data == 0x22)
+            breaks = np.flatnonzero(data == 0x0A)
+            breaks = breaks[((np.searchsorted(quotes, breaks) + in_quotes) & 1) == 0]
+            end = int(breaks[-1]) + 1 if len(breaks) else 0
+            in_quotes = bool((len(quotes) + in_quotes) & 1)
+        if end:
+            pending.append(chunk[:end])
+            yield b"".join(pending)
+            pending = [chunk[end:]]
+        else:
+            pending.append(chunk)
+
+
+def _import_csv(stream: BinaryIO, fmt: DumpFormat, acc: _Accumulator, chunk_bytes: int) -> None:
+    import pyarrow.csv as pacsv  # not needed at app startup
+    include = [fmt.name_column] + fmt.price_columns + ([fmt.market_column] if fmt.market_column else [])
+    read_options = pacsv.ReadOptions(use_threads=False)
+
+    def skip(row) -> str:
+        acc.rows_skipped += 1
+        return "skip"
+
+    parse_options = pacsv.ParseOptions(delimiter=fmt.delimiter, newlines_in_values=True, invalid_row_handler=skip)
+    convert_options = pacsv.ConvertOptions(include_columns=include, strings_can_be_null=True,
+                                           column_types={c: pa.string() for c in include})
+    # Blocks are read here and parsed from memory on this thread: pyarrow's
+    # streaming and threaded readers left worker threads behind that could
+    # abort the interpreter at exit. Each block gets the header line prepended.
+    blocks = _csv_blocks(stream, chunk_bytes)
+    first = next(blocks, b"")
+    header_end = first.find(b"\n") + 1 or len(first)
+    header = first[:header_end]
+    for block in itertools.chain([first[header_end:]], blocks):
+        table = pacsv.read_csv(pa.BufferReader(header + block), read_options=read_options,
+                               parse_options=parse_options, convert_options=convert_options)
+        if not table.num_rows:
+            continue
+        table = table.combine_chunks()
+        _add_columns(acc, fmt, lambda name: table.column(name).chunk(0))
+
+
+def _iter_json_records(stream: BinaryIO, chunk_bytes: int) -> Iterator[dict]:
+    """Records of a JSON array or of newline-delimited JSON, decoded incrementally.
+
+    Raises ValueError at a record that doesn't decode within MAX_RECORD_CHARS
+    (or by the end of the stream), so a malformed record neither drops the
+    rest of the dump silently nor buffers it all.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer, pos, eof, offset = "", 0, False, 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,[]\ufeff":
+            pos += 1
+        if pos < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof or len(buffer) - pos > MAX_RECORD_CHARS:
+                    raise ValueError(f"malformed JSON record at character {offset + pos}: {e.msg}") from None
+            else:
+                if end < len(buffer) or eof:
+                    pos = end
+                    yield record
+                    continue
+        if eof:
+            return
+        chunk = stream.read(chunk_bytes)
+        eof = not chunk
+        offset += pos
+        buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+
+def _import_json(stream: BinaryIO, fmt: DumpFormat, acc: _Accumulator, chunk_bytes: int) -> None:
+    def flush(records: List[dict]) -> None:
+        _add_columns(acc, fmt, lambda name: _strings(r.get(name) for r in records))
+
+    batch: List[dict] = []
+    for record in _iter_json_records(stream, chunk_bytes):
+        if isinstance(record, dict):
+            batch.append(record)
+        if len(batch) >= JSON_BATCH:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+def import_prices(source: Union[str, BinaryIO], resources: Optional[Sequence[str]] = None,
+                  price_column: Optional[str] = None, market_column: Optional[str] = None,
+                  chunk_bytes: int = CHUNK_BYTES, keep_last: bool = False) -> MarketPrices:
+    """Stream a CSV or JSON market dump (path or binary file object) into MarketPrices.
+
+    The format and header are sniffed once from the first bytes, then the
+    dump is parsed chunk by chunk: memory stays bounded by the chunk size and
+    the number of (market, resource) pairs, whatever the dump's size. With
+    `resources` (e.g. the universe's), rows for other items are dropped as
+    they are read. `price_column` / `market_column` override the detected
+    columns (e.g. one market's column of a wide dump). Rows repeating a
+    (market, resource) are averaged, or with `keep_last` the last one wins.
+    Raises ValueError when the resource or price column can't be found.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return import_prices(f, resources, price_column, market_column, chunk_bytes, keep_last)
+    head = _read_head(source)
+    fmt = sniff(head, price_column, market_column)
+    stream = io.BufferedReader(_Prefixed(head, source), buffer_size=chunk_bytes)
+    acc = _Accumulator(resources, keep_last)
+    if fmt.kind == "csv":
+        _import_csv(stream, fmt, acc, chunk_bytes)
+    elif fmt.kind == "json":
+        _import_json(stream, fmt, acc, chunk_bytes)
+    else:
+        # Columnar JSON or a {resource: price} object (like prices.json) is read whole
+        data = json.loads(stream.read().decode("utf-8-sig"))
+        if not isinstance(data, dict):
+            raise ValueError("unsupported JSON layout")
+        lists = [isinstance(v, list) for v in data.values()]
+        if data and all(lists):
+            if len({len(v) for v in data.values()}) > 1:
+                raise ValueError("columnar JSON with columns of different lengths")
+            fmt = _resolve(list(data), price_column, market_column, "columns")
+            _add_columns(acc, fmt, lambda name: _strings(data[name]))
+        elif any(lists):
+            raise ValueError("unsupported JSON layout: a mix of lists and prices")
+        else:
+            fmt = DumpFormat("mapping")
+            acc.add(_strings(data), _to_float(_strings(data.values())), None)
+    return acc.result(fmt)
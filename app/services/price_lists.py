@@ -0,0 +1,86 @@
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.models.price_model import PriceSnapshot
+from app.services import price_import
+
+PRICE_FILE_EXTENSIONS = (".json", ".csv")
+
+
+def parse_price_file(path: str) -> Dict[str, float]:
+    """Parse a price file into {resource: price}; {} when unreadable.
+
+    Any layout price_import reads: a {resource: price} JSON object, JSON
+    records or columns, or a CSV with a resource column. Columns and their
+    preference order are price_import's (NAME_COLUMNS, PRICE_COLUMNS), so a
+    file yields the same prices here as through "Import Market Dump". A
+    resource listed twice takes its last price.
+    """
+    try:
+        return price_import.import_prices(path, keep_last=True).prices()
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+# Parsed files keyed by absolute path, valid while (mtime, size) is unchanged
+_price_lists: Dict[str, Tuple[Tuple[int, int], PriceSnapshot]] = {}
+# Price files per folder, valid while the folder's mtime is unchanged
+_folders: Dict[str, Tuple[int, Dict[str, str]]] = {}
+_lock = threading.Lock()
+
+
+def load_price_list(path: str) -> Optional[PriceSnapshot]:
+    """Return the process-wide snapshot of a price file (named after the file), or None if missing.
+
+    The file is parsed again only when its modification time or size changed,
+    so switching between price lists is a dictionary lookup. Snapshots are
+    immutable and shared by every session of the process.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _price_lists.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    price_list = PriceSnapshot(os.path.basename(path), parse_price_file(path), source=path)
+    with _lock:
+        _price_lists[path] = (key, price_list)
+    return price_list
+
+
+def list_price_files(folders: Iterable[str]) -> Dict[str, str]:
+    """{file name: path} of the .json/.csv price files in folders (later folders win).
+
+    Each folder is listed again only when its modification time changed
+    (a file was added, removed or renamed).
+    """
+    files: Dict[str, str] = {}
+    for folder in folders:
+        with _lock:
+            cached = _folders.get(folder)
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, {
+                    name: os.path.join(folder, name)
+                    for name in os.listdir(folder)
+                    if name.lower().endswith(PRICE_FILE_EXTENSIONS)
+                })
+                with _lock:
+                    _folders[folder] = cached
+        except OSError:
+            continue
+        files.update(cached[1])
+    return files
+
+
+def clear_cache() -> None:
+    """Forget all parsed price files and folder listings."""
+    with _lock:
+        _price_lists.clear()
+        _folders.clear()
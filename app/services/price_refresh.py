@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.models.price_model import PriceSnapshot
+from app.services import price_import
+
+# Seconds to wait for the market API before giving up
+REQUEST_TIMEOUT = 20
+
+
+class FeedState:
+    """Latest known state of one price feed URL.
+
+    ``snapshot`` is the last successfully parsed price list and ``version``
+    counts how often it changed (a 304 Not Modified keeps both), so a
+    session can tell whether it has applied the current one.
+    """
+
+    __slots__ = ("url", "resources", "snapshot", "version", "etag", "last_modified", "checked_at", "error",
+                 "pending")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.resources: Optional[Tuple[str, ...]] = None
+        self.snapshot: Optional[PriceSnapshot] = None
+        self.version = 0
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+        self.pending = False
+
+
+class PriceRefresher:
+    """Process-wide, non-blocking refresh of market price feeds.
+
+    Sessions call request_refresh(url) and read state(url) on their next
+    rerun; a single background worker does the HTTP work. Responses are
+    cached for `ttl` seconds and shared by every user of the process;
+    after that the worker revalidates with If-None-Match /
+    If-Modified-Since, so an unchanged feed costs a 304 and no parsing.
+    One pooled requests.Session keeps connections alive between refreshes.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, timeout: float = REQUEST_TIMEOUT):
+        self.ttl = settings.PRICE_FEED_TTL if ttl is None else ttl
+        self.timeout = timeout
+        self._feeds: Dict[str, FeedState] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._session = None
+
+    def state(self, url: str) -> FeedState:
+        with self._lock:
+            feed = self._feeds.get(url)
+            if feed is None:
+                feed = self._feeds[url] = FeedState(url)
+            return feed
+
+    def is_fresh(self, url: str) -> bool:
+        feed = self.state(url)
+        return feed.snapshot is not None and time.time() - feed.checked_at < self.ttl
+
+    def request_refresh(self, url: str, force: bool = False, resources: Optional[Sequence[str]] = None) -> bool:
+        """Queue a background refresh unless the cached response is still fresh
+        (or a refresh is already queued). Returns True if one was queued.
+
+        `resources` limits the kept rows to those resources (see
+        price_import.import_prices); it applies from the next download on.
+        """
+        feed = self.state(url)
+        with self._lock:
+            if resources is not None:
+                feed.resources = tuple(resources)
+            if feed.pending or (not force and feed.snapshot is not None
+                                and time.time() - feed.checked_at < self.ttl):
+                return False
+            feed.pending = True
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="price-refresh", daemon=True)
+                self._worker.start()
+        self._queue.put(url)
+        return True
+
+    def wait(self, url: str, timeout: Optional[float] = None) -> FeedState:
+        """Block until no refresh of `url` is pending (for scripts and tests)."""
+        feed = self.state(url)
+        with self._changed:
+            self._changed.wait_for(lambda: not feed.pending, timeout)
+        return feed
+
+    def refresh(self, url: str) -> FeedState:
+        """Fetch `url` now (conditionally when a response is cached) and update its state."""
+        feed = self.state(url)
+        headers = {}
+        if feed.snapshot is not None:
+            if feed.etag:
+                headers["If-None-Match"] = feed.etag
+            if feed.last_modified:
+                headers["If-Modified-Since"] = feed.last_modified
+        try:
+            # Streamed: large dumps are parsed chunk by chunk as they arrive
+            with self._http().get(url, headers=headers, timeout=self.timeout, stream=True) as resp:
+                if resp.status_code == 304 and feed.snapshot is not None:
+                    update = {}
+                else:
+                    resp.raise_for_status()
+                    resp.raw.decode_content = True
+                    market = price_import.import_prices(resp.raw, resources=feed.resources)
+                    if not market.rows_kept:
+                        raise ValueError("no prices found in the response")
+                    update = {"snapshot": market.snapshot(url, source=url),
+                              "etag": resp.headers.get("ETag"),
+                              "last_modified": resp.headers.get("Last-Modified")}
+            error = None
+        except Exception as e:
+            update, error = {}, str(e) or type(e).__name__
+        with self._changed:
+            if "snapshot" in update:
+                feed.snapshot = update["snapshot"]
+                feed.etag = update["etag"]
+                feed.last_modified = update["last_modified"]
+                feed.version += 1
+            if error is None:
+                feed.checked_at = time.time()
+            feed.error = error
+            feed.pending = False
+            self._changed.notify_all()
+        return feed
+
+    def _http(self):
+        if self._session is None:
+            import requests  # only needed once a feed is refreshed; keeps it out of app startup
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _run(self) -> None:
+        while True:
+            url = self._queue.get()
+            self.refresh(url)
+
+
+refresher = PriceRefresher()
@@ -1,150 +1,141 @@
 import pandas as pd
 import json
 import os
-import re
-from datetime import datetime
-from typing import Dict, List
-from app.models.price_model import ResourcePrice
-import requests
+from datetime import date
+from typing import Dict, List, Mapping, Optional, Sequence
+import numpy as np
+from app.config import settings
+from app.models.price_model import PriceSnapshot, ResourcePrice
+from app.services import price_history, price_lists, price_refresh
+from app.utils.instrumentation import instrumented
 
+@instrumented("price_service")
 class PriceService:
+    """Named, immutable price snapshots with a pointer to the active one.
+
+    The user's own list (prices.json) is the CURRENT snapshot. Price files
+    are registered as further snapshots (see price_lists) and activated by
+    name: switching is a pointer change, and prices of the previous list
+    never leak into the next. Edits produce a new CURRENT snapshot from the
+    active one.
+    """
+
+    CURRENT = "current"
+
     def __init__(self, price_file_path: str = "data/prices.json"):
         self.price_file_path = price_file_path
-        self.prices = {}
+        self.snapshots: Dict[str, PriceSnapshot] = {}
+        self.active = PriceSnapshot(self.CURRENT, {})
         self.load_prices()
-        
+
+    @property
+    def prices(self) -> Mapping[str, float]:
+        """Read-only prices of the active snapshot."""
+        return self.active.prices
+
     def load_prices(self) -> None:
-        """Load prices from JSON file if it exists"""
+        """Load the CURRENT snapshot from the JSON file (if it exists) and activate it"""
+        prices = {}
         if os.path.exists(self.price_file_path):
             try:
                 with open(self.price_file_path, 'r') as f:
-                    self.prices = json.load(f)
+                    prices = json.load(f)
             except json.JSONDecodeError:
-                self.prices = {}
-        
+                prices = {}
+        self.use_snapshot(PriceSnapshot(self.CURRENT, prices, source=self.price_file_path))
+
     def save_prices(self) -> None:
-        """Save current prices to JSON file"""
+        """Save the CURRENT snapshot to the JSON file"""
+        current = self.snapshots.get(self.CURRENT, self.active)
         os.makedirs(os.path.dirname(self.price_file_path), exist_ok=True)
         with open(self.price_file_path, 'w') as f:
-            json.dump(self.prices, f, indent=4)
+            json.dump(dict(current.prices), f, indent=4)
+
+    def add_snapshot(self, snapshot: PriceSnapshot) -> None:
+        """Register (or replace) a snapshot under its name"""
+        self.snapshots[snapshot.name] = snapshot
+
+    def activate(self, name: str) -> PriceSnapshot:
+        """Make a registered snapshot the active one (KeyError if unknown)"""
+        self.active = self.snapshots[name]
+        return self.active
+
+    def use_snapshot(self, snapshot: PriceSnapshot) -> None:
+        """Register a snapshot and make it the active one"""
+        self.add_snapshot(snapshot)
+        self.active = snapshot
+
+    def get_snapshot(self, name: str) -> Optional[PriceSnapshot]:
+        return self.snapshots.get(name)
+
+    def vector(self, resources: Sequence[str]) -> np.ndarray:
+        """Active prices as a read-only vector indexed by resource code"""
+        return self.active.vector(resources)
             
     def get_price(self, resource_name: str) -> float:
         """Get price for a specific resource"""
-        return self.prices.get(resource_name, 0.0)
+        return self.active.prices.get(resource_name, 0.0)
     
-    def get_all_prices(self) -> Dict[str, float]:
-        """Get all resource prices"""
-        return self.prices
+    def get_all_prices(self) -> Mapping[str, float]:
+        """Get all resource prices of the active snapshot (read-only)"""
+        return self.active.prices
     
     def update_price(self, resource_name: str, price: float) -> None:
         """Update price for a specific resource"""
-        self.prices[resource_name] = price
+        self.update_multiple_prices({resource_name: price})
     
-    def update_multiple_prices(self, price_dict: Dict[str, float]) -> None:
-        """Update prices for multiple resources at once"""
-        self.prices.update(price_dict)
+    def update_multiple_prices(self, price_dict: Mapping[str, float]) -> None:
+        """Apply prices on top of the active snapshot as the new, active CURRENT snapshot"""
+        self.use_snapshot(self.active.updated(price_dict, name=self.CURRENT))
     
     def import_prices_from_csv(self, file_path: str) -> None:
-        """Import prices from a CSV file"""
-        import pandas as pd
+        """Import prices from a CSV file (parsed once per file version, see price_lists)"""
         try:
-            df = pd.read_csv(file_path)
-            if 'resource' in df.columns and 'price' in df.columns:
-                for _, row in df.iterrows():
-                    self.prices[row['resource']] = float(row['price'])
+            price_list = price_lists.load_price_list(file_path)
+            if price_list:
+                self.update_multiple_prices(price_list.prices)
                 self.save_prices()
         except Exception as e:
             print(f"Error importing prices: {e}") 
 
     def fetch_from_echoes_api(self, url: str = "https://echoes.mobi/api") -> Dict[str, float]:
         """
-        Fetches prices from echoes.mobi API endpoint.
-        Expects a CSV/JSON-like response that contains columns for resource name
-        and one of: average | buy | sell | price. Returns a dict resource->price
-        using preference average > buy > price.
+        Fetches prices from echoes.mobi API endpoint and waits for the result.
+        Expects a CSV or JSON dump with a resource name column and one of:
+        average | buy | price, streamed through price_import.import_prices.
+        Goes through the process-wide price_refresh queue, so a fresh response
+        is reused, a stale one is revalidated conditionally and a refresh
+        already in flight is joined rather than repeated. Returns {} on
+        failure. The app refreshes in the background instead (price_refresh).
         """
-        try:
-            resp = requests.get(url, timeout=20)
-            resp.raise_for_status()
-            content_type = resp.headers.get('Content-Type','')
-            # Try CSV first
-            text = resp.text
-            import io
-            import pandas as pd
-            price_dict: Dict[str, float] = {}
-            try:
-                df = pd.read_csv(io.StringIO(text))
-            except Exception:
-                # Try JSON
-                try:
-                    data = resp.json()
-                    df = pd.DataFrame(data)
-                except Exception:
-                    return {}
-
-            # Normalize column names
-            cols = {c.lower().strip(): c for c in df.columns}
-            name_col = None
-            for candidate in ["resource", "name", "item", "resource_name", "resource_name_collection.0"]:
-                if candidate in cols:
-                    name_col = cols[candidate]
-                    break
-            avg_col = cols.get("average") or cols.get("avg") or cols.get("cena średnia") or cols.get("cena_srednia")
-            buy_col = cols.get("buy") or cols.get("cena kupna") or cols.get("cena_kupna")
-            price_col = cols.get("price")
-            if name_col is None:
-                return {}
-            df[name_col] = df[name_col].astype(str).str.strip()
-            if avg_col and avg_col in df.columns:
-                series = pd.to_numeric(df[avg_col], errors='coerce').fillna(0.0)
-            elif buy_col and buy_col in df.columns:
-                series = pd.to_numeric(df[buy_col], errors='coerce').fillna(0.0)
-            elif price_col and price_col in df.columns:
-                series = pd.to_numeric(df[price_col], errors='coerce').fillna(0.0)
-            else:
-                return {}
-            price_dict = pd.Series(series.values, index=df[name_col]).to_dict()
-            return price_dict
-        except Exception:
+        price_refresh.refresher.request_refresh(url)
+        feed = price_refresh.refresher.wait(url)
+        if feed.error or feed.snapshot is None:
             return {}
+        return dict(feed.snapshot.prices)
+
+    def _history(self, username: str) -> price_history.PriceHistoryStore:
+        """The user's history store, with new dated files from price_imports appended"""
+        user_root = os.path.join(settings.DATA_ROOT, "user_data", username)
+        store = price_history.history_store(os.path.join(user_root, "price_history"))
+        store.sync_imports(os.path.join(user_root, "price_imports"))
+        return store
 
-    def get_price_history(self, username):
+    def get_price_history(self, username, start: Optional[date] = None, end: Optional[date] = None,
+                          resources: Optional[Sequence[str]] = None) -> pd.DataFrame:
         """
-        Scans the user's price_imports directory, loads all CSVs,
-        and returns a consolidated DataFrame with historical price data.
-        
-        It assumes filenames contain dates in YYYY-MM-DD format.
-        It assumes CSVs have columns: 'resource', 'buy', 'sell', 'average'.
+        Returns the user's historical price data (resource, buy, sell, average,
+        date) sorted by date, optionally limited to a date range and resources.
+
+        Dated CSVs in the user's price_imports directory (YYYY-MM-DD in the
+        filename; columns 'resource', 'buy', 'sell', 'average') are appended
+        to a partitioned Parquet store once; queries read only the matching
+        dates and resources.
         """
-        imports_dir = os.path.join("data", "user_data", username, "price_imports")
-        if not os.path.exists(imports_dir):
-            return pd.DataFrame()
-
-        all_price_data = []
-        date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
-
-        for filename in os.listdir(imports_dir):
-            if filename.endswith(".csv"):
-                match = date_pattern.search(filename)
-                if not match:
-                    continue # Skip files without a valid date in the name
-
-                price_date = datetime.strptime(match.group(1), "%Y-%m-%d").date()
-                file_path = os.path.join(imports_dir, filename)
-                
-                try:
-                    df = pd.read_csv(file_path)
-                    # Check for required columns
-                    if all(col in df.columns for col in ['resource', 'buy', 'sell', 'average']):
-                        df['date'] = price_date
-                        all_price_data.append(df)
-                except Exception:
-                    # Silently ignore files that can't be parsed
-                    continue
-        
-        if not all_price_data:
-            return pd.DataFrame()
-
-        history_df = pd.concat(all_price_data, ignore_index=True)
-        history_df['date'] = pd.to_datetime(history_df['date'])
-        return history_df.sort_values(by="date") 
\ No newline at end of file
+        return self._history(username).query(start, end, resources)
+
+    def get_price_stats(self, username, resources: Optional[Sequence[str]] = None,
+                        start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Precomputed rolling average/min/max and volatility of the average price
+        per resource and date (see price_history.rolling_stats)."""
+        return self._history(username).stats(resources, start, end)
@@ -0,0 +1,92 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict
+from app.utils.valuation import value_rows
+
+# Volume of one unit of any planetary resource (m3)
+RESOURCE_UNIT_VOLUME = 0.01
+
+
+class SummaryService:
+    """Income and logistics aggregates over the rows that have mining units.
+
+    Only assigned rows are tracked. refresh() is cheap when nothing changed
+    (a units version check and a price snapshot identity check); when units
+    or prices change only the assigned rows are revalued, never the whole
+    universe. One instance is shared by all sessions of a user.
+    """
+
+    def __init__(self, data_service, price_service):
+        self.data_service = data_service
+        self.price_service = price_service
+        self.universe = data_service.universe
+        self._lock = threading.Lock()
+        self._units_version = None
+        self._price_vector = None
+        # Assigned universe rows (sorted) and their units / value per unit
+        self._rows = np.empty(0, dtype=np.int64)
+        self._row_units = np.empty(0, dtype=np.int32)
+        self._value_per_unit = np.empty(0, dtype=np.float64)
+        self.total_value_h = 0.0
+        self.total_volume_h = 0.0
+
+    def refresh(self) -> None:
+        """Bring aggregates up to date with the user's units and current prices."""
+        with self._lock:
+            units_changed = self._units_version != self.data_service.units_version
+            if units_changed:
+                self._sync_units()
+            prices = self.price_service.vector(self.universe.resources)
+            if units_changed or prices is not self._price_vector:
+                self._price_vector = prices
+                self._revalue()
+
+    def _sync_units(self) -> None:
+        units = {}
+        # Snapshot: sessions sharing the service may edit units meanwhile
+        for key, value in list(self.data_service.mining_units.items()):
+            row = self.universe.find_row(key)
+            if row >= 0 and value > 0:
+                units[row] = int(value)
+        self._units_version = self.data_service.units_version
+        self._rows = np.array(sorted(units), dtype=np.int64)
+        self._row_units = np.array([units[r] for r in self._rows.tolist()], dtype=np.int32)
+
+    def _revalue(self) -> None:
+        output = self.universe.row_output[self._rows]
+        self._value_per_unit, total = value_rows(
+            output, self.universe.row_resource[self._rows], self._price_vector, self._row_units)
+        self.total_value_h = float(total.sum())
+        self.total_volume_h = float((output.astype(np.float64) * self._row_units * RESOURCE_UNIT_VOLUME).sum())
+
+    def rows_frame(self) -> pd.DataFrame:
+        """Assigned rows with hierarchy names, units and hourly values (index = universe row)."""
+        with self._lock:
+            u = self.universe
+            rows = self._rows
+            return pd.DataFrame({
+                "Region": [u.regions[c] for c in u.row_region[rows].tolist()],
+                "Constellation": [u.constellations[c] for c in u.row_constellation[rows].tolist()],
+                "System": [u.systems[c] for c in u.row_system[rows].tolist()],
+                "Planet": [u.planet_names[c] for c in u.planet_name[u.row_planet[rows]].tolist()],
+                "Resource": [u.resources[c] for c in u.row_resource[rows].tolist()],
+                "Output/h/unit": u.row_output[rows],
+                "Mining Units": self._row_units,
+                "Value/h/unit": self._value_per_unit,
+                "Total Value/h": self._value_per_unit * self._row_units,
+            }, index=rows)
+
+    def planet_volumes(self) -> pd.DataFrame:
+        """Hourly mined volume (m3) per planet with assigned units."""
+        with self._lock:
+            u = self.universe
+            planets = u.row_planet[self._rows]
+            volume = u.row_output[self._rows].astype(np.float64) * self._row_units * RESOURCE_UNIT_VOLUME
+            planet_index, inverse = np.unique(planets, return_inverse=True)
+            totals = np.bincount(inverse, weights=volume, minlength=len(planet_index))
+            return pd.DataFrame({
+                "System": [u.systems[c] for c in u.planet_system[planet_index].tolist()],
+                "Planet": [u.planet_names[c] for c in u.planet_name[planet_index].tolist()],
+                "Hourly Volume (m3)": totals,
+            }).sort_values(["System", "Planet"], ignore_index=True)
@@ -0,0 +1,104 @@
+import os
+import json
+import tempfile
+from typing import Dict
+
+from app.utils.filelock import locked
+
+# Log entries to accumulate before they are folded into the snapshot
+COMPACT_AFTER = 1000
+
+
+class UnitsLog:
+    """Mining units stored as a JSON snapshot plus an append-only delta log.
+
+    mining_units.json keeps the compacted {"<planet_id>_<resource>": units}
+    map (the format used before the log existed); mining_units.log next to it
+    holds one ``["<key>", units]`` line per change, 0 meaning removed. Loading
+    replays the log over the snapshot, saving appends only the changed keys,
+    and once COMPACT_AFTER entries have accumulated the log is folded into a
+    new snapshot (temp file + rename) and truncated. Appends, compaction and
+    log replays hold an exclusive lock on mining_units.lock, so several
+    processes may share the files; the last write of a key wins.
+    """
+
+    def __init__(self, snapshot_path: str):
+        base = os.path.splitext(snapshot_path)[0]
+        self.snapshot_path = snapshot_path
+        self.log_path = base + ".log"
+        self.lock_path = base + ".lock"
+        # Entries in the log as last seen by this process (approximate with other writers)
+        self._log_entries = 0
+
+    def _read(self) -> Dict[str, int]:
+        units: Dict[str, int] = {}
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    units = {k: int(v) for k, v in json.load(f).items() if v}
+            except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
+                units = {}
+        entries = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    try:
+                        key, value = json.loads(line)
+                        value = int(value)
+                    except (json.JSONDecodeError, ValueError, TypeError):
+                        continue  # torn or foreign line
+                    entries += 1
+                    if value > 0:
+                        units[key] = value
+                    else:
+                        units.pop(key, None)
+        self._log_entries = entries
+        return units
+
+    def load(self) -> Dict[str, int]:
+        """Return the current units map (snapshot with the log replayed)."""
+        if not os.path.exists(self.log_path):
+            # Nothing to replay and nothing to race with: compaction keeps the log file
+            return self._read()
+        with locked(self.lock_path):
+            return self._read()
+
+    def append(self, changes: Dict[str, int]) -> None:
+        """Record changed keys (units 0 = removed); compacts when the log grew large."""
+        if not changes:
+            return
+        lines = "".join(json.dumps([key, int(value)]) + "\n" for key, value in changes.items())
+        with locked(self.lock_path):
+            with open(self.log_path, 'a+b') as f:
+                # A crash mid-write leaves a torn last line: start on a fresh one
+                # so only the fragment is skipped on replay, not these entries
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        lines = "\n" + lines
+                f.write(lines.encode("utf-8"))
+            self._log_entries += len(changes)
+            if self._log_entries >= COMPACT_AFTER:
+                self._compact()
+
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot and truncate it."""
+        with locked(self.lock_path):
+            self._compact()
+
+    def _compact(self) -> None:
+        units = self._read()
+        folder = os.path.dirname(self.snapshot_path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".mining_units-", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(units, f, indent=4)
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        open(self.log_path, 'w').close()
+        self._log_entries = 0
@@ -0,0 +1,55 @@
+import numpy as np
+from typing import Optional, Tuple
+
+from app.utils.valuation import top_n
+
+
+def best_row_per_planet(value_per_unit: np.ndarray, row_planet: np.ndarray,
+                        rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Most valuable row of every planet among `rows` (rows worth nothing are skipped).
+
+    `rows` must be ascending, so every planet is one contiguous run (universe
+    rows are grouped by planet). Returns the chosen rows and their value per
+    unit, in planet order. Ties within a planet go to the lowest row.
+    """
+    values = value_per_unit[rows]
+    keep = values > 0
+    rows, values = rows[keep], values[keep]
+    if not len(rows):
+        return rows, values
+    planets = row_planet[rows]
+    starts = np.flatnonzero(np.r_[True, planets[1:] != planets[:-1]])
+    best = np.maximum.reduceat(values, starts)
+    # First row of each run that reaches the run maximum
+    hits = np.flatnonzero(values == np.repeat(best, np.diff(np.r_[starts, len(rows)])))
+    first = hits[np.r_[True, planets[hits][1:] != planets[hits][:-1]]]
+    return rows[first], values[first]
+
+
+def allocate_units(value_per_unit: np.ndarray, row_planet: np.ndarray, budget: int,
+                   planet_cap: int, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Place `budget` mining units on universe rows to maximize value/h.
+
+    value_per_unit: per-row value of one unit, row_planet: per-row planet
+    index, planet_cap: most units a single planet may hold, rows: ascending
+    candidate rows (None = all rows). Returns (rows, units) ordered by value.
+
+    Value is linear in units, so the units of a planet are always best spent
+    on its most valuable row; the optimum is then to fill the top planets by
+    that value up to the cap. Only ceil(budget / planet_cap) planets are
+    selected (argpartition), so the cost does not grow with the budget.
+    """
+    budget = max(int(budget), 0)
+    planet_cap = max(int(planet_cap), 0)
+    if rows is None:
+        rows = np.arange(len(value_per_unit))
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32))
+    if budget == 0 or planet_cap == 0:
+        return empty
+    best_rows, best_values = best_row_per_planet(value_per_unit, row_planet, np.asarray(rows))
+    picked = top_n(best_values, -(-budget // planet_cap))
+    if not len(picked):
+        return empty
+    units = np.full(len(picked), planet_cap, dtype=np.int32)
+    units[-1] = min(planet_cap, budget - planet_cap * (len(picked) - 1))
+    return best_rows[picked].astype(np.int64), units
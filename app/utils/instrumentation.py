@@ -0,0 +1,194 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from app.config import settings
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def enabled() -> bool:
+    """Whether profiling was switched on (PROFILING env var)."""
+    return settings.PROFILING
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        index = 0
+        while index < len(BUCKETS) and seconds > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= target and bucket_count:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (target - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+
+class Registry:
+    """Process-wide latency histograms keyed by stage name.
+
+    Shared by all sessions and threads; observations take a lock only for
+    the few additions of one histogram update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self) -> List[Dict[str, float]]:
+        """One row per stage: calls, total/mean/p50/p95/p99/max in milliseconds."""
+        with self._lock:
+            rows = []
+            for name in sorted(self._histograms):
+                h = self._histograms[name]
+                rows.append({
+                    "stage": name,
+                    "calls": h.count,
+                    "total_ms": h.sum * 1000,
+                    "mean_ms": h.sum / h.count * 1000 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "p99_ms": h.quantile(0.99) * 1000,
+                    "max_ms": h.max * 1000,
+                })
+            return rows
+
+    def to_json(self) -> str:
+        """Histograms with their buckets (seconds) plus the summary statistics."""
+        with self._lock:
+            histograms = {
+                name: {"buckets": list(BUCKETS), "counts": list(h.counts), "count": h.count,
+                       "sum": h.sum, "max": h.max}
+                for name, h in sorted(self._histograms.items())
+            }
+        return json.dumps({"histograms": histograms, "summary": self.summary()}, indent=2)
+
+    def to_prometheus(self, metric: str = "evecalc_stage_seconds") -> str:
+        """Histograms in the Prometheus text exposition format."""
+        lines = [f"# HELP {metric} Latency of instrumented app stages and service calls.",
+                 f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                stage = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, h.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block under `name` (no-op unless profiling is enabled)."""
+    if not settings.PROFILING:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start)
+
+
+class StageTimer:
+    """Consecutive stages of one script run, recorded as laps.
+
+    ``lap(name)`` records the time since the previous lap (or the start) as
+    ``<prefix>.<name>``; ``finish()`` records the whole run as
+    ``<prefix>.total``. Lets a long script be split into stages without
+    re-indenting it into ``with`` blocks.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._enabled = settings.PROFILING
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        if not self._enabled:
+            return
+        now = time.perf_counter()
+        registry.observe(f"{self.prefix}.{name}", now - self._last)
+        self._last = now
+
+    def finish(self) -> None:
+        if self._enabled:
+            registry.observe(f"{self.prefix}.total", time.perf_counter() - self._start)
+
+
+def timed(name: str):
+    """Function decorator timing every call under `name`.
+
+    Applied at definition time: with profiling disabled the function is
+    returned untouched, so calls carry no overhead at all.
+    """
+    def decorate(fn):
+        if not settings.PROFILING:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def instrumented(prefix: str):
+    """Class decorator timing every public method as ``<prefix>.<method>`` (see timed)."""
+    def decorate(cls):
+        if not settings.PROFILING:
+            return cls
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+    return decorate
@@ -0,0 +1,104 @@
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+LEVELS = ("planet", "system", "constellation", "region")
+
+
+def price_vector(resources: Sequence[str], prices: Dict[str, float]) -> np.ndarray:
+    """Price of every resource code (index = position in `resources`), 0.0 when unknown."""
+    return np.array([float(prices.get(r) or 0.0) for r in resources], dtype=np.float64)
+
+
+def value_rows(output: np.ndarray, resource_codes: np.ndarray, prices: np.ndarray,
+               units: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Hourly value of one unit and of the assigned units for every row.
+
+    output: per-row output per unit, resource_codes: per-row resource code,
+    prices: price vector indexed by resource code, units: per-row mining units
+    (None = no units, total is then all zeros).
+    """
+    per_unit = output.astype(np.float64) * prices[resource_codes]
+    if units is None:
+        return per_unit, np.zeros_like(per_unit)
+    return per_unit, per_unit * units
+
+
+def value_rows_by_prices(output: np.ndarray, resource_codes: np.ndarray,
+                         price_vectors: Sequence[np.ndarray], units: np.ndarray) -> np.ndarray:
+    """Hourly value of the assigned units of every row under several price vectors.
+
+    One vectorized pass for all vectors; returns shape (len(price_vectors), rows).
+    """
+    prices = np.vstack(price_vectors)
+    return prices[:, resource_codes] * (output.astype(np.float64) * units)
+
+
+def level_codes(universe, level: str) -> Tuple[np.ndarray, int]:
+    """Per-row group codes of a hierarchy level and the number of groups."""
+    if level == "planet":
+        return universe.row_planet, universe.num_planets
+    if level == "system":
+        return universe.row_system, len(universe.systems)
+    if level == "constellation":
+        return universe.row_constellation, len(universe.constellations)
+    if level == "region":
+        return universe.row_region, len(universe.regions)
+    raise ValueError(f"Unknown level: {level}")
+
+
+def group_totals(values: np.ndarray, group_codes: np.ndarray, num_groups: int) -> np.ndarray:
+    """Sum of `values` per group code (bincount reduction)."""
+    return np.bincount(group_codes, weights=values, minlength=num_groups)
+
+
+def top_n(values: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n largest values, highest first; ties keep index order.
+
+    Same result as a stable descending argsort cut to n, but uses
+    argpartition so only the selected entries are fully sorted.
+    """
+    n = max(0, min(n, len(values)))
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    if n < len(values):
+        threshold = values[np.argpartition(-values, n - 1)[n - 1]]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:n - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(len(values))
+    # lexsort: last key is primary -> value descending, then index ascending
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+class UniverseValuation:
+    """Value/h of universe rows for one price vector and units vector.
+
+    Computes per-row values once; grouped totals per planet, system,
+    constellation or region are reduced on demand and memoized.
+    """
+
+    def __init__(self, universe, prices: np.ndarray, units: Optional[np.ndarray] = None):
+        self.universe = universe
+        self.prices = prices
+        self.units = units if units is not None else np.zeros(universe.num_rows, dtype=np.int32)
+        self.value_per_unit, self.total_value = value_rows(
+            universe.row_output, universe.row_resource, prices, units)
+        self._totals: Dict[str, np.ndarray] = {}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+
+    def totals(self, level: str) -> np.ndarray:
+        """Total value/h per group of `level` (planet, system, constellation or region)."""
+        if level not in self._totals:
+            codes, size = level_codes(self.universe, level)
+            self._totals[level] = group_totals(self.total_value, codes, size)
+        return self._totals[level]
+
+    def order(self, column: str, ascending: bool = False) -> np.ndarray:
+        """Row order by "units", "value_per_unit" or "total_value" (stable, memoized)."""
+        key = (column, ascending)
+        if key not in self._orders:
+            values = getattr(self, column)
+            keys = values if ascending else -values.astype(np.float64)
+            self._orders[key] = np.argsort(keys, kind='stable')
+        return self._orders[key]
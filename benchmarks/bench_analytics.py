@@ -0,0 +1,113 @@
+"""AnalyticsService benchmark: per-object rankings vs. grouped aggregates.
+
+Usage (from the project root):
+    python benchmarks/bench_analytics.py [--repeat N] [--top N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.models.price_model import PriceSnapshot
+from app.services.analytics_service import AnalyticsService
+from app.services.data_service import DataService
+
+from benchmarks.legacy import dataclass_graph
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+class StaticPrices:
+    def __init__(self, prices):
+        self.snapshot = PriceSnapshot("static", prices)
+        self.prices = prices
+
+    def get_all_prices(self):
+        return dict(self.prices)
+
+    def vector(self, resources):
+        return self.snapshot.vector(resources)
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def legacy_planets(planets, prices, top_n):
+    values = [(p, p.total_value(prices)) for p in planets]
+    values.sort(key=lambda x: x[1], reverse=True)
+    return values[:top_n]
+
+
+def legacy_systems(planets, prices, top_n):
+    systems = {}
+    for p in planets:
+        systems[p.system] = systems.get(p.system, 0) + p.total_value(prices)
+    values = sorted(systems.items(), key=lambda x: x[1], reverse=True)
+    return values[:top_n]
+
+
+def legacy_distribution(planets, resource_name):
+    distribution = {}
+    for p in planets:
+        for r in p.resources:
+            if r.resource == resource_name:
+                distribution[p.region] = distribution.get(p.region, 0) + 1
+    return distribution
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+    svc.load_data()
+    universe = svc.universe
+    rng = random.Random(0)
+    for row in rng.sample(range(universe.num_rows), 300):
+        svc.update_mining_units(universe.row_key(row), rng.randint(1, 20))
+    prices = {r: rng.uniform(1, 1000) for r in universe.resources}
+    analytics = AnalyticsService(svc, StaticPrices(prices))
+    planets = list(dataclass_graph(universe, svc.mining_units).values())
+    resource = universe.resources[0]
+
+    old_planets_t, expected_planets = best_of(lambda: legacy_planets(planets, prices, args.top), args.repeat)
+    old_systems_t, expected_systems = best_of(lambda: legacy_systems(planets, prices, args.top), args.repeat)
+    old_dist_t, expected_dist = best_of(lambda: legacy_distribution(planets, resource), args.repeat)
+    planets_t, top_planets = best_of(lambda: analytics.get_most_profitable_planets(args.top), args.repeat)
+    systems_t, top_systems = best_of(lambda: analytics.get_most_profitable_systems(args.top), args.repeat)
+
+    def after_change():
+        analytics._valuation_cache = None
+        return analytics.get_most_profitable_planets(args.top)
+
+    cold_t, _ = best_of(after_change, args.repeat)
+    dist_t, distribution = best_of(lambda: analytics.get_resource_distribution(resource), args.repeat)
+
+    assert [v for _, v in top_planets] == [v for _, v in expected_planets]
+    assert [v for _, v in top_systems] == [v for _, v in expected_systems]
+    # Zero-valued systems tie; only ranked (non-zero) names must agree
+    assert [s for s, v in top_systems if v] == [s for s, v in expected_systems if v]
+    assert distribution == expected_dist
+
+    print(f"planets: {universe.num_planets:,}  systems: {len(universe.systems):,}  top: {args.top}")
+    print(f"most profitable planets: {old_planets_t * 1000:8.1f} ms -> {planets_t * 1000:6.2f} ms")
+    print(f"most profitable systems: {old_systems_t * 1000:8.1f} ms -> {systems_t * 1000:6.2f} ms")
+    print(f"planets, after a change: {old_planets_t * 1000:8.1f} ms -> {cold_t * 1000:6.2f} ms")
+    print(f"resource distribution:   {old_dist_t * 1000:8.1f} ms -> {dist_t * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Arrow-native load path benchmark: peak RSS and time to first page.
+
+Each path runs in a fresh interpreter, from reading eve_planets.parquet to
+the serialized bytes of the first table page (what Streamlit sends to the
+browser):
+- pandas: pd.read_parquet + dtype downcasts -> Universe.from_dataframe ->
+  categorical analysis frame -> page DataFrame
+- arrow:  memory-mapped pq.read_table of the needed columns ->
+  Universe.from_arrow -> page as an Arrow table
+
+Usage (from the project root):
+    python benchmarks/bench_arrow.py [--runs N] [--page-size N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def run_path(path, page_size):
+    import resource
+    import time
+
+    import numpy as np
+    import pyarrow as pa
+    from streamlit import type_util
+
+    from app.models.universe import Universe
+    from app.services import data_service
+    from app.utils.valuation import value_rows
+
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if path == "pandas":
+        universe = Universe.from_dataframe(data_service._read_planets_frame(DATA_PATH))
+        frame = universe.analysis_frame()
+    else:
+        universe = Universe.from_arrow(data_service._read_planets_table(DATA_PATH))
+    loaded = time.perf_counter() - start
+
+    rows = np.arange(page_size)
+    prices = np.ones(len(universe.resources))
+    units = np.zeros(page_size, dtype=np.int32)
+    per_unit, total = value_rows(universe.row_output[rows], universe.row_resource[rows], prices, units)
+    if path == "pandas":
+        page = frame.take(rows).assign(**{"Mining Units": units, "Value/h/unit": per_unit, "Total Value/h": total})
+        for col in page.select_dtypes('category').columns:
+            page[col] = page[col].cat.remove_unused_categories()
+        payload = type_util.data_frame_to_bytes(page)
+    else:
+        page = universe.page_table(rows)
+        for name, values in (("Mining Units", units), ("Value/h/unit", per_unit), ("Total Value/h", total)):
+            page = page.append_column(name, pa.array(values))
+        payload = type_util.pyarrow_table_to_bytes(page)
+    first_page = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"load_s": loaded, "first_page_s": first_page, "payload": len(payload),
+            "peak_rss_mib": peak / 1024, "load_rss_mib": (peak - base_rss) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--child", choices=["pandas", "arrow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_path(args.child, args.page_size)))
+        return
+
+    print(f"page size: {args.page_size}  runs: {args.runs} (best time, max RSS)")
+    for path in ("pandas", "arrow"):
+        results = []
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path,
+                                  "--page-size", str(args.page_size)],
+                                 check=True, capture_output=True, text=True, cwd=project_root)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"{path:<7} load {min(r['load_s'] for r in results) * 1000:7.1f} ms   "
+              f"first page {min(r['first_page_s'] for r in results) * 1000:7.1f} ms   "
+              f"payload {results[0]['payload'] / 1024:5.1f} KiB   "
+              f"peak RSS {max(r['peak_rss_mib'] for r in results):6.1f} MiB "
+              f"(+{max(r['load_rss_mib'] for r in results):5.1f} MiB over imports)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Universe load benchmark: row-by-row iterrows vs. the columnar loader.
+
+Usage (from the project root):
+    python benchmarks/bench_load.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.models.universe import Universe
+from app.services import data_service
+from app.services.data_service import DataService
+
+from benchmarks.legacy import legacy_process_data
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = data_service._read_planets_frame(DATA_PATH)
+
+    legacy_t, legacy_planets = best_of(lambda: legacy_process_data(df, {}), 1)
+
+    def cold_load():
+        data_service._shared_cache.clear()
+        svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+        svc.load_data()
+        return svc
+
+    def warm_load():
+        svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+        svc.load_data()
+        return svc
+
+    load_t, svc = best_of(cold_load, args.repeat)
+    warm_t, _ = best_of(warm_load, args.repeat)
+    process_t, _ = best_of(lambda: Universe.from_dataframe(df), args.repeat)
+    materialize_t, planets = best_of(lambda: svc.universe.build_planets({}), args.repeat)
+    views_t, _ = best_of(lambda: [r for p in planets.values() for r in p.resources], 1)
+    frame_t, _ = best_of(svc.universe.analysis_frame, args.repeat)
+    units_t, _ = best_of(svc.mining_units_vector, args.repeat)
+
+    assert len(planets) == len(legacy_planets)
+    assert sum(len(p.resources) for p in planets.values()) == len(df)
+
+    print(f"rows: {len(df):,}  planets: {len(planets):,}")
+    print(f"legacy _process_data (iterrows):      {legacy_t * 1000:10.1f} ms")
+    print(f"Universe.from_dataframe:              {process_t * 1000:10.1f} ms")
+    print(f"load_data, cold (read + group):       {load_t * 1000:10.1f} ms")
+    print(f"load_data, shared universe (per user):{warm_t * 1000:10.1f} ms")
+    print(f"get_all_planets (planet views):       {materialize_t * 1000:10.1f} ms")
+    print(f"all resource views (on demand):       {views_t * 1000:10.1f} ms")
+    print(f"analysis_frame (once per process):    {frame_t * 1000:10.1f} ms")
+    print(f"mining_units_vector (per session):    {units_t * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Memory footprint of the universe store, its object views and per-user state.
+
+Usage (from the project root):
+    python benchmarks/bench_memory.py [--users N] [--units K]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.services.data_service import DataService, load_universe
+from benchmarks.legacy import dataclass_graph
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def traced(fn):
+    """Run fn and return (result, bytes still allocated afterwards)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def mib(n):
+    return n / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--units", type=int, default=50, help="assigned rows per user")
+    args = parser.parse_args()
+
+    universe, universe_bytes = traced(lambda: load_universe(DATA_PATH))
+    ids = universe.row_keys()
+
+    def make_users():
+        users = []
+        for u in range(args.users):
+            svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+            svc.load_data()
+            for i in range(args.units):
+                svc.update_mining_units(ids[(u * args.units + i) % len(ids)], 1 + i % 5)
+            users.append(svc)
+        return users
+
+    _, users_bytes = traced(make_users)
+    _, dataclass_bytes = traced(lambda: dataclass_graph(universe, {}))
+    _, planet_views_bytes = traced(lambda: universe.build_planets({}))
+    _, all_views_bytes = traced(
+        lambda: [r for p in universe.build_planets({}).values() for r in p.resources])
+
+    print(f"rows: {universe.num_rows:,}  planets: {universe.num_planets:,}")
+    print("full universe representation:")
+    print(f"  dataclass Planet/PlanetaryResource graph: {mib(dataclass_bytes):8.2f} MiB")
+    print(f"  array store (arrays + string tables):     {mib(universe.nbytes()):8.2f} MiB")
+    print(f"  + all Planet views (on demand):           {mib(planet_views_bytes):8.2f} MiB")
+    print(f"  + all Planet and resource views:          {mib(all_views_bytes):8.2f} MiB")
+    print(f"shared universe:                            {mib(universe_bytes):8.2f} MiB (once per process)")
+    print(f"{args.users} users x {args.units} assigned units:             {mib(users_bytes):8.2f} MiB "
+          f"({users_bytes / max(args.users, 1) / 1024:.1f} KiB per user)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Mining-unit optimizer benchmark over the full universe.
+
+Compares allocate_units with a per-unit greedy that scans every row for
+each unit placed, for budgets from 10 to 10,000 units, and checks that
+both reach the same value/h.
+
+Usage (from the project root):
+    python benchmarks/bench_optimizer.py [--cap N] [--scan-limit N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.services.data_service import load_universe
+from app.utils.allocation import allocate_units
+from app.utils.valuation import UniverseValuation, price_vector
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+BUDGETS = (10, 100, 1000, 10000)
+
+
+def scan_per_unit(value_per_unit, row_planet, num_planets, budget, planet_cap):
+    """Place units one at a time on the best row whose planet still has room."""
+    remaining = np.full(num_planets, planet_cap, dtype=np.int64)
+    units = np.zeros(len(value_per_unit), dtype=np.int64)
+    for _ in range(budget):
+        available = np.where(remaining[row_planet] > 0, value_per_unit, 0.0)
+        row = int(np.argmax(available))
+        if available[row] <= 0:
+            break
+        units[row] += 1
+        remaining[row_planet[row]] -= 1
+    return float((value_per_unit * units).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cap", type=int, default=3, help="max units per planet")
+    parser.add_argument("--scan-limit", type=int, default=1000,
+                        help="largest budget to run the per-unit scan for")
+    args = parser.parse_args()
+
+    universe = load_universe(DATA_PATH)
+    rng = random.Random(0)
+    prices = price_vector(universe.resources, {r: rng.uniform(1, 1000) for r in universe.resources})
+    value_per_unit = UniverseValuation(universe, prices).value_per_unit
+
+    print(f"rows: {universe.num_rows:,}  planets: {universe.num_planets:,}  cap per planet: {args.cap}")
+    for budget in BUDGETS:
+        start = time.perf_counter()
+        rows, units = allocate_units(value_per_unit, universe.row_planet, budget, args.cap)
+        solver_t = time.perf_counter() - start
+        value = float((value_per_unit[rows] * units).sum())
+        line = f"budget {budget:>6,}: allocate_units {solver_t * 1000:8.2f} ms"
+        if budget <= args.scan_limit:
+            start = time.perf_counter()
+            expected = scan_per_unit(value_per_unit, universe.row_planet, universe.num_planets, budget, args.cap)
+            scan_t = time.perf_counter() - start
+            assert np.isclose(value, expected)
+            line += f"   per-unit scan {scan_t * 1000:10.1f} ms"
+        print(f"{line}   value/h {value:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Preferences persistence benchmark: write-through vs. write-behind.
+
+Simulates a burst of widget callbacks (one preference change per
+"keystroke") and reports how many times preferences.json is written and
+how long the callbacks block on disk.
+
+Usage (from the project root):
+    python benchmarks/bench_prefs.py [--changes N] [--interval SECONDS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.config import settings
+from app.services import prefs_service
+
+
+def run(save, changes, interval):
+    writes = 0
+    original = prefs_service._write_atomic
+
+    def counting_write(path, preferences):
+        nonlocal writes
+        writes += 1
+        original(path, preferences)
+
+    prefs_service._write_atomic = counting_write
+    try:
+        prefs = {"system_filter": ["Jita"], "ship_cargo_capacity": 10000}
+        blocked = 0.0
+        for i in range(changes):
+            prefs["search_query"] = "jita"[: i % 4 + 1] + str(i)
+            start = time.perf_counter()
+            save("bench", prefs)
+            blocked += time.perf_counter() - start
+            time.sleep(interval)
+        prefs_service.flush_prefs()
+    finally:
+        prefs_service._write_atomic = original
+    return writes, blocked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--changes", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between changes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATA_ROOT = tmp
+        direct_writes, direct_blocked = run(prefs_service.save_prefs, args.changes, args.interval)
+        behind_writes, behind_blocked = run(prefs_service.schedule_save, args.changes, args.interval)
+
+    print(f"changes: {args.changes}  every {args.interval * 1000:.0f} ms  flush delay: {prefs_service.FLUSH_DELAY}s")
+    print(f"write-through (save_prefs):   {direct_writes:5d} writes, callbacks blocked {direct_blocked * 1000:8.2f} ms")
+    print(f"write-behind (schedule_save): {behind_writes:5d} writes, callbacks blocked {behind_blocked * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
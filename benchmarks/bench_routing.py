@@ -0,0 +1,118 @@
+"""Routing benchmark: bounded BFS over the CSR stargate graph.
+
+The repository ships no stargate dataset, so a synthetic one is generated
+(each constellation a ring of its systems, plus random gates between
+constellations, ~3 gates per system). BFS hop counts are checked against
+networkx.
+
+Usage (from the project root):
+    python benchmarks/bench_routing.py [--queries N] [--max-jumps N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from app.models.jump_graph import JumpGraph
+from app.models.price_model import PriceSnapshot
+from app.services.analytics_service import AnalyticsService
+from app.services.data_service import DataService, load_universe
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+class StaticPrices:
+    def __init__(self, prices):
+        self.snapshot = PriceSnapshot("static", prices)
+        self.prices = prices
+
+    def get_all_prices(self):
+        return dict(self.prices)
+
+    def vector(self, resources):
+        return self.snapshot.vector(resources)
+
+
+def synthetic_gates(universe, rng):
+    by_constellation = {}
+    for code, name in enumerate(universe.systems):
+        rows = np.flatnonzero(universe.row_system == code)
+        by_constellation.setdefault(int(universe.row_constellation[rows[0]]), []).append(name)
+    edges = []
+    for names in by_constellation.values():
+        if len(names) > 1:
+            edges += [(names[i], names[(i + 1) % len(names)]) for i in range(len(names))]
+    systems = list(universe.systems)
+    edges += [(rng.choice(systems), rng.choice(systems)) for _ in range(len(systems) // 2)]
+    return pd.DataFrame(edges, columns=["From System", "To System"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-jumps", type=int, default=5)
+    args = parser.parse_args()
+
+    universe = load_universe(DATA_PATH)
+    rng = random.Random(0)
+    gates = synthetic_gates(universe, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stargates.csv")
+        gates.to_csv(path, index=False)
+        start = time.perf_counter()
+        graph = JumpGraph.load(universe, path)
+        load_t = time.perf_counter() - start
+
+    starts = [rng.randrange(len(universe.systems)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    reached = [graph.within(s, args.max_jumps) for s in starts]
+    bfs_t = (time.perf_counter() - start) / len(starts)
+
+    import networkx as nx
+    nx_graph = nx.Graph()
+    nx_graph.add_nodes_from(range(graph.num_systems))
+    for s in range(graph.num_systems):
+        nx_graph.add_edges_from((s, int(t)) for t in graph.indices[graph.indptr[s]:graph.indptr[s + 1]])
+    start = time.perf_counter()
+    expected = [nx.single_source_shortest_path_length(nx_graph, s, cutoff=args.max_jumps) for s in starts]
+    nx_t = (time.perf_counter() - start) / len(starts)
+    for (systems, hops), lengths in zip(reached, expected):
+        assert dict(zip(systems.tolist(), hops.tolist())) == lengths
+
+    svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+    svc.load_data()
+    analytics = AnalyticsService(svc, StaticPrices({r: rng.uniform(1, 1000) for r in universe.resources}))
+    analytics.get_most_profitable_planets(1)  # warm the valuation cache
+    names = [universe.systems[s] for s in starts]
+
+    def route_time():
+        start = time.perf_counter()
+        routes = [analytics.get_optimal_mining_route(n, args.max_jumps) for n in names]
+        return (time.perf_counter() - start) / len(names), routes
+
+    fallback_t, _ = route_time()
+    svc.jump_graph = graph
+    route_t, routes = route_time()
+
+    print(f"systems: {graph.num_systems:,}  gates: {graph.num_gates:,}  max jumps: {args.max_jumps}")
+    print(f"load CSR graph from CSV:            {load_t * 1000:8.1f} ms")
+    print(f"bounded BFS (CSR):                  {bfs_t * 1000:8.3f} ms/query "
+          f"(avg {np.mean([len(r[0]) for r in reached]):.0f} systems)")
+    print(f"networkx shortest path, cutoff:     {nx_t * 1000:8.3f} ms/query")
+    print(f"route, constellation fallback:      {fallback_t * 1000:8.3f} ms/query")
+    print(f"route, jump graph:                  {route_t * 1000:8.3f} ms/query "
+          f"(avg {np.mean([len(r) for r in routes]):.0f} planets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold start benchmark: building the universe from parquet vs. mapping its snapshot.
+
+Each path runs in a fresh interpreter (like a stopped Fly.io machine
+starting up) and is timed from process launch to the serialized bytes of
+the first table page:
+- parquet:  pq.read_table + Universe.from_arrow + FilterIndex
+- snapshot: SHA-256 of the parquet + memory-mapped data/eve_planets.universe
+  (universe and filter index)
+
+Usage (from the project root):
+    python benchmarks/bench_snapshot.py [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def run_path(path):
+    import numpy as np
+    import pyarrow as pa
+    from streamlit import type_util
+
+    from app.models.filter_index import FilterIndex
+    from app.models.universe import Universe
+    from app.models.universe_snapshot import read_snapshot, snapshot_path, source_digest
+    from app.services import data_service
+    from app.utils.valuation import value_rows
+
+    start = time.perf_counter()
+    if path == "parquet":
+        universe = Universe.from_arrow(data_service._read_planets_table(DATA_PATH))
+        FilterIndex(universe)
+    else:
+        universe, _ = read_snapshot(snapshot_path(DATA_PATH), source_digest(DATA_PATH))
+    loaded = time.perf_counter() - start
+
+    rows = np.arange(100)
+    prices = np.ones(len(universe.resources))
+    per_unit, total = value_rows(universe.row_output[rows], universe.row_resource[rows], prices)
+    page = universe.page_table(rows)
+    page = page.append_column("Value/h/unit", pa.array(per_unit)).append_column("Total Value/h", pa.array(total))
+    type_util.pyarrow_table_to_bytes(page)
+    return {"load_s": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["parquet", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_path(args.child)))
+        return
+
+    from app.services.data_service import build_universe_snapshot
+    path = build_universe_snapshot(DATA_PATH)
+    print(f"snapshot: {os.path.relpath(path, project_root)} ({os.path.getsize(path) / 1024:.0f} KiB)  "
+          f"runs: {args.runs} (best)")
+    for path in ("parquet", "snapshot"):
+        loads, walls = [], []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path],
+                                 check=True, capture_output=True, text=True, cwd=project_root)
+            walls.append(time.perf_counter() - start)
+            loads.append(json.loads(out.stdout.strip().splitlines()[-1])["load_s"])
+        print(f"{path:<9} universe {min(loads) * 1000:7.1f} ms   "
+              f"process start to first page {min(walls) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Analysis table benchmark: full sorted frame vs. one server-side page.
+
+For filters of growing width, measures building the frame sent to
+st.data_editor and its Arrow payload (what Streamlit ships to the
+browser), for the previous "value + sort everything" path and for a
+single page sliced from the precomputed order.
+
+Usage (from the project root):
+    python benchmarks/bench_table.py [--page-size N] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from streamlit import type_util
+
+from app.models.sort_index import page_rows
+from app.services.data_service import DataService
+from app.utils.valuation import UniverseValuation, price_vector, value_rows
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    svc = DataService(DATA_PATH, mining_units_path=os.devnull)
+    svc.load_data()
+    universe = svc.universe
+    master_df = universe.analysis_frame()
+    rng = random.Random(0)
+    prices = price_vector(universe.resources, {r: rng.uniform(1, 1000) for r in universe.resources})
+    units = np.zeros(universe.num_rows, dtype=np.int32)
+    units[rng.sample(range(universe.num_rows), 300)] = 5
+    valuation = UniverseValuation(universe, prices, units)
+    index = svc.filter_index
+
+    def with_values(frame):
+        rows = frame.index.to_numpy()
+        per_unit, total = value_rows(universe.row_output[rows], universe.row_resource[rows], prices, units[rows])
+        return frame.assign(**{"Mining Units": units[rows], "Value/h/unit": per_unit, "Total Value/h": total})
+
+    def shipped(frame):
+        for col in frame.select_dtypes('category').columns:
+            frame[col] = frame[col].cat.remove_unused_categories()
+        return type_util.data_frame_to_bytes(frame)
+
+    filters = [
+        ("system Jita", index.rows(index.level_bitmap("system", ["Jita"]))),
+        ("region The Forge", index.rows(index.level_bitmap("region", ["The Forge"]))),
+        ("5 regions", index.rows(index.level_bitmap("region", list(universe.regions[:5])))),
+        ("no filter", None),
+    ]
+    print(f"page size: {args.page_size}")
+    print("filter            rows    | full: build+sort  payload   | page: build  payload")
+    for name, rows in filters:
+        def full():
+            frame = master_df if rows is None else master_df.take(rows)
+            return shipped(with_values(frame).sort_values(by="Total Value/h", ascending=False))
+
+        def paged():
+            page, _ = page_rows(valuation.order("total_value"), rows, universe.num_rows, 0, args.page_size)
+            return shipped(with_values(master_df.take(page)))
+
+        full_t, full_bytes = best_of(full, args.repeat)
+        page_t, page_bytes = best_of(paged, args.repeat)
+        count = universe.num_rows if rows is None else len(rows)
+        print(f"{name:<16} {count:>8,} | {full_t * 1000:9.1f} ms {len(full_bytes) / 1024:9.0f} KiB | "
+              f"{page_t * 1000:6.1f} ms {len(page_bytes) / 1024:6.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
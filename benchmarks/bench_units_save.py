@@ -0,0 +1,63 @@
+"""Mining units save benchmark: full JSON rewrite vs. delta log append.
+
+Saves after a single changed cell, for users with a growing number of
+assigned rows.
+
+Usage (from the project root):
+    python benchmarks/bench_units_save.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.services.units_log import UnitsLog
+
+SIZES = (300, 3000, 30000)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("assigned rows | full rewrite | log append | load (snapshot + log)")
+    for size in SIZES:
+        units = {f"{40000000 + i}_Base Metals": 1 + i % 9 for i in range(size)}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "mining_units.json")
+
+            def full_rewrite():
+                units["40000000_Base Metals"] += 1
+                with open(path, 'w') as f:
+                    json.dump(units, f, indent=4)
+
+            rewrite_t = best_of(full_rewrite, args.repeat)
+            log = UnitsLog(path)
+
+            def append_one():
+                units["40000000_Base Metals"] += 1
+                log.append({"40000000_Base Metals": units["40000000_Base Metals"]})
+
+            append_t = best_of(append_one, args.repeat)
+            load_t = best_of(lambda: UnitsLog(path).load(), args.repeat)
+            assert UnitsLog(path).load() == units
+        print(f"{size:>13,} | {rewrite_t * 1000:9.2f} ms | {append_t * 1000:7.3f} ms | {load_t * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
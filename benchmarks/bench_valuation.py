@@ -0,0 +1,89 @@
+"""Valuation benchmark: per-object total_value() loops vs. the NumPy kernel.
+
+Values every row for one price list and a random mining units profile, then
+totals per planet, system, constellation and region.
+
+Usage (from the project root):
+    python benchmarks/bench_valuation.py [--repeat N] [--units N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.services.data_service import load_universe
+from app.utils.valuation import LEVELS, UniverseValuation, price_vector
+
+from benchmarks.legacy import dataclass_graph
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def object_totals(planets, prices):
+    """The old AnalyticsService path: total_value() per planet, dict grouping above it."""
+    totals = {level: {} for level in LEVELS}
+    for planet in planets:
+        value = planet.total_value(prices)
+        totals["planet"][planet.planet_id] = value
+        for level, name in (("system", planet.system), ("constellation", planet.constellation),
+                            ("region", planet.region)):
+            totals[level][name] = totals[level].get(name, 0.0) + value
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--units", type=int, default=300, help="rows with mining units")
+    args = parser.parse_args()
+
+    universe = load_universe(DATA_PATH)
+    rng = random.Random(0)
+    prices = {r: rng.uniform(1, 1000) for r in universe.resources}
+    rows = rng.sample(range(universe.num_rows), min(args.units, universe.num_rows))
+    mining_units = {universe.row_key(r): rng.randint(1, 20) for r in rows}
+    units = np.zeros(universe.num_rows, dtype=np.int32)
+    units[rows] = [mining_units[universe.row_key(r)] for r in rows]
+
+    dataclasses = list(dataclass_graph(universe, mining_units).values())
+    views = list(universe.build_planets(mining_units).values())
+
+    dataclass_t, expected = best_of(lambda: object_totals(dataclasses, prices), args.repeat)
+    views_t, _ = best_of(lambda: object_totals(views, prices), args.repeat)
+
+    def kernel():
+        valuation = UniverseValuation(universe, price_vector(universe.resources, prices), units)
+        return {level: valuation.totals(level) for level in LEVELS}
+
+    kernel_t, totals = best_of(kernel, args.repeat)
+
+    planet_values = [expected["planet"][pid] for pid in universe.planet_ids.tolist()]
+    assert np.allclose(totals["planet"], planet_values)
+    for level, table in (("system", universe.systems), ("constellation", universe.constellations),
+                         ("region", universe.regions)):
+        assert np.allclose(totals[level], [expected[level][name] for name in table])
+
+    print(f"rows: {universe.num_rows:,}  planets: {universe.num_planets:,}  assigned rows: {len(rows):,}")
+    print(f"dataclass graph, total_value() loop:  {dataclass_t * 1000:10.1f} ms")
+    print(f"planet views, total_value() loop:     {views_t * 1000:10.1f} ms")
+    print(f"valuation kernel (rows + 4 levels):   {kernel_t * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Previous implementations kept as baselines for the benchmarks."""
+from dataclasses import dataclass
+from typing import Dict, List
+
+from app.models.data_model import PlanetType, Richness
+
+
+@dataclass
+class PlanetaryResource:
+    planet_id: int
+    region: str
+    constellation: str
+    system: str
+    planet_name: str
+    planet_type: PlanetType
+    resource: str
+    richness: Richness
+    output: float
+    mining_units: int = 0
+
+    def calculate_value_per_unit(self, price_dict: Dict[str, float]) -> float:
+        if self.resource not in price_dict:
+            return 0.0
+        return self.output * price_dict[self.resource]
+
+    def calculate_total_value(self, price_dict: Dict[str, float]) -> float:
+        return self.calculate_value_per_unit(price_dict) * self.mining_units
+
+
+@dataclass
+class Planet:
+    planet_id: int
+    region: str
+    constellation: str
+    system: str
+    name: str
+    planet_type: PlanetType
+    resources: List[PlanetaryResource] = None
+
+    def __post_init__(self):
+        if self.resources is None:
+            self.resources = []
+
+    def add_resource(self, resource: PlanetaryResource):
+        self.resources.append(resource)
+
+    def total_value(self, price_dict: Dict[str, float]) -> float:
+        return sum(r.calculate_total_value(price_dict) for r in self.resources)
+
+
+def legacy_process_data(df, mining_units):
+    """The original DataService._process_data (iterrows + enum constructors)."""
+    planets = {}
+    for _, row in df.iterrows():
+        planet_id = int(row['Planet ID'])
+        resource = row['Resource']
+        planetary_resource = PlanetaryResource(
+            planet_id=planet_id,
+            region=row['Region'],
+            constellation=row['Constellation'],
+            system=row['System'],
+            planet_name=row['Planet Name'],
+            planet_type=PlanetType(row['Planet Type']),
+            resource=resource,
+            richness=Richness(row['Richness']),
+            output=float(row['Output']),
+            mining_units=mining_units.get(f"{planet_id}_{resource}", 0)
+        )
+        if planet_id not in planets:
+            planets[planet_id] = Planet(
+                planet_id=planet_id,
+                region=row['Region'],
+                constellation=row['Constellation'],
+                system=row['System'],
+                name=row['Planet Name'],
+                planet_type=PlanetType(row['Planet Type'])
+            )
+        planets[planet_id].add_resource(planetary_resource)
+    return planets
+
+
+def dataclass_graph(universe, mining_units):
+    """Build the same object graph as legacy_process_data, quickly, from a Universe."""
+    planets = {}
+    for planet in universe.build_planets(mining_units).values():
+        copy = Planet(planet.planet_id, planet.region, planet.constellation,
+                      planet.system, planet.name, planet.planet_type)
+        for r in planet.resources:
+            copy.add_resource(PlanetaryResource(
+                r.planet_id, r.region, r.constellation, r.system, r.planet_name,
+                r.planet_type, r.resource, r.richness, r.output, r.mining_units))
+        planets[copy.planet_id] = copy
+    return planets
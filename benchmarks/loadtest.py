@@ -0,0 +1,276 @@
+"""Headless load test: N concurrent simulated users driving web_app.py.
+
+Every user is a separate Streamlit AppTest session (own session state,
+shared process caches, exactly like browser tabs on one server process),
+run on its own thread. After the first page load each user performs
+`--actions` random interactions, rerunning the script each time:
+- filter: pick a region / system / search query or clear the filters
+- edit: change Mining Units of a visible row and click "Update Mining Units"
+- prices: switch the sidebar price list
+- page: change the sort column or the page of the analysis table
+
+Reports rerun latency percentiles per action, reruns per second, process
+RSS before/after the sessions were opened and at the end (RSS growth per
+session), and any script exceptions. Runs fully offline: no server or
+browser, and user data goes to a temporary DATA_ROOT.
+
+Usage (from the project root):
+    python benchmarks/loadtest.py [--users N] [--actions N] [--think SECONDS] [--output report.json]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+APP_PATH = os.path.join(project_root, "web_app.py")
+ACTIONS = ("filter", "edit", "prices", "page")
+
+
+def rss_mib() -> float:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def share_runtime():
+    """Let AppTest sessions run concurrently in one process.
+
+    AppTest installs a mock Runtime singleton at the start of every run and
+    removes it at the end, so parallel runs tear each other's runtime down.
+    A real server has one Runtime for all sessions: install one shared mock
+    and point AppTest's per-run install/removal at a throwaway class. The
+    server also compiles the script once into a shared ScriptCache, whereas
+    every AppTest run compiles it again; concurrent compile() calls can fail
+    on CPython 3.11 ("AST constructor recursion depth mismatch").
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner import script_run_context
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("PerRunRuntime", (), {"_instance": None})
+
+    script_cache = ScriptCache()
+    init = LocalScriptRunner.__init__
+
+    def init_with_shared_cache(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self._script_cache = script_cache
+
+    LocalScriptRunner.__init__ = init_with_shared_cache
+    # Widget values are set from the user threads, outside any script run;
+    # streamlit resets logger levels from its config, so filter the warning
+    script_run_context._LOGGER.addFilter(lambda record: "missing ScriptRunContext" not in record.getMessage())
+
+
+def percentiles(values):
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"count": len(ordered), "mean_ms": statistics.fmean(ordered) * 1000,
+            "p50_ms": pick(0.5), "p90_ms": pick(0.9), "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+
+class SimulatedUser:
+    """One browser session: an AppTest driven by random interactions."""
+
+    def __init__(self, user_id: int, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+        self.user_id = user_id
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = defaultdict(list)
+        self.errors = []
+
+    def _timed_run(self, action, widget=None):
+        start = time.perf_counter()
+        (widget or self.at).run()
+        self.latencies[action].append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(f"user {self.user_id} {action}: {self.at.exception[0].value}")
+
+    def open(self):
+        self._timed_run("first_load")
+
+    def act(self):
+        action = self.rng.choice(ACTIONS)
+        getattr(self, "_" + action)()
+
+    def _filter(self):
+        sidebar = self.at.sidebar
+        choice = self.rng.random()
+        if choice < 0.3:
+            region = sidebar.multiselect(key="region_filter")
+            sidebar.multiselect(key="system_filter").set_value([])
+            widget = region.set_value([self.rng.choice(region.options)])
+        elif choice < 0.6:
+            systems = sidebar.multiselect(key="system_filter")
+            widget = systems.set_value([self.rng.choice(systems.options)])
+        elif choice < 0.85:
+            widget = sidebar.text_input(key="search_query").set_value(self.rng.choice(["jit", "ama", "the", "ge", "ra"]))
+        else:
+            sidebar.multiselect(key="region_filter").set_value([])
+            sidebar.multiselect(key="system_filter").set_value([])
+            widget = sidebar.text_input(key="search_query").set_value("")
+        self._timed_run("filter", widget)
+
+    def _edit(self):
+        if not self.at.dataframe:
+            return self._filter()
+        rows = len(self.at.dataframe[0].value)
+        if not rows:
+            return self._filter()
+        self.at.session_state["data_editor"] = {
+            "edited_rows": {self.rng.randrange(rows): {"Mining Units": self.rng.randint(0, 5)}},
+            "added_rows": [], "deleted_rows": [],
+        }
+        buttons = [b for b in self.at.button if b.label == "Update Mining Units"]
+        self._timed_run("edit", buttons[0].click() if buttons else None)
+
+    def _prices(self):
+        choice = self.at.sidebar.selectbox(key="side_price_choice")
+        options = [o for o in choice.options if o != choice.value] or choice.options
+        self._timed_run("prices", choice.set_value(self.rng.choice(options)))
+
+    def _page(self):
+        if self.rng.random() < 0.5:
+            sort = self.at.selectbox(key="table_sort_column")
+            widget = sort.set_value(self.rng.choice(sort.options))
+        else:
+            page = self.at.number_input(key="table_page")
+            widget = page.set_value(self.rng.randint(1, max(1, int(page.max or 1))))
+        self._timed_run("page", widget)
+
+
+def run(users: int, actions: int, think: float, timeout: float, seed: int) -> dict:
+    share_runtime()
+    # A warm-up session pays the process-wide costs (imports, universe, indexes)
+    rss_cold = rss_mib()
+    warmup = SimulatedUser(-1, seed - 1, timeout)
+    warmup.open()
+    cold_start = warmup.latencies["first_load"][0]
+    del warmup
+
+    rss_start = rss_mib()
+    sessions = [SimulatedUser(i, seed + i, timeout) for i in range(users)]
+    barrier = threading.Barrier(users)
+    opened = threading.Barrier(users + 1)
+    done = threading.Barrier(users + 1)
+    failures = []
+
+    def drive(user):
+        try:
+            barrier.wait()
+            user.open()
+        except Exception as e:  # keep the barriers moving
+            failures.append(f"user {user.user_id} first_load: {e!r}")
+        opened.wait()
+        opened.wait()
+        try:
+            for _ in range(actions):
+                if think:
+                    time.sleep(user.rng.uniform(0, 2 * think))
+                user.act()
+        except Exception as e:
+            failures.append(f"user {user.user_id}: {e!r}")
+        done.wait()
+
+    threads = [threading.Thread(target=drive, args=(user,), daemon=True) for user in sessions]
+    for thread in threads:
+        thread.start()
+    opened.wait()
+    rss_opened = rss_mib()
+    start = time.perf_counter()
+    opened.wait()
+    done.wait()
+    elapsed = time.perf_counter() - start
+    rss_end = rss_mib()
+
+    latencies = defaultdict(list)
+    for user in sessions:
+        failures.extend(user.errors)
+        for action, values in user.latencies.items():
+            latencies[action].extend(values)
+    reruns = [v for action, values in latencies.items() if action != "first_load" for v in values]
+    return {
+        "users": users, "actions_per_user": actions, "think_s": think, "cold_start_s": cold_start,
+        "elapsed_s": elapsed, "reruns_per_s": len(reruns) / elapsed if elapsed else 0.0,
+        "latency": {action: percentiles(values) for action, values in sorted(latencies.items())},
+        "all_reruns": percentiles(reruns) if reruns else None,
+        "rss_mib": {"cold": rss_cold, "start": rss_start, "sessions_open": rss_opened, "end": rss_end,
+                    "peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                    "per_session_open": (rss_opened - rss_start) / users,
+                    "growth_during_actions": rss_end - rss_opened},
+        "errors": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--actions", type=int, default=20, help="interactions per user after the first load")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a user's actions (s)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report JSON here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="evecalc-load-") as data_root:
+        # Settings are read at import time: isolate user data before importing the app
+        os.environ["DATA_ROOT"] = data_root
+        os.chdir(project_root)
+        report = run(args.users, args.actions, args.think, args.timeout, args.seed)
+
+    print(f"users: {report['users']}  actions/user: {report['actions_per_user']}  "
+          f"elapsed {report['elapsed_s']:.1f} s  reruns/s {report['reruns_per_s']:.1f}  "
+          f"cold start (warm-up session) {report['cold_start_s']:.2f} s")
+    print(f"{'action':<12}{'count':>7}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    rows = dict(report["latency"])
+    if report["all_reruns"]:
+        rows["all reruns"] = report["all_reruns"]
+    for action, stats in rows.items():
+        print(f"{action:<12}{stats['count']:>7}{stats['p50_ms']:>10.0f}{stats['p90_ms']:>10.0f}"
+              f"{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}{stats['max_ms']:>10.0f}")
+    rss = report["rss_mib"]
+    print(f"RSS: cold {rss['cold']:.0f} MiB, after warm-up {rss['start']:.0f} MiB, sessions open {rss['sessions_open']:.0f} MiB "
+          f"(+{rss['per_session_open']:.1f} MiB/session), end {rss['end']:.0f} MiB, peak {rss['peak']:.0f} MiB")
+    print(f"errors: {len(report['errors'])}")
+    for error in report["errors"][:10]:
+        print("  " + error)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
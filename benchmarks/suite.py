@@ -0,0 +1,529 @@
+"""Benchmark suite for the data, price and analytics services (no Streamlit).
+
+Times the service hot paths on the bundled dataset and on synthetic
+universes scaled 10x and 100x, and writes machine-readable JSON. Each scale
+runs in a fresh interpreter so memory and import state do not leak
+between scales.
+
+Synthetic universes copy the bundled one `scale` times, renaming every
+region, constellation, system and planet per copy (suffix " <copy>") and
+offsetting planet IDs, so the hierarchy grows with the rows while resources
+stay the same. Price files hold 1,000 x scale items (the universe's
+resources plus synthetic market items); market dumps spread 50,000 x scale
+CSV rows / 10,000 x scale JSON records over several regions, most of them
+for items outside the universe. Streaming import cases also report their
+throughput in rows/s.
+
+Usage (from the project root):
+    python benchmarks/suite.py [--scales 1,10,100] [--output results.json]
+                               [--compare benchmarks/baseline.json] [--threshold 1.5]
+    python benchmarks/suite.py --save-baseline    # refresh benchmarks/baseline.json
+
+With --compare, every case whose best time is `threshold` times the
+baseline's (and at least --min-delta-ms slower) is reported as a
+regression and the exit status is 1. Each scale also times a fixed
+calibration workload; ratios are divided by its ratio to the baseline's,
+so a machine that is uniformly faster or slower than when the baseline was
+recorded (shared or throttled CPUs) does not flag every case
+(--no-normalize turns this off), and suspected regressions are timed once
+more in a fresh interpreter (--retries) before they are reported, keeping
+the better run. Baselines are still machine-specific:
+record one on the machine that runs the comparison, and record it again
+whenever a case is added.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.models.filter_index import FilterState
+from app.models.price_model import PriceSnapshot
+from app.models.universe import SOURCE_COLUMNS, Universe
+from app.models.universe_snapshot import read_snapshot, snapshot_path, source_digest
+from app.services import data_service, price_import, price_lists
+from app.services.analytics_service import AnalyticsService
+from app.services.data_service import DataService, build_universe_snapshot
+from app.services.price_service import PriceService
+from app.utils.valuation import UniverseValuation, price_vector
+
+DATA_PATH = os.path.join(project_root, "data", "eve_planets.parquet")
+BASELINE_PATH = os.path.join(project_root, "benchmarks", "baseline.json")
+SCHEMA_VERSION = 1
+# Default timed repetitions per scale (best and median are reported); small
+# scales get more, since their sub-millisecond cases are the noisiest
+REPEATS = {1: 20, 10: 5, 100: 2}
+_NAME_COLUMNS = ("Region", "Constellation", "System", "Planet Name")
+
+_DUMP_REGIONS = ("The Forge", "Domain", "Sinq Laison", "Metropolis", "Heimatar")
+
+# name -> (setup(ctx) returning the timed callable, calls per repetition, items(ctx) per call)
+CASES: Dict[str, tuple] = {}
+
+
+def case(name: str, number: int = 1, items: Optional[Callable] = None):
+    """Register a benchmark case; `number` calls are timed per repetition.
+
+    `items(ctx)` gives the rows one call processes, to report throughput.
+    """
+    def register(setup: Callable):
+        CASES[name] = (setup, number, items)
+        return setup
+    return register
+
+
+def synthetic_table(base: pa.Table, scale: int) -> pa.Table:
+    """The planets table repeated `scale` times with per-copy names and planet IDs."""
+    if scale == 1:
+        return base
+    columns = {}
+    for name in SOURCE_COLUMNS:
+        column = base.column(name).combine_chunks()
+        if name == "Planet ID":
+            span = pc.max(column).as_py() - pc.min(column).as_py() + 1
+            ids = column.to_numpy().astype(np.int64)
+            columns[name] = pa.array(np.concatenate([ids + copy * span for copy in range(scale)]).astype(np.int32))
+        elif name == "Output":
+            columns[name] = pa.array(np.tile(column.to_numpy(zero_copy_only=False), scale))
+        else:
+            encoded = pc.dictionary_encode(column)
+            indices = encoded.indices.to_numpy()
+            dictionary = encoded.dictionary
+            if name in _NAME_COLUMNS:
+                # A renamed dictionary per copy: indices shift by the dictionary size
+                dictionary = pa.concat_arrays([
+                    dictionary if copy == 0 else pc.binary_join_element_wise(dictionary, f" {copy}", "")
+                    for copy in range(scale)
+                ])
+                indices = np.concatenate([indices + copy * len(encoded.dictionary) for copy in range(scale)])
+            else:
+                indices = np.tile(indices, scale)
+            columns[name] = pa.DictionaryArray.from_arrays(pa.array(indices.astype(np.int32)), dictionary)
+    return pa.table(columns)
+
+
+def write_price_files(folder: str, resources, items: int, seed: int = 0):
+    """A prices JSON and a market CSV with `items` entries; returns their paths."""
+    rng = random.Random(seed)
+    names = list(resources) + [f"Market Item {i}" for i in range(max(0, items - len(resources)))]
+    prices = {name: round(rng.uniform(1, 5000), 2) for name in names}
+    json_path = os.path.join(folder, "prices.json")
+    with open(json_path, "w") as f:
+        json.dump(prices, f, indent=4)
+    csv_path = os.path.join(folder, "prices.csv")
+    with open(csv_path, "w") as f:
+        f.write("resource,price\n")
+        f.writelines(f"{name},{price}\n" for name, price in prices.items())
+    return json_path, csv_path
+
+
+def write_market_dumps(folder: str, resources, csv_rows: int, json_rows: int, seed: int = 0):
+    """A multi-region market dump as CSV and as JSON records; returns their paths.
+
+    A fifth of the rows are the universe's resources, the rest other market items.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(resources) + [f"Market Item {i}" for i in range(4 * len(resources))]
+
+    def rows(count):
+        items = rng.integers(0, len(names), count)
+        regions = rng.integers(0, len(_DUMP_REGIONS), count)
+        buy = np.round(rng.uniform(1, 5000, count), 2)
+        return zip(items.tolist(), regions.tolist(), buy.tolist(), np.round(buy * 1.1, 2).tolist())
+
+    csv_path = os.path.join(folder, "market_dump.csv")
+    with open(csv_path, "w") as f:
+        f.write("region,item,buy,sell,average\n")
+        f.writelines(f"{_DUMP_REGIONS[r]},{names[i]},{b},{s},{round((b + s) / 2, 2)}\n"
+                     for i, r, b, s in rows(csv_rows))
+    json_path = os.path.join(folder, "market_dump.json")
+    with open(json_path, "w") as f:
+        f.write("[\n")
+        f.write(",\n".join(json.dumps({"region": _DUMP_REGIONS[r], "name": names[i], "buy": b, "sell": s})
+                            for i, r, b, s in rows(json_rows)))
+        f.write("\n]\n")
+    return csv_path, json_path
+
+
+class Context:
+    """Dataset and services of one scale, shared by the cases."""
+
+    def __init__(self, folder: str, scale: int):
+        self.scale = scale
+        self.folder = folder
+        self.data_path = os.path.join(folder, "eve_planets.parquet")
+        pq.write_table(synthetic_table(pq.read_table(DATA_PATH, columns=SOURCE_COLUMNS), scale), self.data_path)
+        build_universe_snapshot(self.data_path)
+
+        self.data = DataService(self.data_path, mining_units_path=os.path.join(folder, "mining_units.json"))
+        self.data.load_data()
+        self.universe = self.data.universe
+        self.json_path, self.csv_path = write_price_files(folder, self.universe.resources, 1000 * scale)
+        self.prices = PriceService(self.json_path)
+        self.dump_rows = {"csv": 50_000 * scale, "json": 10_000 * scale}
+        self.dump_csv_path, self.dump_json_path = write_market_dumps(
+            folder, self.universe.resources, self.dump_rows["csv"], self.dump_rows["json"])
+
+        rng = random.Random(0)
+        rows = rng.sample(range(self.universe.num_rows), 300)
+        self.data.update_mining_units_batch({self.universe.row_key(row): rng.randint(1, 10) for row in rows})
+        self.analytics = AnalyticsService(self.data, self.prices)
+        self.price_vector = price_vector(self.universe.resources, self.prices.get_all_prices())
+        self.regions = list(self.universe.regions[:3])
+        self.constellations = self.data.get_constellations(self.regions)
+
+
+# --- Data loading ---
+
+@case("data.read_table")
+def _read_table(ctx):
+    return lambda: data_service._read_planets_table(ctx.data_path)
+
+
+@case("data.from_arrow")
+def _from_arrow(ctx):
+    table = data_service._read_planets_table(ctx.data_path)
+    return lambda: Universe.from_arrow(table)
+
+
+@case("data.snapshot_map")
+def _snapshot_map(ctx):
+    path = snapshot_path(ctx.data_path)
+    return lambda: read_snapshot(path, source_digest(ctx.data_path))
+
+
+@case("data.load_data")
+def _load_data(ctx):
+    def run():
+        data_service._shared_cache.clear()
+        DataService(ctx.data_path, mining_units_path=os.devnull).load_data()
+    return run
+
+
+# --- Hierarchy lookups ---
+
+@case("hierarchy.regions", number=100)
+def _regions(ctx):
+    return ctx.data.get_regions
+
+
+@case("hierarchy.constellations", number=100)
+def _constellations(ctx):
+    return lambda: ctx.data.get_constellations(ctx.regions)
+
+
+@case("hierarchy.systems", number=100)
+def _systems(ctx):
+    return lambda: ctx.data.get_systems(ctx.constellations)
+
+
+# --- Filters (fresh per-session state: nothing memoized) ---
+
+@case("filter.region", number=10)
+def _filter_region(ctx):
+    return lambda: FilterState(ctx.data.filter_index).rows(regions=ctx.regions)
+
+
+@case("filter.search", number=10)
+def _filter_search(ctx):
+    return lambda: FilterState(ctx.data.filter_index).rows(search="jit")
+
+
+@case("filter.combined", number=10)
+def _filter_combined(ctx):
+    resources = list(ctx.universe.resources[:5])
+    return lambda: FilterState(ctx.data.filter_index).rows(regions=ctx.regions, search="a", resources=resources)
+
+
+# --- Valuation and the analysis table ---
+
+@case("valuation.build")
+def _valuation(ctx):
+    units = ctx.data.mining_units_vector()
+
+    def run():
+        valuation = UniverseValuation(ctx.universe, ctx.price_vector, units)
+        valuation.order("total_value")
+        valuation.totals("system")
+    return run
+
+
+@case("table.page", number=10)
+def _table_page(ctx):
+    order = ctx.analytics.get_valuation().order("total_value")
+    return lambda: ctx.universe.page_table(order[:100])
+
+
+# --- Analytics rankings (valuation cached, as between reruns) ---
+
+@case("analytics.top_planets", number=10)
+def _top_planets(ctx):
+    ctx.analytics.get_valuation()
+    return lambda: ctx.analytics.get_most_profitable_planets(10)
+
+
+@case("analytics.top_systems", number=10)
+def _top_systems(ctx):
+    ctx.analytics.get_valuation()
+    return lambda: ctx.analytics.get_most_profitable_systems(10)
+
+
+@case("analytics.resource_distribution", number=10)
+def _distribution(ctx):
+    resource = ctx.universe.resources[0]
+    return lambda: ctx.analytics.get_resource_distribution(resource)
+
+
+# --- Prices ---
+
+@case("prices.load_json")
+def _load_json(ctx):
+    return lambda: PriceService(ctx.json_path)
+
+
+@case("prices.import_csv")
+def _import_csv(ctx):
+    service = PriceService(os.path.join(ctx.folder, "imported_prices.json"))
+    return lambda: service.import_prices_from_csv(ctx.csv_path)
+
+
+@case("prices.parse_csv")
+def _parse_csv(ctx):
+    return lambda: price_lists.parse_price_file(ctx.csv_path)
+
+
+@case("prices.switch_list")
+def _switch_list(ctx):
+    # Cached lookup + aligned price vector, what a sidebar price list switch costs
+    resources = ctx.universe.resources
+    return lambda: price_lists.load_price_list(ctx.csv_path).vector(resources)
+
+
+@case("prices.compare_snapshots")
+def _compare_snapshots(ctx):
+    current = ctx.prices.active
+    lower = PriceSnapshot("lower", {name: price * 0.9 for name, price in current.prices.items()})
+    return lambda: ctx.analytics.compare_price_snapshots([current, lower], "system")
+
+
+@case("prices.stream_csv", items=lambda ctx: ctx.dump_rows["csv"])
+def _stream_csv(ctx):
+    resources = ctx.universe.resources
+    return lambda: price_import.import_prices(ctx.dump_csv_path, resources=resources)
+
+
+@case("prices.stream_json", items=lambda ctx: ctx.dump_rows["json"])
+def _stream_json(ctx):
+    resources = ctx.universe.resources
+    return lambda: price_import.import_prices(ctx.dump_json_path, resources=resources)
+
+
+CALIBRATION = "calibration"
+
+
+def _calibration() -> None:
+    # Fixed mix of interpreter and numpy work, independent of the code under test
+    values = np.random.default_rng(0).random(200_000)
+    sorted(values.tolist())
+    np.sort(values)
+    json.dumps(values[:20_000].tolist())
+
+
+def measure(fn, repeat: int, number: int) -> List[float]:
+    """Seconds per call of each repetition (after one untimed warm-up call)."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def run_scale(scale: int, repeat: int, only: List[str]) -> List[dict]:
+    with tempfile.TemporaryDirectory(prefix="evecalc-bench-") as folder:
+        ctx = Context(folder, scale)
+        timings = measure(_calibration, max(repeat, 5), 1)
+        results = [{"case": CALIBRATION, "scale": scale, "best_s": min(timings),
+                    "median_s": statistics.median(timings), "repeat": max(repeat, 5), "number": 1}]
+        for name, (setup, number, items) in CASES.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            timings = measure(setup(ctx), repeat, number)
+            result = {
+                "case": name, "scale": scale, "rows": ctx.universe.num_rows,
+                "best_s": min(timings), "median_s": statistics.median(timings),
+                "repeat": repeat, "number": number,
+            }
+            if items is not None:
+                result["items"] = items(ctx)
+                result["items_per_s"] = result["items"] / result["best_s"]
+            results.append(result)
+        return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import pandas
+    return {
+        "python": platform.python_version(), "platform": platform.platform(),
+        "machine": platform.machine(), "cpu_count": os.cpu_count(),
+        "numpy": np.__version__, "pandas": pandas.__version__, "pyarrow": pa.__version__,
+        "commit": commit,
+    }
+
+
+def _speed_factors(results: List[dict], previous: Dict[tuple, dict]) -> Dict[int, float]:
+    """Current / baseline calibration time per scale."""
+    speed = {}
+    for r in results:
+        old = previous.get((CALIBRATION, r["scale"]))
+        if r["case"] == CALIBRATION and old is not None:
+            speed[r["scale"]] = r["best_s"] / old["best_s"]
+    return speed
+
+
+def _judge(r: dict, old: dict, speed: float, threshold: float, min_delta_ms: float) -> tuple:
+    """(ratio to the baseline after dividing by the speed factor, whether it is a regression)"""
+    best = r["best_s"] / speed
+    ratio = best / old["best_s"] if old["best_s"] else float("inf")
+    return ratio, ratio >= threshold and (best - old["best_s"]) * 1000 >= min_delta_ms
+
+
+def regressed_cases(results: List[dict], baseline: dict, threshold: float, min_delta_ms: float,
+                    normalize: bool = True) -> List[tuple]:
+    """(case, scale) of the results that are regressions against the baseline."""
+    previous = {(r["case"], r["scale"]): r for r in baseline.get("results", [])}
+    speed = _speed_factors(results, previous) if normalize else {}
+    return [(r["case"], r["scale"]) for r in results
+            if r["case"] != CALIBRATION and (r["case"], r["scale"]) in previous
+            and _judge(r, previous[(r["case"], r["scale"])], speed.get(r["scale"], 1.0), threshold, min_delta_ms)[1]]
+
+
+def compare(results: List[dict], baseline: dict, threshold: float, min_delta_ms: float,
+            normalize: bool = True) -> int:
+    """Print each case against the baseline; returns the number of regressions.
+
+    With `normalize`, times are divided by the scale's machine speed factor
+    (current / baseline calibration time) before comparing.
+    """
+    previous = {(r["case"], r["scale"]): r for r in baseline.get("results", [])}
+    speed = _speed_factors(results, previous) if normalize else {}
+    for scale, factor in speed.items():
+        print(f"machine speed factor at scale {scale}: {factor:.2f}x the baseline's")
+    regressions = 0
+    print(f"{'case':<34}{'scale':>6}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for r in results:
+        if r["case"] == CALIBRATION:
+            continue
+        old = previous.get((r["case"], r["scale"]))
+        if old is None:
+            print(f"{r['case']:<34}{r['scale']:>6}{'-':>12}{r['best_s'] * 1000:>10.3f}ms{'new':>8}")
+            continue
+        ratio, regressed = _judge(r, old, speed.get(r["scale"], 1.0), threshold, min_delta_ms)
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ("  faster" if ratio <= 1 / threshold else "")
+        print(f"{r['case']:<34}{r['scale']:>6}{old['best_s'] * 1000:>10.3f}ms"
+              f"{r['best_s'] * 1000:>10.3f}ms{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def run_child(scale: int, only: List[str], repeat: Optional[int]) -> List[dict]:
+    """Run the cases of one scale in a fresh interpreter."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", str(scale), "--only", ",".join(only)]
+    if repeat:
+        command += ["--repeat", str(repeat)]
+    out = subprocess.run(command, check=True, capture_output=True, text=True, cwd=project_root)
+    scale_results = json.loads(out.stdout.strip().splitlines()[-1])
+    for r in scale_results:
+        throughput = f"  {r['items_per_s']:,.0f} rows/s" if "items_per_s" in r else ""
+        print(f"{r['case']:<34}x{scale:<4}{r['best_s'] * 1000:>11.3f} ms  (median {r['median_s'] * 1000:.3f}){throughput}",
+              file=sys.stderr)
+    return scale_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated universe scales")
+    parser.add_argument("--repeat", type=int, help="timed repetitions (default: %s)" % REPEATS)
+    parser.add_argument("--only", default="", help="comma-separated case name prefixes")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown ratio counted as a regression")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="compare raw times, without the calibration speed factor")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="times suspected regressions are timed again in a fresh interpreter")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    only = [p for p in args.only.split(",") if p]
+
+    if args.child:
+        repeat = args.repeat or REPEATS.get(args.child, 2)
+        print(json.dumps(run_scale(args.child, repeat, only)))
+        return 0
+
+    results = []
+    for scale in (int(s) for s in args.scales.split(",")):
+        results.extend(run_child(scale, only, args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for _ in range(args.retries):
+            flagged = regressed_cases(results, baseline, args.threshold, args.min_delta_ms, not args.no_normalize)
+            if not flagged:
+                break
+            # Keep the best time of both runs, so a one-off stall is not reported
+            index = {(r["case"], r["scale"]): r for r in results}
+            for scale in sorted({scale for _, scale in flagged}):
+                names = [name for name, s in flagged if s == scale]
+                print(f"timing {len(names)} suspected regression(s) at scale {scale} again", file=sys.stderr)
+                for r in run_child(scale, names, args.repeat):
+                    kept = index.get((r["case"], r["scale"]))
+                    if kept is not None and r["best_s"] < kept["best_s"]:
+                        kept.update(r)
+
+    report = {"schema": SCHEMA_VERSION, "environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if baseline is not None:
+        if baseline.get("environment", {}).get("platform") != report["environment"]["platform"]:
+            print("note: baseline was recorded on a different platform", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms, not args.no_normalize)
+        print(f"{regressions} regression(s) at threshold {args.threshold}x")
+        return 1 if regressions else 0
+    if not args.output and not args.save_baseline:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
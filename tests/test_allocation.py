@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from app.models.filter_index import FilterIndex
+from app.models.universe import SOURCE_COLUMNS, Universe
+from app.services.analytics_service import AnalyticsService
+from app.utils.allocation import allocate_units
+
+
+def _greedy(value_per_unit, row_planet, budget, planet_cap, rows=None):
+    """Brute force: place units one at a time on the most valuable row whose planet has room."""
+    rows = np.arange(len(value_per_unit)) if rows is None else np.asarray(rows)
+    used = {}
+    allocation = {}
+    for _ in range(max(budget, 0)):
+        best = None
+        for row in rows.tolist():
+            planet = int(row_planet[row])
+            if value_per_unit[row] <= 0 or used.get(planet, 0) >= planet_cap:
+                continue
+            if best is None or value_per_unit[row] > value_per_unit[best]:
+                best = row
+        if best is None:
+            break
+        planet = int(row_planet[best])
+        used[planet] = used.get(planet, 0) + 1
+        allocation[best] = allocation.get(best, 0) + 1
+    return allocation
+
+
+def _allocate(value_per_unit, row_planet, budget, planet_cap, rows=None):
+    chosen, units = allocate_units(value_per_unit, row_planet, budget, planet_cap, rows)
+    # Ordered by value, highest first
+    assert np.all(np.diff(value_per_unit[chosen]) <= 0)
+    return dict(zip(chosen.tolist(), units.tolist()))
+
+
+@pytest.fixture
+def random_rows():
+    rng = np.random.default_rng(7)
+    row_planet = np.repeat(np.arange(40), rng.integers(1, 6, size=40))
+    # Distinct values (so the greedy's choice is unique); some rows are worthless
+    value_per_unit = rng.permutation(len(row_planet)).astype(np.float64) - 10
+    return value_per_unit, row_planet
+
+
+@pytest.mark.parametrize("budget, planet_cap", [(3, 10), (10, 10), (23, 5), (47, 4), (1000, 3), (7, 1)])
+def test_matches_greedy(random_rows, budget, planet_cap):
+    value_per_unit, row_planet = random_rows
+    allocation = _allocate(value_per_unit, row_planet, budget, planet_cap)
+    assert allocation == _greedy(value_per_unit, row_planet, budget, planet_cap)
+    assert sum(allocation.values()) <= budget
+    assert all(0 < units <= planet_cap for units in allocation.values())
+
+
+def test_budget_below_cap_and_remainder(random_rows):
+    value_per_unit, row_planet = random_rows
+    top = int(np.argmax(value_per_unit))
+    assert _allocate(value_per_unit, row_planet, 3, 10) == {top: 3}
+
+    chosen, units = allocate_units(value_per_unit, row_planet, 23, 5)
+    assert units.tolist() == [5, 5, 5, 5, 3]
+    # The remainder goes to the least valuable of the chosen planets
+    assert value_per_unit[chosen[-1]] == value_per_unit[chosen].min()
+
+
+def test_zero_cap_or_budget(random_rows):
+    value_per_unit, row_planet = random_rows
+    for budget, planet_cap in ((10, 0), (0, 10), (-5, 10), (10, -1)):
+        chosen, units = allocate_units(value_per_unit, row_planet, budget, planet_cap)
+        assert len(chosen) == len(units) == 0
+
+
+def test_candidate_rows(random_rows):
+    value_per_unit, row_planet = random_rows
+    rows = np.flatnonzero(row_planet % 3 == 0)
+    allocation = _allocate(value_per_unit, row_planet, 17, 4, rows)
+    assert allocation == _greedy(value_per_unit, row_planet, 17, 4, rows)
+    assert set(allocation) <= set(rows.tolist())
+
+
+def test_optimize_mining_units_region_and_system_restriction():
+    universe = Universe.from_arrow(pq.read_table("data/eve_planets.parquet", columns=SOURCE_COLUMNS).slice(0, 5000))
+    prices = np.linspace(1.0, 50.0, len(universe.resources))
+    data = SimpleNamespace(universe=universe, filter_index=FilterIndex(universe), units_version=0,
+                           mining_units={}, mining_units_vector=lambda: np.zeros(universe.num_rows, dtype=np.int32))
+    analytics = AnalyticsService(data, SimpleNamespace(vector=lambda resources: prices))
+    value_per_unit = analytics.get_valuation().value_per_unit
+    region_names = np.asarray(universe.regions)[universe.row_region]
+    system_names = np.asarray(universe.systems)[universe.row_system]
+
+    regions = [universe.regions[-1]]
+    systems = sorted(set(system_names[region_names == regions[0]].tolist()))[:3] + [universe.systems[0]]
+    for kwargs, mask in (({"regions": regions}, region_names == regions[0]),
+                         ({"systems": systems}, np.isin(system_names, systems)),
+                         ({"regions": regions, "systems": systems},
+                          (region_names == regions[0]) & np.isin(system_names, systems))):
+        allocation, total = analytics.optimize_mining_units(12, 5, **kwargs)
+        expected = _greedy(value_per_unit, universe.row_planet, 12, 5, np.flatnonzero(mask))
+        assert allocation == {universe.row_key(row): units for row, units in expected.items()}
+        assert total == pytest.approx(sum(value_per_unit[row] * units for row, units in expected.items()))
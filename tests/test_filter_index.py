@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from app.models.filter_index import FilterIndex, FilterState
+from app.models.universe import SOURCE_COLUMNS, Universe
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return Universe.from_arrow(pq.read_table("data/eve_planets.parquet", columns=SOURCE_COLUMNS).slice(0, 20000))
+
+
+@pytest.fixture(scope="module")
+def frame(universe):
+    return pd.DataFrame({
+        "Region": np.asarray(universe.regions, dtype=object)[universe.row_region],
+        "Constellation": np.asarray(universe.constellations, dtype=object)[universe.row_constellation],
+        "System": np.asarray(universe.systems, dtype=object)[universe.row_system],
+        "Resource": np.asarray(universe.resources, dtype=object)[universe.row_resource],
+    })
+
+
+def _reference(frame, regions=(), constellations=(), systems=(), search="", resources=()):
+    """The rows the sidebar selected with pandas isin / str.contains."""
+    mask = pd.Series(True, index=frame.index)
+    if regions:
+        mask &= frame["Region"].isin(regions)
+    if constellations:
+        mask &= frame["Constellation"].isin(constellations)
+    if systems:
+        mask &= frame["System"].isin(systems)
+    if search:
+        mask &= (frame["System"].str.contains(search, case=False, regex=False)
+                 | frame["Constellation"].str.contains(search, case=False, regex=False)
+                 | frame["Region"].str.contains(search, case=False, regex=False))
+    if resources:
+        mask &= frame["Resource"].isin(resources)
+    return np.flatnonzero(mask.to_numpy())
+
+
+def _filters(universe):
+    regions = list(universe.regions[:2])
+    index = FilterIndex(universe)
+    constellations = index.constellations(regions)[:3]
+    systems = index.systems(constellations)[:4]
+    search = universe.systems[5][1:3].upper()
+    return [
+        {"regions": regions},
+        {"regions": regions, "constellations": constellations},
+        {"regions": regions, "constellations": constellations, "systems": systems},
+        {"search": search},
+        {"search": "a"},
+        {"search": "ZZZ no match"},
+        {"resources": list(universe.resources[:2])},
+        {"regions": regions, "search": search, "resources": list(universe.resources[1:4])},
+        {"systems": systems, "resources": ["Unknown resource"]},
+        {"regions": ["Unknown region"]},
+    ]
+
+
+def test_filters_match_pandas(universe, frame):
+    index = FilterIndex(universe)
+    for filters in _filters(universe):
+        rows = FilterState(index).rows(**filters)
+        assert np.array_equal(rows, _reference(frame, **filters)), filters
+    assert FilterState(index).rows() is None
+
+
+def test_incremental_filters_match_pandas(universe, frame):
+    state = FilterState(FilterIndex(universe))
+    for filters in _filters(universe) + _filters(universe)[::-1]:
+        rows = state.rows(**filters)
+        assert np.array_equal(rows, _reference(frame, **filters)), filters
+        # An unchanged rerun returns the previous result
+        assert state.rows(**filters) is rows
+
+
+def test_unchanged_filter_bitmaps_are_reused(universe, frame):
+    state = FilterState(FilterIndex(universe))
+    regions = list(universe.regions[:2])
+    state.rows(regions=regions, search="a")
+    region_bitmap = state._parts["region"][1]
+
+    rows = state.rows(regions=regions, search="b")
+    assert state._parts["region"][1] is region_bitmap
+    assert np.array_equal(rows, _reference(frame, regions=regions, search="b"))
+
+    rows = state.rows(regions=regions[:1], search="b")
+    assert state._parts["region"][1] is not region_bitmap
+    assert np.array_equal(rows, _reference(frame, regions=regions[:1], search="b"))
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from app.models.jump_graph import JumpGraph
+
+SYSTEMS = ["A", "B", "C", "D", "E", "F"]
+
+
+def _graph(edges):
+    universe = SimpleNamespace(systems=SYSTEMS, system_codes={name: code for code, name in enumerate(SYSTEMS)})
+    return JumpGraph.from_edges(universe, [a for a, _ in edges], [b for _, b in edges])
+
+
+def _within(graph, start, max_jumps):
+    systems, hops = graph.within(SYSTEMS.index(start), max_jumps)
+    return {SYSTEMS[s]: h for s, h in zip(systems.tolist(), hops.tolist())}
+
+
+def test_within_respects_jump_bound():
+    # A - B - C - D chain with a shortcut A - C; E - F is a separate island
+    graph = _graph([("A", "B"), ("B", "C"), ("C", "D"), ("C", "A"), ("E", "F")])
+    assert graph.num_gates == 5
+    assert _within(graph, "A", 1) == {"A": 0, "B": 1, "C": 1}
+    assert _within(graph, "A", 2) == {"A": 0, "B": 1, "C": 1, "D": 2}
+    assert _within(graph, "D", 10) == {"D": 0, "C": 1, "B": 2, "A": 2}
+    assert _within(graph, "E", 3) == {"E": 0, "F": 1}
+
+
+def test_within_starts_at_start_system():
+    graph = _graph([("A", "B"), ("B", "C")])
+    systems, hops = graph.within(SYSTEMS.index("B"), 0)
+    assert systems.tolist() == [SYSTEMS.index("B")]
+    assert hops.tolist() == [0]
+    assert _within(graph, "B", 5) == {"B": 0, "A": 1, "C": 1}
+    # A system without gates only reaches itself
+    assert _within(graph, "F", 5) == {"F": 0}
+
+
+def test_gates_to_unknown_systems_are_dropped():
+    graph = _graph([("A", "Jita"), ("Amarr", "B"), ("A", "A"), ("A", "B"), ("B", "A")])
+    assert graph.num_gates == 1
+    assert _within(graph, "A", 5) == {"A": 0, "B": 1}
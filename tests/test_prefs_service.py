@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import prefs_service
+
+
+@pytest.fixture
+def writes(tmp_path, monkeypatch):
+    """Preference files written under tmp_path, in order."""
+    monkeypatch.setattr(settings, "DATA_ROOT", str(tmp_path))
+    written = []
+    write = prefs_service._write_atomic
+    monkeypatch.setattr(prefs_service, "_write_atomic", lambda path, prefs: written.append(prefs) or write(path, prefs))
+    return written
+
+
+def _read(tmp_path, username):
+    with open(os.path.join(tmp_path, "user_data", username, "preferences.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_rapid_saves_are_written_once(tmp_path, writes):
+    writer = prefs_service._PrefsWriter(delay=0.3)
+    for page in range(1, 21):
+        assert writer.schedule("pilot", {"table_page": page, "region": "The Forge"})
+    assert writer.schedule("pilot", {"table_page": 20, "region": "The Forge"}) is False
+    assert writer.pending("pilot") == {"table_page": 20, "region": "The Forge"}
+
+    assert _wait_for(lambda: writes)
+    time.sleep(0.5)
+    assert writes == [{"table_page": 20, "region": "The Forge"}]
+    assert writer.pending("pilot") is None
+    assert _read(tmp_path, "pilot") == {"table_page": 20, "region": "The Forge"}
+    # Equal to what is on disk: nothing to write
+    assert writer.schedule("pilot", {"table_page": 20, "region": "The Forge"}) is False
+
+
+def test_flush_and_write_now(tmp_path, writes):
+    writer = prefs_service._PrefsWriter(delay=60)
+    writer.schedule("a", {"page": 1})
+    writer.schedule("b", {"page": 2})
+    writer.flush("a")
+    assert writes == [{"page": 1}]
+    assert writer.pending("b") == {"page": 2}
+
+    writer.write_now("b", {"page": 3})
+    assert writer.pending("b") is None
+    writer.flush()
+    assert writes == [{"page": 1}, {"page": 3}]
+    assert _read(tmp_path, "a") == {"page": 1} and _read(tmp_path, "b") == {"page": 3}
+
+
+def test_pending_saves_are_flushed_at_exit(tmp_path):
+    script = ("from app.services import prefs_service\n"
+              "for page in range(50):\n"
+              "    prefs_service.schedule_save('pilot', {'table_page': page})\n")
+    env = dict(os.environ, DATA_ROOT=str(tmp_path))
+    # The process exits well within the quiet period: only the exit flush writes
+    assert subprocess.run([sys.executable, "-c", script], env=env).returncode == 0
+    assert _read(tmp_path, "pilot") == {"table_page": 49}
@@ -0,0 +1,68 @@
+import os
+from datetime import date
+
+from app.services.price_history import PriceHistoryStore
+
+
+def _write_import(path, average):
+    with open(path, "w") as f:
+        f.write("resource,buy,sell,average\n")
+        f.write(f"Base Metals,{average - 1},{average + 1},{average}\n")
+
+
+def test_sync_imports_picks_up_files_edited_in_place(tmp_path):
+    imports = tmp_path / "price_imports"
+    imports.mkdir()
+    path = str(imports / "prices_2024-05-01.csv")
+    _write_import(path, 10.0)
+    store = PriceHistoryStore(str(tmp_path / "price_history"))
+
+    assert store.sync_imports(str(imports)) == 1
+    assert store.sync_imports(str(imports)) == 0
+
+    folder_mtime = os.stat(imports).st_mtime_ns
+    _write_import(path, 125.0)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    assert os.stat(imports).st_mtime_ns == folder_mtime
+
+    assert store.sync_imports(str(imports)) == 1
+    history = store.query(start=date(2024, 5, 1))
+    assert history["average"].tolist() == [125.0]
+    assert store.stats(["Base Metals"])["average"].tolist() == [125.0]
+
+
+def test_sync_imports_drops_deleted_and_renamed_files(tmp_path):
+    imports = tmp_path / "price_imports"
+    imports.mkdir()
+    _write_import(str(imports / "prices_2024-05-01.csv"), 10.0)
+    _write_import(str(imports / "prices_2024-05-02.csv"), 20.0)
+    store = PriceHistoryStore(str(tmp_path / "price_history"))
+    assert store.sync_imports(str(imports)) == 2
+
+    os.rename(imports / "prices_2024-05-02.csv", imports / "jita_2024-05-03.csv")
+    assert store.sync_imports(str(imports)) == 1
+    assert store.query()["date"].dt.day.tolist() == [1, 3]
+    assert store.stats()["rolling_mean"].tolist() == [10.0, 15.0]
+    assert not os.path.exists(tmp_path / "price_history" / "prices" / "date=2024-05-02")
+
+    os.remove(imports / "prices_2024-05-01.csv")
+    os.remove(imports / "jita_2024-05-03.csv")
+    assert store.sync_imports(str(imports)) == 0
+    assert store.query().empty
+    assert store.stats().empty
+    assert store.sync_imports(str(imports)) == 0
+
+
+def test_stats_have_one_row_per_resource_and_day(tmp_path):
+    imports = tmp_path / "price_imports"
+    imports.mkdir()
+    _write_import(str(imports / "amarr_2024-05-01.csv"), 10.0)
+    _write_import(str(imports / "jita_2024-05-01.csv"), 30.0)
+    _write_import(str(imports / "jita_2024-05-02.csv"), 50.0)
+    store = PriceHistoryStore(str(tmp_path / "price_history"))
+    assert store.sync_imports(str(imports)) == 3
+
+    assert len(store.query()) == 3
+    stats = store.stats(["Base Metals"])
+    assert stats["average"].tolist() == [20.0, 50.0]
+    assert stats["rolling_mean"].tolist() == [20.0, 35.0]
@@ -0,0 +1,101 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from app.services.price_import import import_prices
+
+RESOURCES = ["Base Metals", "Condensates", "Heavy Metals"]
+
+
+def test_csv_chunks_keep_universe_rows_per_region():
+    dump = (b"Region;Item;Buy;Sell;Average\n"
+            b"The Forge;Base Metals;10;12;11\n"
+            b"Domain;Base Metals;20;22;N/A\n"
+            b"The Forge;Condensates; 5 ;6;\n"
+            b"The Forge;Tritanium;1;1;1\n"
+            b"Domain;Heavy Metals;x;y;z")
+    for chunk_bytes in (7, 1 << 20):
+        market = import_prices(io.BytesIO(dump), resources=RESOURCES, chunk_bytes=chunk_bytes)
+        assert (market.rows_read, market.rows_kept) == (5, 3)
+        assert market.prices() == {"Base Metals": 15.5, "Condensates": 5.0}
+        assert market.prices("Domain") == {"Base Metals": 20.0}
+
+
+def test_repeated_csv_imports_exit_cleanly():
+    script = ("import io\n"
+              "from app.services.price_import import import_prices\n"
+              "for _ in range(3):\n"
+              "    import_prices(io.BytesIO(b'resource,average\\nBase Metals,5\\n'))\n")
+    for _ in range(5):
+        assert subprocess.run([sys.executable, "-c", script]).returncode == 0
+
+
+def test_bom_prefixed_csv():
+    dump = "\ufeffresource,average\r\nBase Metals,5\r\nCondensates,7\r\n".encode("utf-8")
+    market = import_prices(io.BytesIO(dump), resources=RESOURCES)
+    assert market.format.name_column == "resource"
+    assert market.prices() == {"Base Metals": 5.0, "Condensates": 7.0}
+
+
+def test_json_records_arrays_and_ndjson():
+    records = [{"name": "Base Metals", "average": 11.5, "region": "Jita"},
+               {"name": "Condensates", "buy": "7"},
+               {"name": "Tritanium", "avg": 1}]
+    for payload in (json.dumps(records), "\n".join(map(json.dumps, records)), json.dumps(records, indent=2)):
+        market = import_prices(io.BytesIO(payload.encode()), resources=RESOURCES, chunk_bytes=7)
+        assert market.prices() == {"Base Metals": 11.5, "Condensates": 7.0}
+
+
+def test_columnar_json():
+    columns = {"name": ["Base Metals", "Condensates", "Tritanium"], "average": [11.5, None, 1],
+               "buy": [10, "7", 1], "region": ["Jita", "Amarr", "Jita"]}
+    market = import_prices(io.BytesIO(json.dumps(columns).encode()), resources=RESOURCES)
+    assert market.format.kind == "columns"
+    assert market.prices() == {"Base Metals": 11.5, "Condensates": 7.0}
+    assert market.prices("Amarr") == {"Condensates": 7.0}
+
+    columns["buy"].pop()
+    with pytest.raises(ValueError):
+        import_prices(io.BytesIO(json.dumps(columns).encode()))
+
+
+def test_price_mapping():
+    market = import_prices(io.BytesIO(b'{"Base Metals": 3, "Condensates": "4.5", "Heavy Metals": null}'))
+    assert market.format.kind == "mapping"
+    assert market.prices() == {"Base Metals": 3.0, "Condensates": 4.5}
+
+
+def test_repeated_rows_average_or_keep_last():
+    dump = b"resource,price\nBase Metals,10\nCondensates,4\nBase Metals,20\n"
+    for chunk_bytes in (9, 1 << 20):
+        assert import_prices(io.BytesIO(dump), chunk_bytes=chunk_bytes).prices()["Base Metals"] == 15.0
+        last = import_prices(io.BytesIO(dump), chunk_bytes=chunk_bytes, keep_last=True)
+        assert last.prices() == {"Base Metals": 20.0, "Condensates": 4.0}
+
+
+def test_malformed_json_record_raises(monkeypatch):
+    good = json.dumps({"name": "Base Metals", "average": 1})
+    bad = '{"name": "Condensates", "average": 2,,}'
+    monkeypatch.setattr("app.services.price_import.MAX_RECORD_CHARS", 1024)
+    for separator, start, end in ((",\n", "[", "]"), ("\n", "", "")):
+        payload = start + separator.join([good] * 3 + [bad] + [good] * 2000) + end
+        with pytest.raises(ValueError, match="malformed JSON record"):
+            import_prices(io.BytesIO(payload.encode()), chunk_bytes=256)
+    with pytest.raises(ValueError, match="malformed JSON record"):
+        import_prices(io.BytesIO(("[" + good + ', {"name": "Condensates", "ave').encode()))
+
+
+def test_quoted_line_breaks_and_skipped_rows():
+    dump = (b'region,item,average,note\n'
+            b'Jita,Base Metals,10,"multi\nline, with comma"\n'
+            b'Jita,Condensates,5,"say ""hi""\n\nbye"\n'
+            b'Jita,Heavy Metals,1\n'
+            b'Jita,Heavy Metals,2,x,extra\n'
+            b'Amarr,Base Metals,20,plain\n')
+    for chunk_bytes in (1, 5, 13, 64, 1 << 20):
+        market = import_prices(io.BytesIO(dump), chunk_bytes=chunk_bytes)
+        assert market.prices() == {"Base Metals": 15.0, "Condensates": 5.0}
+        assert (market.rows_read, market.rows_skipped) == (3, 2)
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from app.services import price_lists
+from app.services.price_lists import list_price_files, load_price_list, parse_price_file
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    price_lists.clear_cache()
+    yield
+    price_lists.clear_cache()
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_price_column_fallback_order(tmp_path):
+    # average > buy > price: each row takes its first preferred non-empty column
+    path = _write(tmp_path / "a.csv", "Item,Price,Buy,Average\nBase Metals,1,2,3\nCondensates,4,5,\n"
+                                      "Heavy Metals,7,,\nNoble Gas,,,\n")
+    assert parse_price_file(path) == {"Base Metals": 3.0, "Condensates": 5.0, "Heavy Metals": 7.0}
+    # price > sell
+    path = _write(tmp_path / "b.csv", "name,sell,price\nBase Metals,1,2\nCondensates,3,\n")
+    assert parse_price_file(path) == {"Base Metals": 2.0, "Condensates": 3.0}
+    path = _write(tmp_path / "c.json", '[{"name": "Base Metals", "avg": 1, "buy": 9}, {"name": "Condensates", "buy": 2}]')
+    assert parse_price_file(path) == {"Base Metals": 1.0, "Condensates": 2.0}
+    path = _write(tmp_path / "d.json", '{"Base Metals": 3, "Condensates": "4.5"}')
+    assert parse_price_file(path) == {"Base Metals": 3.0, "Condensates": 4.5}
+
+
+def test_malformed_rows_are_dropped(tmp_path):
+    path = _write(tmp_path / "prices.csv", 'resource,average\nBase Metals,10\nCondensates,abc\n"Heavy Metals",5,extra\n'
+                                           'Noble Gas\n  Toxic Metals  , 7 \nBase Metals,12\n')
+    # Unparseable prices and rows with the wrong field count are skipped; the last price wins
+    assert parse_price_file(path) == {"Base Metals": 12.0, "Toxic Metals": 7.0}
+    path = _write(tmp_path / "records.json", '[{"name": "Base Metals", "avg": 1}, {"price": 3}, '
+                                             '{"name": "Heavy Metals", "avg": "x"}]')
+    assert parse_price_file(path) == {"Base Metals": 1.0}
+
+
+def test_unreadable_files_parse_to_nothing(tmp_path):
+    assert parse_price_file(str(tmp_path / "missing.csv")) == {}
+    assert parse_price_file(_write(tmp_path / "other.csv", "foo,bar\n1,2\n")) == {}
+    assert parse_price_file(_write(tmp_path / "broken.json", '[{"name": "Base Metals", "avg": 1}, {"name": oops}]')) == {}
+    assert load_price_list(str(tmp_path / "missing.csv")) is None
+
+
+def test_load_price_list_reparses_on_mtime_or_size_change(tmp_path, monkeypatch):
+    path = _write(tmp_path / "prices.csv", "resource,average\nBase Metals,10\n")
+    parsed = []
+    parse = price_lists.parse_price_file
+    monkeypatch.setattr(price_lists, "parse_price_file", lambda p: parsed.append(p) or parse(p))
+
+    first = load_price_list(path)
+    assert first.name == "prices.csv" and first.prices == {"Base Metals": 10.0}
+    assert load_price_list(path) is first
+    assert len(parsed) == 1
+
+    # Same size, newer mtime
+    stat = os.stat(path)
+    _write(path, "resource,average\nBase Metals,20\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = load_price_list(path)
+    assert second is not first and second.prices == {"Base Metals": 20.0}
+
+    # Same mtime, different size
+    stat = os.stat(path)
+    _write(path, "resource,average\nBase Metals,300\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    third = load_price_list(path)
+    assert third.prices == {"Base Metals": 300.0}
+    assert load_price_list(path) is third
+    assert len(parsed) == 3
+
+
+def test_list_price_files_relists_on_folder_mtime_change(tmp_path, monkeypatch):
+    shared, user = tmp_path / "price_sets", tmp_path / "user"
+    shared.mkdir()
+    user.mkdir()
+    _write(shared / "a.csv", "")
+    _write(shared / "b.JSON", "")
+    _write(shared / "notes.txt", "")
+    _write(user / "a.csv", "")
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(price_lists.os, "listdir", lambda folder: listed.append(folder) or listdir(folder))
+
+    folders = [str(shared), str(user), str(tmp_path / "missing")]
+    expected = {"a.csv": str(user / "a.csv"), "b.JSON": str(shared / "b.JSON")}
+    assert list_price_files(folders) == expected
+    assert list_price_files(folders) == expected
+    assert len(listed) == 2
+
+    _write(user / "c.csv", "")
+    stat = os.stat(user)
+    os.utime(user, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert list_price_files(folders) == {**expected, "c.csv": str(user / "c.csv")}
+    assert listed == [str(shared), str(user), str(user)]
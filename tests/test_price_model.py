@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.models.price_model import PriceSnapshot
+from app.services.price_service import PriceService
+
+RESOURCES = ("Base Metals", "Condensates", "Heavy Metals")
+
+
+def test_snapshot_is_immutable():
+    source = {"Base Metals": 10.0}
+    snapshot = PriceSnapshot("prices.csv", source)
+    source["Base Metals"] = 99.0
+    assert snapshot.prices["Base Metals"] == 10.0
+    with pytest.raises(TypeError):
+        snapshot.prices["Base Metals"] = 1.0
+
+
+def test_vector_is_memoized_per_resource_list():
+    snapshot = PriceSnapshot("prices.csv", {"Base Metals": 10.0, "Heavy Metals": 3.5, "Other": 1.0})
+    vector = snapshot.vector(RESOURCES)
+    assert vector.tolist() == [10.0, 0.0, 3.5]
+    assert not vector.flags.writeable
+    assert snapshot.vector(list(RESOURCES)) is vector
+    assert snapshot.vector(RESOURCES[::-1]).tolist() == [3.5, 0.0, 10.0]
+    assert snapshot.vector(RESOURCES) is vector
+
+
+def test_updated_returns_a_new_snapshot():
+    snapshot = PriceSnapshot("prices.csv", {"Base Metals": 10.0, "Condensates": 2.0}, source="prices.csv")
+    vector = snapshot.vector(RESOURCES)
+    updated = snapshot.updated({"Condensates": 4.0, "Heavy Metals": 1.0})
+    assert updated is not snapshot and updated.name == "prices.csv"
+    assert dict(updated.prices) == {"Base Metals": 10.0, "Condensates": 4.0, "Heavy Metals": 1.0}
+    assert updated.vector(RESOURCES).tolist() == [10.0, 4.0, 1.0]
+    # The original and its memoized vector are untouched
+    assert dict(snapshot.prices) == {"Base Metals": 10.0, "Condensates": 2.0}
+    assert snapshot.vector(RESOURCES) is vector and vector.tolist() == [10.0, 2.0, 0.0]
+    assert snapshot.updated({}, name="copy").name == "copy"
+
+
+def test_switching_snapshots_does_not_leak_prices(tmp_path):
+    path = tmp_path / "prices.json"
+    path.write_text(json.dumps({"Base Metals": 10.0, "Condensates": 2.0}))
+    service = PriceService(str(path))
+    current = service.active
+    assert current.name == PriceService.CURRENT
+
+    service.add_snapshot(PriceSnapshot("jita.csv", {"Heavy Metals": 7.0}))
+    assert service.activate("jita.csv").name == "jita.csv"
+    assert dict(service.get_all_prices()) == {"Heavy Metals": 7.0}
+    assert service.vector(RESOURCES).tolist() == [0.0, 0.0, 7.0]
+    assert service.get_price("Base Metals") == 0.0
+
+    assert service.activate(PriceService.CURRENT) is current
+    assert service.vector(RESOURCES) is current.vector(RESOURCES)
+    with pytest.raises(KeyError):
+        service.activate("missing.csv")
+    assert service.active is current
+
+
+def test_edits_make_a_new_current_snapshot(tmp_path):
+    path = tmp_path / "prices.json"
+    service = PriceService(str(path))
+    service.use_snapshot(PriceSnapshot("jita.csv", {"Base Metals": 10.0}))
+    jita = service.active
+    vector = service.vector(RESOURCES)
+
+    service.update_price("Condensates", 3.0)
+    assert service.active is not jita and service.active.name == PriceService.CURRENT
+    assert service.get_snapshot(PriceService.CURRENT) is service.active
+    assert service.vector(RESOURCES) is not vector
+    assert service.vector(RESOURCES).tolist() == [10.0, 3.0, 0.0]
+    assert dict(jita.prices) == {"Base Metals": 10.0}
+
+    service.save_prices()
+    assert json.loads(path.read_text()) == {"Base Metals": 10.0, "Condensates": 3.0}
@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.price_refresh import PriceRefresher
+from app.services.price_service import PriceService
+
+ETAG = '"v1"'
+
+
+class _Feed(BaseHTTPRequestHandler):
+    """Local stand-in for the market API: serves `body` with an ETag, 304 when it matches."""
+
+    protocol_version = "HTTP/1.1"
+    body = b""
+    release = None
+    hits = None
+
+    def do_GET(self):
+        self.release.wait(5)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.hits.append(304)
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.hits.append(200)
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed():
+    handler = type("Feed", (_Feed,), {
+        "body": b"region,resource,buy,average\nJita,Base Metals,10,11\nJita,Condensates,20,21\nJita,Tritanium,4,5\n",
+        "release": threading.Event(), "hits": [],
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/api"
+    handler.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_background_refresh_swaps_snapshot(feed):
+    handler, url = feed
+    refresher = PriceRefresher(ttl=60)
+
+    assert refresher.request_refresh(url, resources=["Base Metals", "Condensates"])
+    assert not refresher.request_refresh(url)  # already queued
+    state = refresher.state(url)
+    assert state.pending and state.snapshot is None  # the caller was not blocked
+
+    handler.release.set()
+    state = refresher.wait(url, 5)
+    assert state.error is None and state.version == 1
+    assert dict(state.snapshot.prices) == {"Base Metals": 11.0, "Condensates": 21.0}
+    assert not refresher.request_refresh(url)  # fresh within the ttl
+    assert handler.hits == [200]
+
+
+def test_stale_feed_is_revalidated_with_etag(feed):
+    handler, url = feed
+    handler.release.set()
+    refresher = PriceRefresher(ttl=0)
+    snapshot = refresher.refresh(url).snapshot
+
+    assert refresher.request_refresh(url)
+    state = refresher.wait(url, 5)
+    assert handler.hits == [200, 304]
+    assert state.snapshot is snapshot and state.version == 1
+
+
+def test_fetch_joins_queued_refresh(feed, monkeypatch, tmp_path):
+    handler, url = feed
+    refresher = PriceRefresher(ttl=60)
+    monkeypatch.setattr("app.services.price_refresh.refresher", refresher)
+    refresher.request_refresh(url)
+
+    result = {}
+    fetch = threading.Thread(target=lambda: result.update(
+        PriceService(str(tmp_path / "prices.json")).fetch_from_echoes_api(url)))
+    fetch.start()
+    handler.release.set()
+    fetch.join(5)
+
+    assert result["Base Metals"] == 11.0
+    assert handler.hits == [200]
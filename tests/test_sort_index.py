@@ -0,0 +1,63 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from app.models.sort_index import SortIndex, page_rows
+from app.models.universe import SOURCE_COLUMNS, Universe
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return Universe.from_arrow(pq.read_table("data/eve_planets.parquet", columns=SOURCE_COLUMNS).slice(0, 4000))
+
+
+@pytest.fixture(scope="module")
+def frame(universe):
+    frame = universe.analysis_frame()
+    for column in SortIndex.COLUMNS[:-1]:
+        frame[column] = frame[column].astype(str)
+    return frame
+
+
+@pytest.mark.parametrize("column", SortIndex.COLUMNS)
+@pytest.mark.parametrize("ascending", [True, False])
+def test_order_matches_stable_pandas_sort(universe, frame, column, ascending):
+    order = SortIndex(universe).order(column, ascending)
+    expected = frame.sort_values(column, ascending=ascending, kind="stable").index.to_numpy()
+    assert np.array_equal(order, expected)
+
+
+def test_page_boundaries(universe, frame):
+    order = SortIndex(universe).order("Output/h/unit", False)
+    n = universe.num_rows
+    rows = np.flatnonzero(frame["Resource"].to_numpy() == universe.resources[0])
+    expected = frame.loc[rows].sort_values("Output/h/unit", ascending=False, kind="stable").index.to_numpy()
+    page_size = 100
+    for selection, matching in ((None, order), (rows, expected)):
+        pages = []
+        offset = 0
+        while True:
+            page, total = page_rows(order, selection, n, offset, page_size)
+            assert total == len(matching)
+            if not len(page):
+                break
+            assert len(page) == min(page_size, len(matching) - offset)
+            pages.append(page)
+            offset += page_size
+        # Pages cover every matching row once, in display order
+        assert offset == -(-len(matching) // page_size) * page_size
+        assert np.array_equal(np.concatenate(pages), matching)
+
+    page, total = page_rows(order, np.empty(0, dtype=np.int64), n, 0, page_size)
+    assert len(page) == 0 and total == 0
+    page, total = page_rows(order, rows, n, len(rows) - 1, page_size)
+    assert page.tolist() == expected[-1:].tolist() and total == len(rows)
+
+
+def test_orders_are_shared_and_read_only(universe):
+    index = SortIndex(universe)
+    order = index.order("System")
+    assert index.order("System") is order
+    assert not order.flags.writeable
+    with pytest.raises(KeyError):
+        index.order("Total Value/h")
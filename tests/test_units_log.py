@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.data_service import DataService
+from app.services.units_log import UnitsLog
+
+
+def test_append_after_torn_line_keeps_new_entries(tmp_path):
+    log = UnitsLog(str(tmp_path / "mining_units.json"))
+    log.append({"1_Base Metals": 3, "2_Condensates": 5})
+    # Simulate a crash in the middle of writing the last line
+    with open(log.log_path, "rb") as f:
+        data = f.read()
+    with open(log.log_path, "wb") as f:
+        f.write(data[:-6])
+
+    log.append({"3_Heavy Metals": 7})
+
+    assert UnitsLog(log.snapshot_path).load() == {"1_Base Metals": 3, "3_Heavy Metals": 7}
+
+
+def test_failed_save_keeps_changes_dirty(tmp_path, monkeypatch):
+    service = DataService("unused.parquet", mining_units_path=str(tmp_path / "mining_units.json"))
+    service.update_mining_units("1_Base Metals", 4)
+
+    def fail(changes):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(service._units_log, "append", fail)
+    with pytest.raises(OSError):
+        service.save_mining_units()
+    monkeypatch.undo()
+
+    service.save_mining_units()
+    assert UnitsLog(service.mining_units_path).load() == {"1_Base Metals": 4}
+
+
+def test_edit_during_save_stays_dirty(tmp_path, monkeypatch):
+    service = DataService("unused.parquet", mining_units_path=str(tmp_path / "mining_units.json"))
+    service.update_mining_units("1_Base Metals", 4)
+    service.update_mining_units("2_Condensates", 5)
+    append = service._units_log.append
+
+    def append_while_editing(changes):
+        append(changes)
+        service.update_mining_units("1_Base Metals", 9)
+
+    monkeypatch.setattr(service._units_log, "append", append_while_editing)
+    service.save_mining_units()
+    monkeypatch.undo()
+    assert service._dirty_units == {"1_Base Metals"}
+
+    service.save_mining_units()
+    assert UnitsLog(service.mining_units_path).load() == {"1_Base Metals": 9, "2_Condensates": 5}
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from app.models.data_model import PlanetType, Richness
+from app.models.universe import SOURCE_COLUMNS, Universe
+
+
+@pytest.fixture(scope="module")
+def source():
+    return pd.read_parquet("data/eve_planets.parquet", columns=SOURCE_COLUMNS).iloc[:3000].reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def universe(source):
+    return Universe.from_dataframe(source)
+
+
+def test_resource_views_match_source_rows(source, universe):
+    assert universe.num_rows == len(source)
+    units = {}
+    for record in source.itertuples(index=False):
+        key = f"{record[0]}_{record.Resource}"
+        row = universe.find_row(key)
+        assert row >= 0 and universe.row_key(row) == key
+        view = universe.resource_view(row, units)
+        assert view.planet_id == record[0]
+        assert (view.region, view.constellation, view.system) == (record.Region, record.Constellation, record.System)
+        assert view.planet_name == record[4]
+        assert view.planet_type is PlanetType(record[5])
+        assert view.resource == record.Resource
+        assert view.richness is Richness(record.Richness)
+        assert view.output == pytest.approx(record.Output, rel=1e-6)
+        assert view.key == key
+
+
+def test_planet_views_and_unit_write_through(source, universe):
+    units = {}
+    planets = universe.build_planets(units)
+    assert len(planets) == source["Planet ID"].nunique()
+    for planet_id, rows in source.groupby("Planet ID", sort=False):
+        planet = planets[planet_id]
+        first = rows.iloc[0]
+        assert planet.planet_id == planet_id
+        assert (planet.region, planet.constellation, planet.system) == (first["Region"], first["Constellation"], first["System"])
+        assert planet.name == first["Planet Name"]
+        assert planet.planet_type is PlanetType(first["Planet Type"])
+        # Resources keep their source order within the planet
+        assert [r.resource for r in planet.resources] == rows["Resource"].tolist()
+
+    resource = planets[source["Planet ID"].iloc[0]].resources[0]
+    resource.mining_units = 4
+    assert units == {resource.key: 4}
+    assert resource.calculate_total_value({resource.resource: 2.0}) == pytest.approx(resource.output * 8)
+    resource.mining_units = 0
+    assert units == {} and resource.mining_units == 0
+
+
+def test_unknown_keys(universe):
+    planet_id = int(universe.planet_ids[0])
+    for key in ("", "abc_Base Metals", f"{planet_id}_No Such Resource", "999999999_Base Metals", str(planet_id)):
+        assert universe.find_row(key) == -1
@@ -0,0 +1,67 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from app.models.filter_index import FilterIndex
+from app.models.universe import SOURCE_COLUMNS, Universe
+from app.models.universe_snapshot import read_snapshot, snapshot_path, source_digest, write_snapshot
+from app.services import data_service
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    path = str(tmp_path / "eve_planets.parquet")
+    table = pq.read_table("data/eve_planets.parquet", columns=SOURCE_COLUMNS)
+    pq.write_table(table.slice(0, 3000), path)
+    return path
+
+
+def _assert_same(snapshot, universe, filter_index):
+    loaded, loaded_index = snapshot
+    for name, value in vars(universe).items():
+        if isinstance(value, np.ndarray):
+            assert np.array_equal(getattr(loaded, name), value), name
+    for name in ("regions", "constellations", "systems", "planet_names", "resources", "planet_types", "richness"):
+        assert getattr(loaded, name) == getattr(universe, name), name
+    arrays, trigrams = filter_index.to_arrays()
+    loaded_arrays, loaded_trigrams = loaded_index.to_arrays()
+    assert loaded_trigrams == trigrams
+    for name, value in arrays.items():
+        assert np.array_equal(loaded_arrays[name], value), name
+    for query in ("a", "ab", universe.systems[0][1:4].upper(), "no such place"):
+        assert np.array_equal(loaded_index.search_bitmap(query), filter_index.search_bitmap(query))
+    assert loaded_index.constellations(universe.regions[:1]) == filter_index.constellations(universe.regions[:1])
+
+
+def test_snapshot_round_trip(parquet_path):
+    universe = Universe.from_arrow(pq.read_table(parquet_path, columns=SOURCE_COLUMNS))
+    filter_index = FilterIndex(universe)
+    path = snapshot_path(parquet_path)
+    write_snapshot(universe, path, "digest")
+
+    _assert_same(read_snapshot(path, "digest"), universe, filter_index)
+    assert read_snapshot(path, "other digest") is None
+
+
+def test_stale_or_corrupt_snapshot_is_rebuilt(parquet_path):
+    path = snapshot_path(parquet_path)
+    universe, filter_index = data_service._open_universe(parquet_path)
+    _assert_same(read_snapshot(path, source_digest(parquet_path)), universe, filter_index)
+
+    # The parquet changed: the snapshot's hash no longer matches
+    table = pq.read_table(parquet_path)
+    pq.write_table(table.slice(1000), parquet_path)
+    assert read_snapshot(path, source_digest(parquet_path)) is None
+    universe, filter_index = data_service._open_universe(parquet_path)
+    assert universe.num_rows == 2000
+    _assert_same(read_snapshot(path, source_digest(parquet_path)), universe, filter_index)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    for corrupt in (data[:len(data) // 2], data[:200], b"not a snapshot"):
+        with open(path, "wb") as f:
+            f.write(corrupt)
+        assert read_snapshot(path, source_digest(parquet_path)) is None
+        rebuilt, _ = data_service._open_universe(parquet_path)
+        assert rebuilt.num_rows == 2000
+        assert read_snapshot(path, source_digest(parquet_path)) is not None
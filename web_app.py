@@ -1,11 +1,19 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
 import json
 from app.services.data_service import DataService
 from app.services.price_service import PriceService
 from app.services.analytics_service import AnalyticsService
-from app.services import prefs_service
+from app.services.summary_service import SummaryService
+from app.services import prefs_service, price_history, price_import, price_lists, price_refresh
+from app.models.filter_index import FilterState
+from app.models.sort_index import page_rows
+from app.utils import instrumentation
+from app.utils.valuation import value_rows
 from app.config import settings
 from app.path_utils import resource_path
 from streamlit_js_eval import streamlit_js_eval
@@ -296,6 +304,8 @@ def registration_form():
 # --- Main App Logic ---
 def main_app():
     username = st.session_state.username
+    # Per-stage timings (no-op unless PROFILING is enabled)
+    stages = instrumentation.StageTimer("rerun")
     
     # --- Load User Preferences ---
     if 'user_prefs' not in st.session_state:
@@ -309,7 +319,8 @@ def main_app():
     if not st.session_state.get('local_storage_prefs_loaded'):
         try:
             ls_key = f"eve_prefs_{username}"
-            stored = streamlit_js_eval(js_expressions=f"localStorage.getItem('{ls_key}')", key=f"get_{ls_key}")
+            with instrumentation.stage("prefs.local_storage_get"):
+                stored = streamlit_js_eval(js_expressions=f"localStorage.getItem('{ls_key}')", key=f"get_{ls_key}")
             if stored:
                 try:
                     parsed = json.loads(stored)
@@ -326,108 +337,41 @@ def main_app():
         try:
             ls_key = f"eve_prefs_{username}"
             prefs_json = json.dumps(st.session_state.user_prefs)
+            # Nothing changed since the last sync: skip the browser round-trip
+            if st.session_state.get('local_storage_prefs_json') == prefs_json:
+                return
+            st.session_state.local_storage_prefs_json = prefs_json
             # Wstaw jako string literal, bezpiecznie uciecz znaki
             prefs_js_string = prefs_json.replace("\\", "\\\\").replace("'", "\\'")
-            streamlit_js_eval(js_expressions=f"localStorage.setItem('{ls_key}', '{prefs_js_string}')", key=f"set_{ls_key}", want_output=False)
+            with instrumentation.stage("prefs.local_storage_set"):
+                streamlit_js_eval(js_expressions=f"localStorage.setItem('{ls_key}', '{prefs_js_string}')", key=f"set_{ls_key}", want_output=False)
         except Exception:
             pass
 
     def save_prefs():
-        """Callback to save preferences."""
+        """Callback to save preferences (written behind, coalesced with other changes)."""
         if username != "guest":
-            prefs_service.save_prefs(username, st.session_state.user_prefs)
+            prefs_service.schedule_save(username, st.session_state.user_prefs)
         _save_prefs_to_local_storage()
 
     def set_pref(pref_key, value):
-        """Utility to persist a single preference immediately."""
+        """Utility to persist a single preference (written behind)."""
         st.session_state.user_prefs[pref_key] = value
         if username != "guest":
-            prefs_service.save_prefs(username, st.session_state.user_prefs)
+            prefs_service.schedule_save(username, st.session_state.user_prefs)
         _save_prefs_to_local_storage()
 
     # Wymuś szybki start: przy pierwszym uruchomieniu sesji ustaw "Jita"
     if not st.session_state.get('applied_default_filter'):
         st.session_state.user_prefs['system_filter'] = ['Jita']
-        prefs_service.save_prefs(username, st.session_state.user_prefs)
+        prefs_service.schedule_save(username, st.session_state.user_prefs)
         _save_prefs_to_local_storage()
         st.session_state.applied_default_filter = True
 
-    def _load_price_file_to_dict(path: str) -> dict:
-        try:
-            if path.lower().endswith('.json'):
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        return {str(k): float(v or 0.0) for k, v in data.items()}
-                    return {}
-            # CSV fallback (resource, price or average/buy)
-            import csv
-            with open(path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                name_key = None
-                for k in reader.fieldnames or []:
-                    kk = (k or '').strip().lower()
-                    if kk in ("resource", "name"):
-                        name_key = k
-                        break
-                if not name_key:
-                    return {}
-                rows = list(reader)
-                def get_num(row, keys):
-                    for key in keys:
-                        if key in row and row[key] not in (None, ""):
-                            try:
-                                return float(row[key])
-                            except Exception:
-                                continue
-                    return 0.0
-                prices = {}
-                for r in rows:
-                    res = str(r.get(name_key, "")).strip()
-                    if not res:
-                        continue
-                    val = get_num(r, ["price", "average", "avg", "buy"])  # prefer price
-                    prices[res] = val
-                return prices
-        except Exception:
-            return {}
-
     def autoload_latest_prices(current_username: str, svc: "PriceService") -> None:
         """Load default prices from ceny.csv if available, else newest CSV in user's folder.
         Accepts CSV with columns: resource + (price | average/buy)."""
         try:
-            import csv
-            def _csv_to_dict(path: str):
-                try:
-                    with open(path, newline='', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        name_key = None
-                        for k in reader.fieldnames or []:
-                            kk = (k or '').strip().lower()
-                            if kk in ("resource", "name"):
-                                name_key = k
-                                break
-                        if not name_key:
-                            return {}
-                        rows = list(reader)
-                        def get_num(row, keys):
-                            for key in keys:
-                                if key in row and row[key] not in (None, ""):
-                                    try:
-                                        return float(row[key])
-                                    except Exception:
-                                        continue
-                            return 0.0
-                        prices = {}
-                        for r in rows:
-                            res = str(r.get(name_key, "")).strip()
-                            if not res:
-                                continue
-                            val = get_num(r, ["average", "avg", "price", "buy"])  # prefer avg/price
-                            prices[res] = val
-                        return prices
-                except Exception:
-                    return {}
             # 1) prefer explicit default ceny.csv paths
             candidates = [
                 os.path.join(settings.DATA_ROOT, 'user_data', 'lawrokh', 'price_imports', 'ceny.csv'),
@@ -460,13 +404,9 @@ def main_app():
             if selected_file and os.path.exists(selected_file):
                 chosen_path = selected_file
             if chosen_path and os.path.exists(chosen_path):
-                price_dict = _load_price_file_to_dict(chosen_path)
-                if price_dict:
-                    svc.update_multiple_prices(price_dict)
-                    try:
-                        svc.save_prices()
-                    except Exception:
-                        pass
+                price_list = price_lists.load_price_list(chosen_path)
+                if price_list:
+                    svc.use_snapshot(price_list)
             else:
                 svc.load_prices()
         except Exception:
@@ -496,10 +436,13 @@ def main_app():
         price_service = PriceService(prices_path)
         autoload_latest_prices(username, price_service)
         analytics_service = AnalyticsService(data_service, price_service)
+        summary_service = SummaryService(data_service, price_service)
         
-        return data_service, price_service, analytics_service
+        return data_service, price_service, analytics_service, summary_service
 
-    data_service, price_service, analytics_service = load_user_services(username)
+    stages.lap("prefs")
+    data_service, price_service, analytics_service, summary_service = load_user_services(username)
+    stages.lap("services")
 
     # --- Sidebar ---
     with st.sidebar:
@@ -511,7 +454,7 @@ def main_app():
             try:
                 export_blob = dict(st.session_state.user_prefs)
                 try:
-                    export_blob['current_prices'] = price_service.get_all_prices()
+                    export_blob['current_prices'] = dict(price_service.get_all_prices())
                 except Exception:
                     export_blob['current_prices'] = {}
                 prefs_json = json.dumps(export_blob, ensure_ascii=False, indent=2)
@@ -547,12 +490,8 @@ def main_app():
         
         # Price selector w lewym menu
         st.subheader("Price list")
-        price_set_paths = {}
-        for d in [resource_path(os.path.join("data", "price_sets")), os.path.join(settings.DATA_ROOT, "price_sets")]:
-            if os.path.isdir(d):
-                for f in os.listdir(d):
-                    if f.lower().endswith((".json", ".csv")):
-                        price_set_paths[f] = os.path.join(d, f)
+        price_set_paths = price_lists.list_price_files(
+            [resource_path(os.path.join("data", "price_sets")), os.path.join(settings.DATA_ROOT, "price_sets")])
         price_options = ["- none -"] + sorted(price_set_paths.keys())
         default_choice = st.session_state.user_prefs.get('selected_price_choice', price_options[1] if len(price_options) > 1 else price_options[0])
         selected_choice = st.selectbox("Select price file", options=price_options, index=price_options.index(default_choice) if default_choice in price_options else 0, key="side_price_choice")
@@ -565,11 +504,13 @@ def main_app():
             save_prefs()
             try:
                 if selected_choice != "- none -":
-                    price_dict = _load_price_file_to_dict(price_set_paths[selected_choice])
-                    if price_dict:
-                        price_service.update_multiple_prices(price_dict)
-                        price_service.save_prices()
+                    price_list = price_lists.load_price_list(price_set_paths[selected_choice])
+                    if price_list:
+                        price_service.use_snapshot(price_list)
                         st.toast("Applied selected price list.", icon="✅")
+                else:
+                    # Back to the user's own prices (prices.json)
+                    price_service.activate(PriceService.CURRENT)
             except Exception:
                 pass
 
@@ -666,28 +607,10 @@ def main_app():
         Thank you! o7
         """)
 
-    # --- Master DataFrame Preparation ---
-    master_df_key = f'master_df_{username}'
-    if master_df_key not in st.session_state:
-        all_planets = data_service.get_all_planets()
-        resource_data = []
-        for planet in all_planets:
-            for resource in planet.resources:
-                resource_data.append({
-                    "id": f"{resource.planet_id}_{resource.resource}",
-                    "System": planet.system,
-                    "Constellation": planet.constellation,
-                    "Region": planet.region,
-                    "Planet": planet.name,
-                    "Type": planet.planet_type.value,
-                    "Resource": resource.resource,
-                    "Richness": resource.richness.value,
-                    "Output/h/unit": resource.output,
-                    "obj": resource 
-                })
-        st.session_state[master_df_key] = pd.DataFrame(resource_data)
-
-    master_df = st.session_state[master_df_key]
+    # Mining units vector aligned to universe rows (rebuilt by the data service
+    # only when the user's units changed)
+    mining_units_vec = data_service.mining_units_vector()
+    stages.lap("sidebar")
 
     # --- Main Page ---
     st.title("🪐 EVE Echoes Planetary Mining Optimizer")
@@ -712,55 +635,90 @@ def main_app():
     with ic5:
         st.markdown('<div class="info-card"><div class="info-title">📈 Analytics & Reports</div><p class="info-desc">Income summaries and logistics overview.</p></div>', unsafe_allow_html=True)
 
-    # Filtering logic on the master dataframe
-    filtered_df = master_df
-    if selected_regions:
-        filtered_df = filtered_df[filtered_df['Region'].isin(selected_regions)]
-    if selected_constellations:
-        filtered_df = filtered_df[filtered_df['Constellation'].isin(selected_constellations)]
-    if selected_systems:
-        filtered_df = filtered_df[filtered_df['System'].isin(selected_systems)]
-    if search_query:
-        query = search_query.lower()
-        filtered_df = filtered_df[
-            filtered_df['System'].fillna('').str.lower().str.contains(query) |
-            filtered_df['Constellation'].fillna('').str.lower().str.contains(query) |
-            filtered_df['Region'].fillna('').str.lower().str.contains(query)
-        ]
-    if selected_resources:
-        filtered_df = filtered_df[filtered_df['Resource'].isin(selected_resources)]
+    # Filtering via the shared filter index; the per-session state reuses
+    # bitmaps of filters that did not change since the previous rerun
+    filter_state = st.session_state.get('filter_state')
+    if filter_state is None or filter_state.index is not data_service.filter_index:
+        filter_state = FilterState(data_service.filter_index)
+        st.session_state.filter_state = filter_state
+    filtered_rows = filter_state.rows(
+        regions=selected_regions,
+        constellations=selected_constellations,
+        systems=selected_systems,
+        search=search_query,
+        resources=selected_resources,
+    )
+    stages.lap("filter")
 
     # Prepare data for display
-    # Perform calculations on the filtered dataframe for performance
-    df = filtered_df
-    
-    # Update mining units from objects, as they can change
-    df['Mining Units'] = df['obj'].apply(lambda r: r.mining_units)
-
-    prices = price_service.get_all_prices()
-    price_map = df['Resource'].map(prices).fillna(0)
-    
-    df["Value/h/unit"] = df["Output/h/unit"] * price_map
-    df["Total Value/h"] = df["Value/h/unit"] * df["Mining Units"]
-    
-    if not df.empty:
-        df = df.set_index("id")
-
-    # Calculate a separate dataframe for summaries that ignores filters
-    df_all = master_df.copy()
-    df_all['Mining Units'] = df_all['obj'].apply(lambda r: r.mining_units)
-    price_map_all = df_all['Resource'].map(prices).fillna(0)
-    df_all["Value/h/unit"] = df_all["Output/h/unit"] * price_map_all
-    df_all["Total Value/h"] = df_all["Value/h/unit"] * df_all["Mining Units"]
-    if not df_all.empty:
-        df_all = df_all.set_index("id")
+    # Values of every row come from the user's cached valuation; only the
+    # visible rows are materialized, as an Arrow table handed to Streamlit
+    universe = data_service.universe
+    valuation = analytics_service.get_valuation()
+    resource_prices = valuation.prices
+    stages.lap("valuation")
+
+    def rows_table(rows, units=None):
+        rows = np.asarray(rows, dtype=np.int64)
+        if units is None:
+            units = mining_units_vec[rows]
+        value_per_unit, total_value = value_rows(
+            universe.row_output[rows], universe.row_resource[rows], resource_prices, units)
+        table = universe.page_table(rows)
+        for name, values in (("Mining Units", units), ("Value/h/unit", value_per_unit), ("Total Value/h", total_value)):
+            table = table.append_column(name, pa.array(values))
+        return table
 
     # Display Analysis Table with Data Editor
     st.info("You can directly edit the 'Mining Units' column below. Click the 'Update Mining Units' button to apply changes.")
 
-    if not df.empty:
+    # Server-side sorting and pagination: orders are precomputed over the whole
+    # universe, the filter only masks them and a single page is sliced out
+    value_sort_columns = {"Total Value/h": "total_value", "Value/h/unit": "value_per_unit", "Mining Units": "units"}
+    sort_columns = list(value_sort_columns) + list(data_service.sort_index.COLUMNS)
+    page_sizes = [50, 100, 250, 500, 1000]
+    s_col1, s_col2, s_col3, s_col4 = st.columns([3, 2, 2, 2])
+    sort_pref = st.session_state.user_prefs.get('table_sort_column', "Total Value/h")
+    sort_column = s_col1.selectbox(
+        "Sort by",
+        sort_columns,
+        index=sort_columns.index(sort_pref) if sort_pref in sort_columns else 0,
+        key='table_sort_column',
+        on_change=lambda: set_pref('table_sort_column', st.session_state.get('table_sort_column'))
+    )
+    sort_descending = s_col2.toggle(
+        "Descending",
+        value=st.session_state.user_prefs.get('table_sort_descending', True),
+        key='table_sort_descending',
+        on_change=lambda: set_pref('table_sort_descending', st.session_state.get('table_sort_descending'))
+    )
+    size_pref = st.session_state.user_prefs.get('table_page_size', 100)
+    page_size = s_col3.selectbox(
+        "Rows per page",
+        page_sizes,
+        index=page_sizes.index(size_pref) if size_pref in page_sizes else 1,
+        key='table_page_size',
+        on_change=lambda: set_pref('table_page_size', st.session_state.get('table_page_size'))
+    )
+    if sort_column in value_sort_columns:
+        sort_order = valuation.order(value_sort_columns[sort_column], ascending=not sort_descending)
+    else:
+        sort_order = data_service.sort_index.order(sort_column, ascending=not sort_descending)
+    total_matching = universe.num_rows if filtered_rows is None else len(filtered_rows)
+    num_pages = max(1, -(-total_matching // page_size))
+    # Seeded once and clamped before the widget exists (no default value next to the Session State API)
+    st.session_state.setdefault('table_page', 1)
+    if st.session_state.table_page > num_pages:
+        st.session_state.table_page = 1
+    page = s_col4.number_input("Page", min_value=1, max_value=num_pages, step=1, key='table_page')
+    page_rows_idx, total_matching = page_rows(sort_order, filtered_rows, universe.num_rows, (page - 1) * page_size, page_size)
+    page_table = rows_table(page_rows_idx)
+    stages.lap("table_page")
+    if total_matching:
+        st.caption(f"Rows {(page - 1) * page_size + 1:,}–{(page - 1) * page_size + page_table.num_rows:,} of {total_matching:,}")
+
+    if page_table.num_rows:
         column_config = {
-            "id": None, # Ukryj kolumnę ID
             "Mining Units": st.column_config.NumberColumn(
                 "Mining Units",
                 help="Set the number of mining units for this resource.",
@@ -770,61 +728,99 @@ def main_app():
             "Total Value/h": st.column_config.NumberColumn(format="%.2f"),
         }
         
-        # Sortowanie i przygotowanie kolumn do wyświetlenia
-        df_display = df.sort_values(by="Total Value/h", ascending=False)
+        # Strona jest już posortowana; przygotowanie kolumn do wyświetlenia
         display_cols = ["Region", "Constellation", "System", "Planet", "Type", "Resource", "Richness", "Output/h/unit", "Mining Units", "Value/h/unit", "Total Value/h"]
         
         # Upewnij się, że wszystkie kolumny istnieją przed ich wyświetleniem
-        final_display_cols = [col for col in display_cols if col in df_display.columns]
+        final_display_cols = [col for col in display_cols if col in page_table.column_names]
 
-        edited_df = st.data_editor(
-            df_display[final_display_cols],
+        edited_table = st.data_editor(
+            page_table.select(final_display_cols),
             column_config=column_config,
             use_container_width=True,
             key="data_editor",
             hide_index=True # Ukryj domyślny indeks numeryczny
         )
+        stages.lap("table_editor")
 
         _, button_col = st.columns([4, 1])
         with button_col:
             if st.button("Update Mining Units"):
                 changes_made = False
                 try:
-                    # Iterujemy po indeksie (to są nasze id) i kolumnie 'Mining Units'
-                    for resource_id, row in edited_df.iterrows():
-                        if "Mining Units" not in row:
-                            continue
-                        new_units_val = row.get("Mining Units", 0)
-                        try:
-                            new_units = int(new_units_val)
-                        except (ValueError, TypeError):
-                            new_units = 0
-                        # Aktualizuj obiekt zasobu powiązany z tym wierszem
-                        if resource_id in df.index:
-                            resource_obj = df.loc[resource_id, 'obj']
-                            if getattr(resource_obj, 'mining_units', 0) != new_units:
-                                resource_obj.mining_units = new_units
-                                changes_made = True
+                    # Porównanie wektorowe: tylko wiersze, w których zmieniono 'Mining Units'
+                    # (pozycja w tabeli = pozycja w page_rows_idx)
+                    new_units = pc.fill_null(edited_table.column("Mining Units"), 0).to_numpy().astype('int64')
+                    changed = np.flatnonzero(new_units != mining_units_vec[page_rows_idx])
+                    changes = {
+                        universe.row_key(row_id): units
+                        for row_id, units in zip(page_rows_idx[changed].tolist(), new_units[changed].tolist())
+                    }
+                    changes_made = data_service.update_mining_units_batch(changes) > 0
                 except Exception:
                     pass
                 
                 if changes_made:
                     data_service.save_mining_units()
-                    data_service.update_dataframe_mining_units()
                     st.toast("Jednostki wydobywcze zaktualizowane!", icon="✅")
                     st.rerun()
                 else:
                     st.toast("Brak zmian do zaktualizowania.", icon="ℹ️")
     else:
         st.info("No data to display for the selected filters.")
-
+    stages.lap("table_actions")
+
+    # --- Mining Units Optimizer ---
+    with st.expander("📊 Optimize Mining Unit Placement"):
+        o_col1, o_col2, o_col3 = st.columns(3)
+        opt_budget = o_col1.number_input("Total Mining Units", min_value=0, value=10, step=1, key="opt_budget")
+        opt_cap = o_col2.number_input("Max Units per Planet", min_value=1, value=1, step=1, key="opt_planet_cap")
+        opt_use_filters = o_col3.checkbox("Only selected regions/systems", value=True, key="opt_use_filters")
+        if st.button("Find Best Placement"):
+            st.session_state.optimizer_result = analytics_service.optimize_mining_units(
+                opt_budget, opt_cap,
+                regions=selected_regions if opt_use_filters else None,
+                systems=selected_systems if opt_use_filters else None,
+            )
+        optimizer_result = st.session_state.get('optimizer_result')
+        if optimizer_result:
+            allocation, allocation_value = optimizer_result
+            if not allocation:
+                st.info("No profitable placement found at current prices.")
+            else:
+                allocation_rows = [universe.find_row(key) for key in allocation]
+                preview = rows_table(allocation_rows, np.array(list(allocation.values()), dtype=np.int64))
+                summary_service.refresh()
+                st.metric("Optimized Total Value/h", f"{allocation_value:,.2f} ISK", delta=f"{allocation_value - summary_service.total_value_h:,.2f} ISK vs current")
+                st.dataframe(preview.select(["Region", "System", "Planet", "Resource", "Mining Units", "Value/h/unit", "Total Value/h"]), use_container_width=True, hide_index=True)
+                if st.button("Apply Placement (replaces current mining units)"):
+                    changes = {resource_id: 0 for resource_id in data_service.mining_units}
+                    changes.update(allocation)
+                    data_service.update_mining_units_batch(changes)
+                    data_service.save_mining_units()
+                    st.session_state.optimizer_result = None
+                    st.toast("Jednostki wydobywcze zaktualizowane!", icon="✅")
+                    st.rerun()
+    stages.lap("optimizer")
 
     # --- Tabs for other functionalities ---
-    tab1, tab2, tab3 = st.tabs(["Summaries", "Price Management", "POS Fuel Planner"]) 
-
-    with tab1:
+    # st.tabs would run every tab body on each rerun; a section switch runs
+    # only the visible one
+    active_tab = st.radio(
+        "Section",
+        ["Summaries", "Price Management", "POS Fuel Planner"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_tab",
+    )
+
+    if active_tab == "Summaries":
         st.header("Income & Logistics Summaries")
 
+        # Summaries ignore filters; only rows with mining units are revalued, and
+        # only when units or prices changed
+        summary_service.refresh()
+
         # --- Tax Input ---
         st.session_state.user_prefs['tax_rate'] = st.number_input(
             "Broker/Transaction Tax (%)", 
@@ -839,7 +835,7 @@ def main_app():
         )
 
         # Create a single summary dataframe for all calculations (ignores filters)
-        summary_df = df_all[df_all['Mining Units'] > 0].copy()
+        summary_df = summary_service.rows_frame()
 
         if not summary_df.empty:
             # --- CALCULATIONS (GROSS) ---
@@ -854,10 +850,6 @@ def main_app():
             summary_df['Net Weekly Income'] = summary_df['Gross Weekly Income'] * tax_multiplier
             summary_df['Net Monthly Income'] = summary_df['Gross Monthly Income'] * tax_multiplier
 
-            # Volume
-            RESOURCE_UNIT_VOLUME = 0.01  # m3
-            summary_df['Hourly Volume (m3)'] = summary_df['Output/h/unit'] * summary_df['Mining Units'] * RESOURCE_UNIT_VOLUME
-
             # --- DISPLAY INCOME ---
             st.subheader("Income Summary")
             income_display_cols = ["Region", "Constellation", "System", "Planet", "Resource", "Mining Units", "Net Daily Income"]
@@ -911,7 +903,7 @@ def main_app():
             # --- Planetary Storage Fill Time (per Planet) ---
             st.markdown("#### Planetary Storage")
             if st.session_state.user_prefs['planetary_storage_capacity'] > 0:
-                planet_volume_summary = summary_df.groupby(['System', 'Planet'])['Hourly Volume (m3)'].sum().reset_index()
+                planet_volume_summary = summary_service.planet_volumes()
                 planet_volume_summary = planet_volume_summary[planet_volume_summary['Hourly Volume (m3)'] > 0]
 
                 if not planet_volume_summary.empty:
@@ -932,7 +924,7 @@ def main_app():
             # --- Transport Summary ---
             st.markdown("#### Transport")
             if st.session_state.user_prefs['ship_cargo_capacity'] > 0:
-                total_hourly_volume = summary_df['Hourly Volume (m3)'].sum()
+                total_hourly_volume = summary_service.total_volume_h
                 total_daily_volume = total_hourly_volume * 24
 
                 collection_frequency_days = st.session_state.user_prefs['ship_cargo_capacity'] / total_daily_volume if total_daily_volume > 0 else float('inf')
@@ -960,7 +952,7 @@ def main_app():
         else:
             st.info("Assign mining units to see income and logistics summaries.")
 
-    with tab2:
+    elif active_tab == "Price Management":
         st.header("Price Management")
 
         # --- Export ---
@@ -968,6 +960,49 @@ def main_app():
         prices_df = pd.DataFrame(price_service.get_all_prices().items(), columns=["resource", "price"])
         st.download_button(label="Export Current Prices to CSV", data=prices_df.to_csv(index=False).encode('utf-8'), file_name="current_prices.csv", mime="text/csv")
 
+        st.divider()
+
+        # --- Compare price lists side by side (active prices stay untouched) ---
+        st.subheader("Compare Price Lists")
+        compare_paths = price_lists.list_price_files([
+            resource_path(os.path.join("data", "price_imports")),
+            os.path.join(settings.DATA_ROOT, "user_data", username, "price_imports"),
+            resource_path(os.path.join("data", "price_sets")),
+            os.path.join(settings.DATA_ROOT, "price_sets"),
+        ])
+        compare_options = [PriceService.CURRENT] + sorted(compare_paths)
+        c_col1, c_col2 = st.columns([3, 1])
+        compare_choice = c_col1.multiselect("Price lists", options=compare_options, key="compare_price_lists",
+                                            help="Income/h of your mining units under each list; 'current' is your own prices.json.")
+        compare_level = c_col2.selectbox("Group by", ["region", "constellation", "system"], key="compare_price_level")
+        if compare_choice:
+            snapshots = []
+            for name in compare_choice:
+                snapshot = price_service.get_snapshot(name) if name == PriceService.CURRENT else price_lists.load_price_list(compare_paths[name])
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+            comparison = analytics_service.compare_price_snapshots(snapshots, compare_level)
+            if comparison.empty:
+                st.info("Assign mining units to compare income under different price lists.")
+            else:
+                metric_cols = st.columns(len(snapshots))
+                for col, snapshot in zip(metric_cols, snapshots):
+                    col.metric(f"{snapshot.name} — Value/h", f"{comparison[snapshot.name].sum():,.2f} ISK")
+                st.dataframe(comparison, use_container_width=True, hide_index=True)
+
+        st.divider()
+
+        # --- Price history (dated imports, precomputed rolling stats) ---
+        st.subheader("Price History")
+        history_stats = price_service.get_price_stats(username)
+        if history_stats.empty:
+            st.caption("No price history yet. Dated imports (YYYY-MM-DD in the file name, columns resource, buy, sell, average) in your price_imports folder are added automatically.")
+        else:
+            history_resource = st.selectbox("Resource", sorted(history_stats["resource"].unique()), key="history_resource")
+            resource_stats = history_stats[history_stats["resource"] == history_resource].set_index("date")
+            st.line_chart(resource_stats[["average", "rolling_mean", "rolling_min", "rolling_max"]])
+            st.caption(f"Rolling window: {price_history.ROLLING_DAYS} days. Latest volatility (std/mean): {resource_stats['volatility'].iloc[-1]:.1%}")
+
 
         st.divider()
 
@@ -1007,20 +1042,59 @@ def main_app():
         with st.form("fetch_echoes_api_form"):
             api_url = st.text_input("API URL", value="https://echoes.mobi/api")
             fetch = st.form_submit_button("Fetch and Apply Prices", type="primary")
-            if fetch:
+        if fetch:
+            # Fetched by the background worker; a fresh cached response is applied right away
+            price_refresh.refresher.request_refresh(api_url, resources=data_service.universe.resources)
+            st.session_state.price_feed_url = api_url
+        feed_url = st.session_state.get("price_feed_url")
+        if feed_url:
+            feed = price_refresh.refresher.state(feed_url)
+            if feed.pending:
+                st.info("Fetching prices in the background, you can keep working meanwhile.")
+                st.button("Check again", key="price_feed_check")
+            else:
+                st.session_state.price_feed_url = None
+                if feed.error:
+                    st.error(f"Failed to fetch prices: {feed.error}")
+                elif feed.snapshot is not None:
+                    price_service.update_multiple_prices(feed.snapshot.prices)
+                    price_service.save_prices()
+                    st.toast(f"Fetched {len(feed.snapshot)} prices from API and saved.", icon="✅")
+                    st.rerun()
+
+        st.divider()
+        st.subheader("Import Market Dump")
+        dump_file = st.file_uploader("CSV or JSON market dump", type=["csv", "json", "txt"], key="market_dump_file",
+                                     help="Any size; only rows for planetary resources are kept. Multi-region dumps can be applied per region.")
+        if dump_file is not None:
+            # Parsed once per upload; reruns reuse the per-market prices
+            cached_dump = st.session_state.get("market_dump")
+            if cached_dump is None or cached_dump[0] != dump_file.file_id:
                 try:
-                    fetched = price_service.fetch_from_echoes_api(api_url)
-                    if fetched:
-                        price_service.update_multiple_prices(fetched)
-                        price_service.save_prices()
-                        st.success(f"Fetched {len(fetched)} prices from API and saved.")
-                        st.rerun()
-                    else:
-                        st.warning("No prices parsed from the provided API.")
-                except Exception as e:
-                    st.error(f"Failed to fetch prices: {e}")
+                    cached_dump = (dump_file.file_id, price_import.import_prices(dump_file, resources=data_service.universe.resources), None)
+                except ValueError as e:
+                    cached_dump = (dump_file.file_id, None, str(e))
+                st.session_state.market_dump = cached_dump
+            _, market_prices, dump_error = cached_dump
+            if dump_error:
+                st.error(f"Failed to read the dump: {dump_error}")
+            elif not market_prices.rows_kept:
+                st.warning(f"No planetary resource prices among {market_prices.rows_read:,} rows.")
+            else:
+                st.caption(f"{market_prices.rows_kept:,} of {market_prices.rows_read:,} rows kept ({market_prices.format}).")
+                if market_prices.rows_skipped:
+                    st.warning(f"{market_prices.rows_skipped:,} malformed rows were skipped.")
+                dump_markets = [m for m, kept in zip(market_prices.markets, market_prices.counts.sum(axis=1)) if m and kept]
+                market_options = ["All markets (mean)"] + dump_markets
+                dump_market = st.selectbox("Market", market_options, key="market_dump_market") if dump_markets else market_options[0]
+                dump_prices = market_prices.prices(None if dump_market == market_options[0] else dump_market)
+                if st.button(f"Apply {len(dump_prices)} prices", key="market_dump_apply", type="primary"):
+                    price_service.update_multiple_prices(dump_prices)
+                    price_service.save_prices()
+                    st.toast(f"Imported {len(dump_prices)} prices from {dump_file.name} and saved.", icon="✅")
+                    st.rerun()
 
-    with tab3:
+    elif active_tab == "POS Fuel Planner":
         st.header("POS Fuel Planner")
         st.info("Wprowadź magazyny paliwa i zużycie/h dla każdego POS, aby obliczyć czas pracy.")
 
@@ -1120,6 +1194,23 @@ def main_app():
             save_prefs()
             st.success("Saved POS planner settings.")
 
+    stages.lap("section_" + active_tab.lower().replace(" ", "_"))
+    stages.finish()
+
+    # --- Hidden admin panel (PROFILING enabled, opened with ?admin=1) ---
+    if instrumentation.enabled() and st.query_params.get("admin") == "1":
+        with st.expander("⏱️ Profiling", expanded=True):
+            st.caption("Latency per stage and service call in this process, since start or the last reset.")
+            st.dataframe(instrumentation.registry.summary(), use_container_width=True, hide_index=True)
+            p_col1, p_col2, p_col3 = st.columns(3)
+            p_col1.download_button("Export JSON", data=instrumentation.registry.to_json(),
+                                   file_name="profile.json", mime="application/json", use_container_width=True)
+            p_col2.download_button("Export Prometheus", data=instrumentation.registry.to_prometheus(),
+                                   file_name="metrics.prom", mime="text/plain", use_container_width=True)
+            if p_col3.button("Reset", use_container_width=True):
+                instrumentation.registry.reset()
+                st.rerun()
+
 
 
 if st.session_state.authentication_status: